@@ -0,0 +1,78 @@
+# benchmarks/bench_mp3_concat.py
+
+"""
+다중 세그먼트 TTS 결합 방식 비교: pydub(디코딩 → 결합 → 재인코딩) vs MP3 프레임 결합.
+
+사용법:
+    python benchmarks/bench_mp3_concat.py                 # 사인파 세그먼트를 생성해 비교 (ffmpeg 필요)
+    python benchmarks/bench_mp3_concat.py a.mp3 b.mp3 ... # 실제 TTS 세그먼트로 비교
+
+CPU 시간에는 pydub가 실행하는 ffmpeg 자식 프로세스의 사용 시간도 포함합니다.
+"""
+
+from pathlib import Path
+import io
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+from pronun_model.utils.mp3 import concat_mp3
+
+ROUNDS = int(os.getenv("BENCH_ROUNDS", 5))
+
+
+def _cpu_seconds() -> float:
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (self_usage.ru_utime + self_usage.ru_stime
+            + child_usage.ru_utime + child_usage.ru_stime)
+
+
+def _generate_segments(count: int = 8, seconds: int = 4) -> list:
+    segments = []
+    for i in range(count):
+        buf = io.BytesIO()
+        Sine(220 + 110 * i).to_audio_segment(duration=seconds * 1000).set_channels(1).export(
+            buf, format="mp3", bitrate="64k"
+        )
+        segments.append(buf.getvalue())
+    return segments
+
+
+def pydub_concat(segments: list) -> bytes:
+    """기존 TTS() 방식: 세그먼트를 임시 파일로 저장 → 디코딩 → 결합 → 재인코딩"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        combined = AudioSegment.empty()
+        for i, data in enumerate(segments):
+            path = Path(tmp_dir) / f"segment_{i}.mp3"
+            path.write_bytes(data)
+            combined += AudioSegment.from_mp3(path)
+            os.remove(path)
+        out = Path(tmp_dir) / "combined.mp3"
+        combined.export(out, format="mp3")
+        return out.read_bytes()
+
+
+def measure(name: str, func, segments: list) -> None:
+    wall_start, cpu_start = time.perf_counter(), _cpu_seconds()
+    for _ in range(ROUNDS):
+        size = len(func(segments))
+    wall = (time.perf_counter() - wall_start) / ROUNDS * 1000
+    cpu = (_cpu_seconds() - cpu_start) / ROUNDS * 1000
+    print(f"{name:<12} wall {wall:9.2f} ms   cpu {cpu:9.2f} ms   output {size} bytes")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        segments = [Path(p).read_bytes() for p in sys.argv[1:]]
+    else:
+        segments = _generate_segments()
+    print(f"segments: {len(segments)}, total {sum(map(len, segments))} bytes, rounds: {ROUNDS}")
+    measure("pydub", pydub_concat, segments)
+    measure("frame", concat_mp3, segments)
@@ -0,0 +1,88 @@
+# benchmarks/bench_symptom_matcher.py
+
+"""
+증상 → 진료과 찾기 비교: 증상 사전 매칭(Aho-Corasick) vs 벡터 검색(질의 임베딩 + FAISS k=3).
+
+사용법:
+    python benchmarks/bench_symptom_matcher.py                    # benchmarks/data/symptom_questions.jsonl
+    python benchmarks/bench_symptom_matcher.py questions.jsonl    # {"question", "departments"} 한 줄에 하나
+
+MongoDB와 OpenAI API가 필요합니다 (서비스와 같은 .env 사용). 벡터 검색은 임베딩 캐시를 거치지 않고
+매번 임베딩 API를 호출해 측정합니다. 재현율은 기대 진료과 중 하나라도 추천 진료과에 포함된 질문의 비율입니다.
+"""
+
+from pathlib import Path
+import json
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pronun_model.utils.qa import init_retriever
+from pronun_model.utils.hospital_index import normalize_department
+
+DEFAULT_QUESTIONS = Path(__file__).resolve().parent / "data" / "symptom_questions.jsonl"
+
+
+def load_questions(path: Path) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def hit(departments: list, expected: list) -> bool:
+    found = {normalize_department(d) for d in departments}
+    return any(normalize_department(d) in found for d in expected)
+
+
+def summarize(name: str, latencies: list, hits: int, total: int) -> None:
+    if not latencies:
+        print(f"{name:<10} (결과 없음)")
+        return
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{name:<10} n={len(ms):3d}  p50 {statistics.median(ms):8.3f} ms  p95 {p95:8.3f} ms  "
+          f"recall {hits}/{total} ({hits / total:.0%})")
+
+
+if __name__ == "__main__":
+    questions = load_questions(Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_QUESTIONS)
+    retriever = init_retriever()
+    store = retriever.symptoms_vectordb
+    raw_embeddings = store.embeddings.embeddings  # 캐시를 거치지 않는 OpenAIEmbeddings
+
+    rule_lat, vector_lat, hybrid_lat = [], [], []
+    rule_hits = vector_hits = hybrid_hits = 0
+    for item in questions:
+        question, expected = item["question"], item["departments"]
+
+        start = time.perf_counter()
+        matched = retriever._matched_symptoms(question)
+        rule_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vector_docs = retriever._search_by_vector(store, raw_embeddings.embed_query(question), k=3)
+        vector_time = time.perf_counter() - start
+
+        vector_depts = retriever._recommended_departments(vector_docs)
+        vector_lat.append(vector_time)
+        vector_hits += hit(vector_depts, expected)
+
+        if matched:
+            rule_depts = retriever._recommended_departments(matched)
+            rule_lat.append(rule_time)
+            rule_hits += hit(rule_depts, expected)
+            hybrid_lat.append(rule_time)
+            hybrid_hits += hit(rule_depts, expected)
+        else:
+            rule_depts = None
+            hybrid_lat.append(rule_time + vector_time)
+            hybrid_hits += hit(vector_depts, expected)
+
+        print(f"{'매칭' if matched else '대체'}  {question}  →  {rule_depts or vector_depts}")
+
+    total = len(questions)
+    print(f"\n질문 {total}개, 사전 매칭 {len(rule_lat)}개 ({len(rule_lat) / total:.0%})")
+    summarize("rule", rule_lat, rule_hits, len(rule_lat) or 1)
+    summarize("vector", vector_lat, vector_hits, total)
+    summarize("hybrid", hybrid_lat, hybrid_hits, total)
@@ -1,21 +1,34 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 
 from pronun_model.routers.ask_question import router as ask_question_router
 from pronun_model.routers.delete_files import router as delete_files_router
-from pronun_model.config import CONVERT_TTS_DIR
+from pronun_model.routers.rag_index import router as rag_index_router
+from pronun_model.routers.stats import router as stats_router
+from pronun_model.routers.metrics import router as metrics_router
+from pronun_model.config import CONVERT_TTS_DIR, INDEX_SYNC_ENABLED, TTS_JANITOR_ENABLED, UPLOAD_MAX_MB, BATCH_MAX_UPLOAD_MB
+from pronun_model.middleware import RequestIDMiddleware, UploadLimitMiddleware
+from pronun_model.metrics import REQUEST_SECONDS
+from pronun_model.utils.qa import init_retriever
+from pronun_model.utils.index_sync import run_index_sync
+from pronun_model.utils.tts_cache import TTSStaticFiles, get_tts_cache, run_tts_janitor
+from pronun_model.tokens import get_encoding
+from pronun_model.openai_client import close_openai_client
+from pronun_model.executor import run_blocking, shutdown_executor
 
 from openai import OpenAI
 from pathlib import Path
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+import asyncio
 import json
 import uvicorn
 import logging
 import logging.config
 import traceback
 import os
+import time
 
 # Load environment variables
 load_dotenv()
@@ -29,8 +42,48 @@ with open(logging_config_path, "r") as f:
 logging.config.dictConfig(logging_config)
 logger = logging.getLogger("pronun_model")
 
+# Application lifespan: build shared RAG index once per process
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await run_blocking(init_retriever)
+        logger.info("RAG retriever initialized")
+    except Exception as e:
+        # 시작 시 생성에 실패하면 첫 질의에서 다시 시도
+        logger.error("RAG retriever initialization failed", extra={
+            "errorType": type(e).__name__,
+            "error_message": str(e)
+        })
+
+    # 토크나이저 인코딩 파일 로드 (첫 요청이 다운로드를 기다리지 않도록)
+    await run_blocking(get_encoding)
+    # TTS 캐시 디렉토리 스캔 (첫 요청이 이벤트 루프에서 스캔하지 않도록)
+    await run_blocking(get_tts_cache)
+
+    # MongoDB 변경 사항을 인덱스에 문서 단위로 반영
+    sync_task = asyncio.create_task(run_index_sync()) if INDEX_SYNC_ENABLED else None
+    # TTS 음성 파일 TTL/용량 정리
+    janitor_task = asyncio.create_task(run_tts_janitor()) if TTS_JANITOR_ENABLED else None
+    yield
+    for task in (sync_task, janitor_task):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    await close_openai_client()
+    shutdown_executor()
+
 # Initialize FastAPI app
-app = FastAPI(title="Pronun Q&A Service")
+app = FastAPI(title="Pronun Q&A Service", lifespan=lifespan)
+
+# Upload size limit middleware
+app.add_middleware(
+    UploadLimitMiddleware,
+    max_bytes=UPLOAD_MAX_MB * 1024 * 1024,
+    path_limits={"/api/pronun/ask-question/batch/": BATCH_MAX_UPLOAD_MB * 1024 * 1024},
+)
 
 # CORS middleware
 app.add_middleware(
@@ -44,8 +97,11 @@ app.add_middleware(
 # Include routers
 app.include_router(ask_question_router, prefix="/api/pronun", tags=["Q&A"])
 app.include_router(delete_files_router, prefix="/api/pronun", tags=["Delete"])
+app.include_router(rag_index_router, prefix="/api/pronun", tags=["RAG"])
+app.include_router(stats_router, prefix="/api/pronun", tags=["Stats"])
+app.include_router(metrics_router, tags=["Metrics"])
 
-app.mount("/tts", StaticFiles(directory=str(CONVERT_TTS_DIR)), name="tts")
+app.mount("/tts", TTSStaticFiles(directory=str(CONVERT_TTS_DIR)), name="tts")
 
 logging.getLogger("watchfiles.main").setLevel(logging.WARNING)
 
@@ -59,15 +115,41 @@ def read_root():
 async def health():
     return {"status": "ok"}
 
+def _route_template(request: Request) -> str:
+    """
+    지표 레이블용 라우트 템플릿 (예: /api/pronun/delete-tts/{video_id}).
+    경로 파라미터 값으로 레이블이 늘어나지 않도록 실제 경로 대신 사용합니다.
+    """
+    route = request.scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # include_router의 prefix가 route.path에 포함되지 않는 FastAPI 버전도 있어 실제 경로에서 prefix를 복원
+    try:
+        concrete = template.format(**request.path_params)
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = request.url.path
+    return path[:-len(concrete)] + template if path.endswith(concrete) else template
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     logger.debug("Request received")
+    started = time.perf_counter()
     try:
         response = await call_next(request)
+        duration = time.perf_counter() - started
+        REQUEST_SECONDS.observe(
+            duration,
+            method=request.method,
+            route=_route_template(request),
+            status=response.status_code,
+        )
         logger.info("Response sent", extra={
             "errorType": "",
-            "error_message": ""
+            "error_message": "",
+            "duration_ms": round(duration * 1000, 1)
         })
         return response
     except Exception as e:
@@ -82,16 +164,22 @@ async def log_requests(request: Request, call_next):
         })
         raise
 
+# Request ID middleware (가장 바깥에서 실행되도록 마지막에 등록: 로그와 지표 모두 request_id 사용)
+app.add_middleware(RequestIDMiddleware)
+
 # Exception handler: catch-all HTTPException
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    logger.error("HTTP exception", extra={
+    # 요청 오류(4xx)와 과부하 거절(503)은 서버 오류가 아니므로 WARNING (오류 지표에 포함하지 않음)
+    level = logging.ERROR if exc.status_code >= 500 and exc.status_code != 503 else logging.WARNING
+    logger.log(level, "HTTP exception", extra={
         "errorType": type(exc).__name__,
         "error_message": str(exc.detail)
     })
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=exc.headers,  # Retry-After 등
     )
 
 # Exception handler: catch-all
@@ -0,0 +1,190 @@
+# pronun_model/admission.py
+
+"""
+질문 요청 입장 제어.
+
+질문 엔드포인트는 먼저 전체 동시 처리 수(ADMISSION_MAX_CONCURRENCY) 안에서 입장권을 받고, 파이프라인 안에서는
+STT/LLM/TTS 단계마다 다시 단계별 동시 실행 수 안에서 진행합니다. 자리가 없으면 정해진 길이의 대기열에서
+순서대로 기다리며, 대기열이 가득 차면 바로 429, 최대 대기 시간을 넘기면 503으로 거절합니다(둘 다 Retry-After 포함).
+과부하 때 요청이 끝없이 쌓여 모두 타임아웃되는 대신, 받아들인 요청은 정해진 시간 안에 끝나도록 합니다.
+
+일괄 처리(Priority.BULK) 항목은 같은 단계 자리를 쓰지만 별도 대기열에서 사용자 요청이 모두 자리를 받은 뒤에 받고,
+거절되지 않고 자리가 날 때까지 기다립니다. 대기 중인 항목 수는 BATCH_*_CONCURRENCY로 따로 제한됩니다.
+"""
+
+from fastapi import HTTPException
+from pronun_model.config import (
+    ADMISSION_MAX_CONCURRENCY,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_MAX_WAIT,
+    STAGE_STT_CONCURRENCY,
+    STAGE_LLM_CONCURRENCY,
+    STAGE_TTS_CONCURRENCY,
+    STAGE_MAX_QUEUE,
+    STAGE_MAX_WAIT,
+)
+from pronun_model.rate_limit import Priority, current_priority
+
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional
+import asyncio
+import logging
+import math
+import time
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+HOLD_SMOOTHING = 0.2  # 평균 점유 시간(EWMA) 갱신 비율
+
+
+class Ticket:
+    """Limiter 자리 하나. release()는 여러 번 호출해도 한 번만 반납합니다."""
+
+    def __init__(self, limiter: "Limiter"):
+        self._limiter = limiter
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._limiter._release(time.monotonic() - self._started)
+
+
+class Limiter:
+    """
+    동시 실행 수 제한 + 길이 제한 FIFO 대기열.
+
+    자리가 나면 가장 먼저 기다린 요청에 바로 넘겨주므로, 새로 온 요청이 대기 중인 요청을 앞지르지 않습니다.
+    bulk 요청은 별도 대기열에서 시간 제한 없이 기다리며, 일반 대기열이 비어 있을 때만 자리를 받습니다.
+    Retry-After는 최근 평균 점유 시간과 대기 중인 요청 수로 추정합니다.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0  # 대기열이 가득 차 거절 (429)
+        self.timed_out = 0  # 대기 시간 초과로 거절 (503)
+        self._hold = 1.0  # 평균 점유 시간 (초)
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._bulk_waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def bulk_queued(self) -> int:
+        return len(self._bulk_waiters)
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self._hold * (self.queued + 1) / self.limit))
+
+    def _shed(self, status_code: int, detail: str) -> HTTPException:
+        logger.warning(f"{self.name} 과부하로 거절 ({status_code}): 처리 중 {self.active}, 대기 {self.queued}")
+        return HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after()), "X-Queue-Depth": str(self.queued)},
+        )
+
+    async def acquire(self, bulk: bool = False) -> Ticket:
+        if self.active < self.limit and not self._waiters and not self._bulk_waiters:
+            self.active += 1
+            self.admitted += 1
+            return Ticket(self)
+
+        if bulk:
+            return await self._wait(self._bulk_waiters, None)
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise self._shed(429, "요청이 많아 지금은 처리할 수 없습니다. 잠시 후 다시 시도해주세요.")
+        return await self._wait(self._waiters, self.max_wait)
+
+    async def _wait(self, waiters: Deque[asyncio.Future], max_wait: Optional[float]) -> Ticket:
+        """대기열에서 자리를 넘겨받을 때까지 기다림 (max_wait이 None이면 시간 제한 없음)"""
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # 자리를 넘겨받은 직후 취소/시간 초과된 경우 다음 요청에 넘김
+                self._release(0.0)
+            elif waiter in waiters:
+                waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise self._shed(503, "서버가 혼잡합니다. 잠시 후 다시 시도해주세요.") from e
+            raise
+        self.admitted += 1
+        return Ticket(self)
+
+    def _release(self, held: float) -> None:
+        if held:
+            self._hold += HOLD_SMOOTHING * (held - self._hold)
+        # 일반 대기열부터 (bulk 요청은 일반 대기열이 비었을 때만)
+        for waiters in (self._waiters, self._bulk_waiters):
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    # active는 그대로 두고 자리를 대기 중인 요청에 넘김
+                    waiter.set_result(None)
+                    return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, bulk: bool = False) -> AsyncIterator[None]:
+        ticket = await self.acquire(bulk)
+        try:
+            yield
+        finally:
+            ticket.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "bulk_queued": self.bulk_queued,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_hold_seconds": round(self._hold, 3),
+        }
+
+
+_admission = Limiter("질문 요청", ADMISSION_MAX_CONCURRENCY, ADMISSION_MAX_QUEUE, ADMISSION_MAX_WAIT)
+_stages = {
+    "stt": Limiter("STT 단계", STAGE_STT_CONCURRENCY, STAGE_MAX_QUEUE, STAGE_MAX_WAIT),
+    "llm": Limiter("LLM 단계", STAGE_LLM_CONCURRENCY, STAGE_MAX_QUEUE, STAGE_MAX_WAIT),
+    "tts": Limiter("TTS 단계", STAGE_TTS_CONCURRENCY, STAGE_MAX_QUEUE, STAGE_MAX_WAIT),
+}
+
+
+async def admit() -> Ticket:
+    """질문 요청 입장. 응답이 끝나면 반환된 Ticket을 release()해야 합니다."""
+    return await _admission.acquire()
+
+
+def stage(name: str):
+    """
+    파이프라인 단계("stt", "llm", "tts") 자리를 잡는 async context manager.
+    일괄 처리(Priority.BULK) 중에는 사용자 요청 뒤에서 거절 없이 기다립니다.
+    """
+    return _stages[name].slot(bulk=current_priority() >= Priority.BULK)
+
+
+def admission_stats() -> dict:
+    return {
+        "admission": _admission.stats(),
+        "stages": {name: limiter.stats() for name, limiter in _stages.items()},
+    }
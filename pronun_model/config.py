@@ -15,6 +15,77 @@ load_dotenv()
 # 추가 설정
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 60))  # 기본값 60초
 AVERAGE_WPM = int(os.getenv("AVERAGE_WPM", 100))  # 기본값 100 WPM
+INDEX_SNAPSHOT_KEEP = int(os.getenv("INDEX_SNAPSHOT_KEEP", 2))  # 보관할 FAISS 스냅샷 개수
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", 512))  # 임베딩 캐시 최대 크기 (MB)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 512))  # 임베딩 API 요청당 텍스트 수
+EMBEDDING_MAX_WORKERS = int(os.getenv("EMBEDDING_MAX_WORKERS", 4))  # 동시 임베딩 요청 수
+INDEX_SYNC_ENABLED = os.getenv("INDEX_SYNC_ENABLED", "true").lower() == "true"  # MongoDB 변경 감지 사용 여부
+INDEX_SYNC_POLL_INTERVAL = int(os.getenv("INDEX_SYNC_POLL_INTERVAL", 30))  # 폴링/재연결 주기 (초)
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 100))  # OpenAI HTTP 최대 동시 연결 수
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 20))  # 유지할 keep-alive 연결 수
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", 30))  # keep-alive 유지 시간 (초)
+OPENAI_TIMEOUT_STT = float(os.getenv("OPENAI_TIMEOUT_STT", 30))  # STT 호출 1회 제한 시간 (초)
+OPENAI_TIMEOUT_CORRECTION = float(os.getenv("OPENAI_TIMEOUT_CORRECTION", 15))  # 문법 보정 호출 1회 제한 시간 (초)
+OPENAI_TIMEOUT_TTS = float(os.getenv("OPENAI_TIMEOUT_TTS", 30))  # TTS 호출 1회 제한 시간 (초)
+OPENAI_TIMEOUT_LLM = float(os.getenv("OPENAI_TIMEOUT_LLM", 30))  # 답변 생성 호출 1회 제한 시간 (초, 스트리밍은 첫 응답까지)
+OPENAI_TIMEOUT_EMBEDDING = float(os.getenv("OPENAI_TIMEOUT_EMBEDDING", 10))  # 질의 임베딩 호출 1회 제한 시간 (초)
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 2))  # 429/5xx/타임아웃 시 재시도 횟수
+OPENAI_RETRY_BASE = float(os.getenv("OPENAI_RETRY_BASE", 0.5))  # 재시도 대기 기본값 (초, 지수 증가 + 지터)
+OPENAI_RETRY_MAX = float(os.getenv("OPENAI_RETRY_MAX", 8))  # 재시도 대기 최대값 (초)
+OPENAI_HEDGE_ENABLED = os.getenv("OPENAI_HEDGE_ENABLED", "false").lower() == "true"  # p95 지연을 넘으면 같은 요청을 한 번 더 보냄
+OPENAI_HEDGE_MIN_SAMPLES = int(os.getenv("OPENAI_HEDGE_MIN_SAMPLES", 20))  # p95 계산에 필요한 최소 응답 수
+OPENAI_BREAKER_FAILURES = int(os.getenv("OPENAI_BREAKER_FAILURES", 5))  # 연속 실패 시 회로 차단
+OPENAI_BREAKER_RESET = float(os.getenv("OPENAI_BREAKER_RESET", 30))  # 차단 후 다시 시도하기까지 대기 (초)
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", 32))  # 동시에 처리하는 질문 요청 수
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 64))  # 대기할 수 있는 질문 요청 수 (넘으면 429)
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", 10))  # 최대 대기 시간 (초, 넘으면 503)
+STAGE_STT_CONCURRENCY = int(os.getenv("STAGE_STT_CONCURRENCY", 16))  # 전체 요청에서 동시에 진행하는 STT 단계 수
+STAGE_LLM_CONCURRENCY = int(os.getenv("STAGE_LLM_CONCURRENCY", 16))  # 전체 요청에서 동시에 진행하는 보정/RAG 단계 수
+STAGE_TTS_CONCURRENCY = int(os.getenv("STAGE_TTS_CONCURRENCY", 16))  # 전체 요청에서 동시에 진행하는 TTS 단계 수
+STAGE_MAX_QUEUE = int(os.getenv("STAGE_MAX_QUEUE", 64))  # 단계별 최대 대기 수
+STAGE_MAX_WAIT = float(os.getenv("STAGE_MAX_WAIT", 15))  # 단계별 최대 대기 시간 (초)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"  # 모델별 RPM/TPM 한도에 맞춰 OpenAI 호출 속도 조절
+RATE_LIMIT_BURST_SECONDS = float(os.getenv("RATE_LIMIT_BURST_SECONDS", 5))  # 한 번에 몰아 쓸 수 있는 한도 (몇 초 분량)
+RATE_LIMIT_WHISPER_RPM = int(os.getenv("RATE_LIMIT_WHISPER_RPM", 500))  # whisper-1 분당 요청 수
+RATE_LIMIT_CHAT_RPM = int(os.getenv("RATE_LIMIT_CHAT_RPM", 500))  # gpt-4o-mini 분당 요청 수
+RATE_LIMIT_CHAT_TPM = int(os.getenv("RATE_LIMIT_CHAT_TPM", 200000))  # gpt-4o-mini 분당 토큰 수
+RATE_LIMIT_EMBEDDING_RPM = int(os.getenv("RATE_LIMIT_EMBEDDING_RPM", 3000))  # text-embedding-ada-002 분당 요청 수
+RATE_LIMIT_EMBEDDING_TPM = int(os.getenv("RATE_LIMIT_EMBEDDING_TPM", 1000000))  # text-embedding-ada-002 분당 토큰 수
+RATE_LIMIT_TTS_RPM = int(os.getenv("RATE_LIMIT_TTS_RPM", 500))  # tts-1 분당 요청 수
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", 8))  # 블로킹 작업용 스레드 수
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", 4))  # 요청당 동시에 변환하는 TTS 문장 수
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", 1024))  # TTS 음성 캐시 최대 크기 (MB)
+TTS_CACHE_TTL_HOURS = float(os.getenv("TTS_CACHE_TTL_HOURS", 72))  # 이 시간 동안 사용되지 않은 TTS 음성 삭제 (0이면 사용 안 함)
+TTS_JANITOR_ENABLED = os.getenv("TTS_JANITOR_ENABLED", "true").lower() == "true"  # TTS 음성 주기적 정리 사용 여부
+TTS_JANITOR_INTERVAL = int(os.getenv("TTS_JANITOR_INTERVAL", 600))  # TTS 음성 정리 주기 (초)
+TTS_EVICT_GRACE = int(os.getenv("TTS_EVICT_GRACE", 120))  # 최근 이 시간 안에 사용된 음성은 삭제하지 않음 (다운로드 대기, 초)
+TTS_HOT_CACHE_MB = int(os.getenv("TTS_HOT_CACHE_MB", 64))  # 메모리에서 바로 제공할 TTS 음성 최대 크기 (MB)
+TTS_HTTP_MAX_AGE = int(os.getenv("TTS_HTTP_MAX_AGE", 86400))  # /tts/cache 응답의 Cache-Control max-age (초)
+SYMPTOM_MATCHER_ENABLED = os.getenv("SYMPTOM_MATCHER_ENABLED", "true").lower() == "true"  # 증상 사전 매칭 사용 여부 (False면 항상 벡터 검색)
+UPLOAD_MAX_MB = int(os.getenv("UPLOAD_MAX_MB", 25))  # 음성 업로드 요청 최대 크기 (MB)
+UPLOAD_SPOOL_MB = int(os.getenv("UPLOAD_SPOOL_MB", 8))  # 이보다 큰 업로드만 디스크에 임시 저장 (MB)
+AUDIO_PREPROCESS_ENABLED = os.getenv("AUDIO_PREPROCESS_ENABLED", "true").lower() == "true"  # STT 전 음성 정규화 사용 여부
+AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", 16000))  # 정규화 샘플레이트 (Hz)
+AUDIO_SILENCE_THRESH = float(os.getenv("AUDIO_SILENCE_THRESH", -40))  # 무음으로 볼 음량 (dBFS)
+AUDIO_MIN_SPEECH_MS = int(os.getenv("AUDIO_MIN_SPEECH_MS", 300))  # 이보다 짧은 음성은 거절 (ms)
+AUDIO_OPUS_BITRATE = os.getenv("AUDIO_OPUS_BITRATE", "24k")  # Opus 인코딩 비트레이트
+CORRECTION_GATE_ENABLED = os.getenv("CORRECTION_GATE_ENABLED", "true").lower() == "true"  # 신뢰도가 충분한 STT 결과는 LLM 보정 생략 (False면 항상 보정)
+CORRECTION_MIN_LOGPROB = float(os.getenv("CORRECTION_MIN_LOGPROB", -0.6))  # 세그먼트 avg_logprob가 이보다 낮으면 보정
+CORRECTION_MAX_NO_SPEECH = float(os.getenv("CORRECTION_MAX_NO_SPEECH", 0.5))  # 세그먼트 no_speech_prob가 이보다 높으면 보정
+STT_CHUNK_CONCURRENCY = int(os.getenv("STT_CHUNK_CONCURRENCY", 4))  # 긴 음성: 요청당 동시에 변환하는 조각 수
+BATCH_STT_CONCURRENCY = int(os.getenv("BATCH_STT_CONCURRENCY", 4))  # 일괄 처리: 동시 STT 수
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", 4))  # 일괄 처리: 동시 보정/RAG 질의 수
+BATCH_TTS_CONCURRENCY = int(os.getenv("BATCH_TTS_CONCURRENCY", 2))  # 일괄 처리: 동시 TTS 수
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 100))  # 일괄 처리 요청당 최대 음성 파일 수
+BATCH_MAX_UNZIPPED_MB = int(os.getenv("BATCH_MAX_UNZIPPED_MB", 500))  # zip 압축 해제 후 최대 크기 (MB)
+BATCH_MAX_UPLOAD_MB = int(os.getenv("BATCH_MAX_UPLOAD_MB", 200))  # 일괄 처리 업로드 요청 최대 크기 (MB)
+HOSPITAL_CANDIDATES = int(os.getenv("HOSPITAL_CANDIDATES", 16))  # 영업 상태로 정렬하기 전 검색할 병원 수
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", 1500))  # 프롬프트에 넣을 검색 문서 토큰 예산
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"  # 의미 기반 답변 캐시 사용 여부
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.96))  # 같은 질문으로 볼 코사인 유사도
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", 3600))  # 답변 캐시 유지 시간 (초)
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 2000))  # 답변 캐시 최대 항목 수
+ANSWER_CACHE_SLOT_MINUTES = int(os.getenv("ANSWER_CACHE_SLOT_MINUTES", 30))  # 답변 캐시 시간 슬롯 (분)
 
 # Docker 환경 감지 및 경로 설정
 try:
@@ -47,11 +118,15 @@ UPLOAD_DIR = BASE_DIR / os.getenv("UPLOAD_DIR", "storage/input_video")
 CONVERT_MP3_DIR = BASE_DIR / os.getenv("CONVERT_MP3_DIR", "storage/convert_mp3")
 CONVERT_TTS_DIR = BASE_DIR / os.getenv("CONVERT_TTS_DIR", "storage/convert_tts")
 SCRIPTS_DIR = BASE_DIR / os.getenv("SCRIPTS_DIR", "storage/scripts")
+INDEX_DIR = BASE_DIR / os.getenv("INDEX_DIR", "storage/faiss_index") # FAISS 인덱스 스냅샷
+EMBEDDING_CACHE_DIR = BASE_DIR / os.getenv("EMBEDDING_CACHE_DIR", "storage/embedding_cache") # 임베딩 캐시
+TTS_CACHE_DIR = CONVERT_TTS_DIR / "cache" # TTS 음성 캐시 (/tts/cache/ 로 제공)
+TTS_META_DIR = BASE_DIR / os.getenv("TTS_META_DIR", "storage/tts_meta") # TTS 음성-요청(video_id) 참조 기록 (/tts로 제공하지 않음)
 LOGS_DIR = BASE_DIR / os.getenv("LOGS_DIR", "logs") # logs 디렉토리 추가
 
 # 디렉토리 존재 여부 확인 및 생성
 try:
-    for directory in [UPLOAD_DIR, CONVERT_MP3_DIR, CONVERT_TTS_DIR, SCRIPTS_DIR, LOGS_DIR]:
+    for directory in [UPLOAD_DIR, CONVERT_MP3_DIR, CONVERT_TTS_DIR, SCRIPTS_DIR, INDEX_DIR, EMBEDDING_CACHE_DIR, TTS_CACHE_DIR, TTS_META_DIR, LOGS_DIR]:
         directory.mkdir(parents=True, exist_ok=True)
         logger.info(f"디렉토리가 준비되었습니다: {directory}")
         logger.debug(f"생성된 디렉토리 경로: {directory}")
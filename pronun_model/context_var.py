@@ -0,0 +1,7 @@
+# pronun_model/context_var.py
+
+from contextvars import ContextVar
+from typing import Optional
+
+# 요청별 ID (RequestIDMiddleware에서 설정, 로그 필터에서 사용)
+request_id_ctx_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
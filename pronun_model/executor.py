@@ -0,0 +1,22 @@
+# pronun_model/executor.py
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pronun_model.config import BLOCKING_WORKERS
+import asyncio
+import contextvars
+
+# 블로킹 작업(FAISS 검색, pydub, 파일 I/O 등)을 이벤트 루프 밖에서 실행하는 제한된 스레드 풀
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="pronun-blocking")
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    func를 공용 스레드 풀에서 실행하고 결과를 기다립니다.
+    ContextVar(요청 ID 등)를 복사해 로그 컨텍스트가 유지되도록 합니다.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, partial(ctx.run, func, *args, **kwargs))
+
+def shutdown_executor() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,238 @@
+# pronun_model/metrics.py
+
+"""
+Prometheus 지표 (/metrics).
+
+파이프라인 단계별 처리 시간 히스토그램과 토큰/오류 카운터를 프로세스 메모리에 기록합니다.
+기록은 잠금 한 번과 정수 증가뿐이라 운영 중에도 켜 둘 수 있습니다. 캐시 적중, OpenAI 재시도, 대기열처럼
+각 모듈이 이미 세고 있는 값은 요청 경로에서 다시 세지 않고 수집 시점에 읽어 옵니다(routers/metrics.py).
+
+히스토그램 버킷에는 마지막으로 들어온 요청의 request_id를 exemplar로 남기며,
+OpenMetrics 형식(Accept: application/openmetrics-text)으로 요청하면 함께 내보냅니다.
+"""
+
+from pronun_model.context_var import request_id_ctx_var
+
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import asyncio
+import functools
+import logging
+import math
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# (이름 접미사, 레이블, 값, exemplar)
+Sample = Tuple[str, Dict[str, str], float, Optional[Tuple[str, float, float]]]
+
+
+class MetricFamily:
+    """같은 이름의 지표 묶음 (내보내기 단위)"""
+
+    def __init__(self, name: str, kind: str, documentation: str, samples: Optional[List[Sample]] = None):
+        self.name = name
+        self.kind = kind  # "counter" | "gauge" | "histogram"
+        self.documentation = documentation
+        self.samples: List[Sample] = samples or []
+
+    def add(self, value: float, suffix: str = "", **labels) -> "MetricFamily":
+        self.samples.append((suffix, {k: str(v) for k, v in labels.items()}, value, None))
+        return self
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "counter", self.documentation)
+        with self._lock:
+            for key, value in self._values.items():
+                family.add(value, "_total", **dict(zip(self.labelnames, key)))
+        return family
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "exemplars")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size  # 버킷별 개수 (누적 아님, 마지막은 +Inf)
+        self.sum = 0.0
+        self.exemplars: List[Optional[Tuple[str, float, float]]] = [None] * size
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], _HistogramSeries] = {}
+        _registry.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        request_id = request_id_ctx_var.get()
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.sum += value
+            if request_id:
+                series.exemplars[index] = (request_id, value, time.time())
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "histogram", self.documentation)
+        with self._lock:
+            for key, series in self._series.items():
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count, exemplar in zip(self.buckets, series.counts, series.exemplars):
+                    cumulative += count
+                    family.samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative, exemplar))
+                family.samples.append(("_sum", labels, series.sum, None))
+                family.samples.append(("_count", labels, cumulative, None))
+        return family
+
+
+_registry: List = []
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def render(extra: Iterable[MetricFamily] = (), openmetrics: bool = False) -> str:
+    """
+    등록된 지표와 extra를 Prometheus 텍스트 형식(또는 OpenMetrics)으로 변환합니다.
+    exemplar는 OpenMetrics 형식에서만 내보냅니다.
+    """
+    lines = []
+    for family in [metric.collect() for metric in _registry] + list(extra):
+        # Prometheus 텍스트 형식은 카운터 이름에 _total을 붙이고, OpenMetrics는 붙이지 않음
+        name = family.name + "_total" if family.kind == "counter" and not openmetrics else family.name
+        lines.append(f"# HELP {name} {_escape(family.documentation)}")
+        lines.append(f"# TYPE {name} {family.kind}")
+        for suffix, labels, value, exemplar in family.samples:
+            line = f"{family.name}{suffix}{_labels(labels)} {_format_value(value)}"
+            if openmetrics and exemplar is not None:
+                request_id, observed, timestamp = exemplar
+                line += f' # {{request_id="{_escape(request_id)}"}} {_format_value(observed)} {timestamp:.3f}'
+            lines.append(line)
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram(
+    "pronun_stage_duration_seconds",
+    "파이프라인 단계별 처리 시간 (초)",
+    ("stage",),
+)
+REQUEST_SECONDS = Histogram(
+    "pronun_http_request_duration_seconds",
+    "HTTP 요청 처리 시간 (응답 헤더까지, 초)",
+    ("method", "route", "status"),
+)
+LLM_TOKENS = Counter(
+    "pronun_llm_tokens",
+    "LLM 토큰 사용량 (kind: prompt, completion, cached)",
+    ("model", "kind"),
+)
+ERRORS = Counter(
+    "pronun_errors",
+    "errorType별 오류 로그 수",
+    ("error_type",),
+)
+
+
+def observe_stage(stage: str):
+    """`with observe_stage("stt"):` 블록의 실행 시간을 단계별 히스토그램에 기록"""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def timed(stage: str) -> Callable:
+    """함수(동기/비동기) 실행 시간을 단계별 히스토그램에 기록하는 데코레이터"""
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with observe_stage(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with observe_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ErrorCountHandler(logging.Handler):
+    """
+    ERROR 이상 로그를 errorType별로 셉니다 (logging_config.json에서 등록).
+
+    실패한 요청은 원인을 기록한 뒤 HTTPException 처리기와 요청 로깅 미들웨어에서 다시 로그를 남기므로,
+    요청 하나에서는 처음 기록된 오류(실패 원인)만 셉니다. 요청 밖(백그라운드 작업)의 오류는 모두 셉니다.
+    """
+
+    MAX_TRACKED_REQUESTS = 4096
+
+    def __init__(self, level: int = logging.ERROR):
+        super().__init__(level)
+        self._counted: "OrderedDict[str, None]" = OrderedDict()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # handle()이 self.lock을 잡은 상태로 호출
+        request_id = request_id_ctx_var.get()
+        if request_id:
+            if request_id in self._counted:
+                return
+            self._counted[request_id] = None
+            if len(self._counted) > self.MAX_TRACKED_REQUESTS:
+                self._counted.popitem(last=False)
+        ERRORS.inc(error_type=getattr(record, "errorType", None) or "unknown")
@@ -1,29 +1,91 @@
 # pronun_model/middleware.py
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
 from starlette.types import ASGIApp, Receive, Scope, Send
 from pronun_model.context_var import request_id_ctx_var
+from typing import Dict, Optional
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
-# Request ID 미들웨어: 각 요청에 고유한 ID와 클라이언트 IP를 설정
-class RequestIDMiddleware(BaseHTTPMiddleware):
+# Request ID 미들웨어: 각 요청에 고유한 ID를 설정
+class RequestIDMiddleware:
     """
-    요청 헤더에서 'X-Request-ID'를 추출하여 ContextVar에 설정하는 미들웨어.
+    요청 헤더에서 'X-Request-ID'를 추출하여 ContextVar에 설정하는 ASGI 미들웨어.
+
+    헤더가 없으면 새 ID를 만들고, 응답 헤더 'X-Request-ID'로 돌려줍니다.
+    설정한 ID는 로그(logging_filter)와 지표 exemplar(metrics)에서 사용됩니다.
     """
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # 요청 헤더에서 'X-Request-ID' 추출 (헤더 이름은 클라이언트와 협의하여 설정)
-        request_id = request.headers.get("X-Request-ID", "unknown")
+        request_id = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:128] or uuid.uuid4().hex
         # ContextVar에 설정
         token = request_id_ctx_var.set(request_id)
-        logger.debug(f"RequestIDMiddleware: set request_id to {request_id}")
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]}
+            await send(message)
 
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_with_id)
         finally:
             # 요청 처리 후 ContextVar 복구
             request_id_ctx_var.reset(token)
-            logger.debug("RequestIDMiddleware: reset request_id to previous value")
\ No newline at end of file
+
+
+# 업로드 크기 제한 미들웨어: 본문을 읽기 전에 Content-Length로 거절하고, 읽는 중에도 크기를 확인
+class UploadLimitMiddleware:
+    """
+    요청 본문 크기를 제한하는 ASGI 미들웨어.
+
+    Content-Length가 제한을 넘으면 multipart 파싱(임시 파일 생성) 전에 바로 413으로 응답하고,
+    Content-Length가 없거나 실제 본문이 더 길면 받은 크기가 제한을 넘는 순간 413으로 중단합니다.
+
+    Args:
+        max_bytes (int): 기본 최대 크기.
+        path_limits (Dict[str, int]): 경로별 최대 크기 (예: 일괄 처리 엔드포인트).
+    """
+    def __init__(self, app: ASGIApp, max_bytes: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.max_bytes)
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            logger.info(f"업로드 크기 초과로 거절: {scope['path']} {int(content_length)} bytes (최대 {limit})")
+            response = JSONResponse(status_code=413, content={"detail": self._detail(limit)})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(413, detail=self._detail(limit))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _detail(limit: int) -> str:
+        return f"요청 크기가 너무 큽니다. (최대 {limit // (1024 * 1024)}MB)"
@@ -0,0 +1,294 @@
+# pronun_model/openai_call.py
+
+"""
+OpenAI 호출 공통 계층.
+
+STT/문법 보정/TTS/답변 생성/질의 임베딩 호출은 모두 call_openai()를 거칩니다.
+(langchain ChatOpenAI 호출도 SDK 재시도를 끄고 이 계층에서 재시도합니다.)
+
+- 단계별 제한 시간: 호출 1회가 OPENAI_TIMEOUT_<단계>초를 넘으면 취소하고 타임아웃으로 처리
+- 재시도: 429/5xx/타임아웃/연결 오류는 지터를 준 지수 대기 후 최대 OPENAI_MAX_RETRIES번 재시도
+  (429에 Retry-After가 있으면 그 시간 이상 대기)
+- 헤징(선택): 응답이 그 단계의 최근 p95 지연을 넘으면 같은 요청을 한 번 더 보내고 먼저 끝난 결과를 사용
+- 회로 차단: 서버 쪽 오류가 OPENAI_BREAKER_FAILURES번 연속되면 OPENAI_BREAKER_RESET초 동안 바로 503 반환,
+  이후 한 번 시도해 성공하면 복구
+- 오류 변환: OpenAI 예외를 로그로 남기고 상태 코드에 맞는 HTTPException으로 변환
+
+base_url은 AsyncOpenAI 기본 동작대로 OPENAI_BASE_URL 환경 변수를 따르므로 로컬 가짜 서버로 시험할 수 있습니다.
+"""
+
+from fastapi import HTTPException
+from openai import (
+    AsyncOpenAI,
+    AuthenticationError,
+    APIError,
+    APIStatusError,
+    APITimeoutError,
+    APIConnectionError,
+    RateLimitError,
+    BadRequestError,
+    OpenAIError,
+    ConflictError,
+    InternalServerError,
+    NotFoundError,
+    PermissionDeniedError,
+    UnprocessableEntityError
+)
+from pronun_model.openai_client import get_openai_client
+from pronun_model.config import (
+    OPENAI_TIMEOUT_STT,
+    OPENAI_TIMEOUT_CORRECTION,
+    OPENAI_TIMEOUT_TTS,
+    OPENAI_TIMEOUT_LLM,
+    OPENAI_TIMEOUT_EMBEDDING,
+    OPENAI_MAX_RETRIES,
+    OPENAI_RETRY_BASE,
+    OPENAI_RETRY_MAX,
+    OPENAI_HEDGE_ENABLED,
+    OPENAI_HEDGE_MIN_SAMPLES,
+    OPENAI_BREAKER_FAILURES,
+    OPENAI_BREAKER_RESET,
+)
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+import asyncio
+import logging
+import random
+import time
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LATENCY_WINDOW = 200  # p95 계산에 사용할 최근 응답 수
+
+# 예외 → (상태 코드, 오류 이름, 응답 메시지). 하위 클래스가 먼저 오도록 정렬
+_ERRORS = [
+    (AuthenticationError, 401, "인증 오류", "인증 오류: API 키를 확인해주세요."),
+    (PermissionDeniedError, 403, "권한 오류", "권한 오류: API 사용 권한을 확인해주세요."),
+    (RateLimitError, 429, "Rate Limit 초과", "요청 제한 초과: 요청 속도를 줄여주세요."),
+    (BadRequestError, 400, "잘못된 요청 오류", "잘못된 요청: 요청 데이터를 확인해주세요."),
+    (ConflictError, 409, "충돌 오류", "충돌 오류: 요청을 다시 시도해주세요."),
+    (InternalServerError, 502, "내부 서버 오류", "내부 서버 오류: 나중에 다시 시도해주세요."),
+    (NotFoundError, 404, "자원 미존재 오류", "자원이 존재하지 않습니다."),
+    (UnprocessableEntityError, 422, "처리 불가능한 엔티티 오류", "처리 불가능한 데이터입니다."),
+    (APITimeoutError, 504, "API 타임아웃 오류", "서버 응답 지연: 나중에 다시 시도해주세요."),
+    (asyncio.TimeoutError, 504, "제한 시간 초과", "서버 응답 지연: 나중에 다시 시도해주세요."),
+    (APIConnectionError, 503, "API 연결 오류", "연결 오류: 네트워크 상태를 확인해주세요."),
+    (APIError, 502, "API 오류", "서버 오류: 나중에 다시 시도해주세요."),
+    (OpenAIError, 500, "OpenAI 라이브러리 오류", "OpenAI 처리 중 알 수 없는 오류가 발생했습니다."),
+]
+
+
+@dataclass
+class _Stage:
+    label: str  # 로그/오류 메시지에 쓰는 이름 (예: "STT 변환")
+    timeout: float
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    calls: int = 0
+    retries: int = 0
+    hedges: int = 0
+    errors: int = 0
+    rejected: int = 0  # 회로 차단으로 바로 거절한 호출 수
+    consecutive_failures: int = 0
+    opened_at: Optional[float] = None  # 회로가 열린 시각 (닫혀 있으면 None)
+    probing: bool = False  # 회로가 열린 뒤 복구 확인 요청이 진행 중인지
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < OPENAI_HEDGE_MIN_SAMPLES:
+            return None
+        return _percentile(sorted(self.latencies), 0.95)
+
+
+def _percentile(ordered: list, q: float) -> Optional[float]:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else None
+
+
+_stages: Dict[str, _Stage] = {
+    "stt": _Stage("STT 변환", OPENAI_TIMEOUT_STT),
+    "correction": _Stage("문법 보정", OPENAI_TIMEOUT_CORRECTION),
+    "tts": _Stage("TTS 변환", OPENAI_TIMEOUT_TTS),
+    "llm": _Stage("답변 생성", OPENAI_TIMEOUT_LLM),
+    "embedding": _Stage("질의 임베딩", OPENAI_TIMEOUT_EMBEDDING),
+}
+
+
+def _is_retryable(e: BaseException) -> bool:
+    if isinstance(e, (RateLimitError, APITimeoutError, APIConnectionError, asyncio.TimeoutError)):
+        return True
+    return isinstance(e, APIStatusError) and e.status_code >= 500
+
+
+def _is_upstream_failure(e: BaseException) -> bool:
+    """회로 차단 대상: 요청 내용과 무관한 서버/네트워크 오류 (429 제외)"""
+    return _is_retryable(e) and not isinstance(e, RateLimitError)
+
+
+def _retry_delay(attempt: int, e: BaseException) -> float:
+    """지수 증가 + 전체 지터. 429의 Retry-After는 최소 대기 시간으로 사용"""
+    delay = random.uniform(0, min(OPENAI_RETRY_MAX, OPENAI_RETRY_BASE * 2 ** attempt))
+    if isinstance(e, RateLimitError):
+        try:
+            delay = max(delay, float(e.response.headers.get("retry-after", 0)))
+        except ValueError:
+            pass
+    return min(delay, OPENAI_RETRY_MAX)
+
+
+def _check_breaker(stage: _Stage) -> None:
+    if stage.opened_at is None:
+        return
+    remaining = stage.opened_at + OPENAI_BREAKER_RESET - time.monotonic()
+    if remaining > 0 or stage.probing:
+        stage.rejected += 1
+        raise HTTPException(
+            status_code=503,
+            detail=f"{stage.label} 서비스를 일시적으로 사용할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(max(1, int(remaining + 0.999)))},
+        )
+    # 대기 시간이 지나면 요청 하나만 통과시켜 복구 여부를 확인
+    stage.probing = True
+
+
+def _record_success(stage: _Stage, latency: float) -> None:
+    stage.latencies.append(latency)
+    stage.consecutive_failures = 0
+    if stage.opened_at is not None:
+        logger.info(f"{stage.label} 회로 복구")
+    stage.opened_at = None
+    stage.probing = False
+
+
+def _record_failure(stage: _Stage, e: BaseException) -> None:
+    if not _is_upstream_failure(e):
+        if stage.probing:
+            # 복구 확인 요청이 서버 오류 외의 이유로 실패하면 다음 요청이 다시 확인
+            stage.probing = False
+        return
+    stage.consecutive_failures += 1
+    if stage.probing or stage.consecutive_failures >= OPENAI_BREAKER_FAILURES:
+        if stage.opened_at is None or stage.probing:
+            logger.warning(f"{stage.label} 회로 차단: 연속 실패 {stage.consecutive_failures}회")
+        stage.opened_at = time.monotonic()
+        stage.probing = False
+
+
+def _to_http_exception(stage: _Stage, e: BaseException) -> HTTPException:
+    for error_type, status_code, name, detail in _ERRORS:
+        if isinstance(e, error_type):
+            logger.error(f"{stage.label} 중 {name} 발생: {e}", extra={
+                "errorType": type(e).__name__,
+                "error_message": str(e)
+            })
+            return HTTPException(status_code=status_code, detail=detail)
+    logger.error(f"{stage.label} 오류: {e}", extra={
+        "errorType": type(e).__name__,
+        "error_message": str(e)
+    })
+    return HTTPException(status_code=500, detail=f"{stage.label} 중 오류 발생")
+
+
+async def _cancel(tasks) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _attempt(stage: _Stage, make_call: Callable[[AsyncOpenAI], Awaitable[T]]) -> T:
+    """
+    호출 1회 (제한 시간 포함). 헤징이 켜져 있으면 p95 지연을 넘을 때 같은 요청을 하나 더 보내고
+    먼저 성공한 결과를 사용합니다. 두 요청이 모두 실패하면 마지막 오류를 올립니다.
+    """
+    client = get_openai_client()
+    hedge_after = stage.p95() if OPENAI_HEDGE_ENABLED else None
+    tasks = [asyncio.create_task(make_call(client))]
+    deadline = time.monotonic() + stage.timeout
+    try:
+        if hedge_after is not None and hedge_after < stage.timeout:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                stage.hedges += 1
+                logger.debug(f"{stage.label} 헤징 요청 전송 (p95 {hedge_after:.2f}초 초과)")
+                tasks.append(asyncio.create_task(make_call(client)))
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0.0, deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                raise asyncio.TimeoutError(f"{stage.timeout}초 안에 응답이 없습니다.")
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        await _cancel(tasks)
+
+
+async def call_openai(stage_name: str, make_call: Callable[[AsyncOpenAI], Awaitable[T]]) -> T:
+    """
+    OpenAI API 호출에 제한 시간, 재시도, 헤징, 회로 차단을 적용합니다.
+
+    Args:
+        stage_name (str): "stt", "correction", "tts", "llm", "embedding" 중 하나.
+        make_call: 공용 AsyncOpenAI 클라이언트를 받아 호출 코루틴을 만드는 함수.
+            (langchain 호출처럼 클라이언트를 쓰지 않는 경우 인자는 무시해도 됩니다.)
+            재시도/헤징 시 여러 번 호출되므로 매번 새 요청을 만들어야 합니다.
+
+    Returns:
+        make_call이 돌려준 API 응답.
+
+    Raises:
+        HTTPException: 재시도 후에도 실패했거나 회로가 차단된 경우.
+    """
+    stage = _stages[stage_name]
+    _check_breaker(stage)
+    stage.calls += 1
+
+    attempt = 0
+    while True:
+        started = time.monotonic()
+        try:
+            result = await _attempt(stage, make_call)
+        except asyncio.CancelledError:
+            if stage.probing:
+                stage.probing = False
+            raise
+        except Exception as e:
+            _record_failure(stage, e)
+            if attempt < OPENAI_MAX_RETRIES and _is_retryable(e) and stage.opened_at is None:
+                delay = _retry_delay(attempt, e)
+                attempt += 1
+                stage.retries += 1
+                logger.warning(f"{stage.label} 실패 ({type(e).__name__}), {delay:.2f}초 후 재시도 {attempt}/{OPENAI_MAX_RETRIES}")
+                await asyncio.sleep(delay)
+                continue
+            stage.errors += 1
+            raise _to_http_exception(stage, e) from e
+
+        _record_success(stage, time.monotonic() - started)
+        return result
+
+
+def openai_stats() -> dict:
+    """단계별 호출 수, 재시도/헤징/오류/차단 거절 수, p50/p95 지연, 회로 상태"""
+    stats = {}
+    for name, stage in _stages.items():
+        latencies = sorted(stage.latencies)
+        stats[name] = {
+            "calls": stage.calls,
+            "retries": stage.retries,
+            "hedges": stage.hedges,
+            "errors": stage.errors,
+            "rejected": stage.rejected,
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "circuit": "closed" if stage.opened_at is None else "open",
+        }
+    return stats
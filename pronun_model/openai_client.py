@@ -0,0 +1,67 @@
+# pronun_model/openai_client.py
+
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient
+from pronun_model.openai_config import OPENAI_API_KEY
+from pronun_model.config import (
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_KEEPALIVE_EXPIRY,
+    RATE_LIMIT_ENABLED,
+)
+from pronun_model import rate_limit
+from typing import Optional
+import httpx
+
+_http_client: Optional[httpx.AsyncClient] = None
+_sync_http_client: Optional[httpx.Client] = None
+_client: Optional[AsyncOpenAI] = None
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+    )
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    OpenAI 호출에 공통으로 사용하는 HTTP 커넥션 풀.
+    AsyncOpenAI와 langchain(ChatOpenAI, OpenAIEmbeddings)이 같은 풀과 keep-alive 연결을 사용합니다.
+    RATE_LIMIT_ENABLED이면 요청마다 모델별 RPM/TPM 한도를 확인합니다(rate_limit 참고).
+    """
+    global _http_client
+    if _http_client is None:
+        hooks = {"request": [rate_limit.pace_request], "response": [rate_limit.observe_response]}
+        _http_client = DefaultAsyncHttpxClient(
+            limits=_limits(),
+            event_hooks=hooks if RATE_LIMIT_ENABLED else None,
+        )
+    return _http_client
+
+def get_sync_http_client() -> httpx.Client:
+    """langchain 동기 호출(인덱스 생성 중 임베딩 등)용 HTTP 커넥션 풀. 같은 속도 제한을 적용합니다."""
+    global _sync_http_client
+    if _sync_http_client is None:
+        hooks = {"request": [rate_limit.pace_request_sync], "response": [rate_limit.observe_response_sync]}
+        _sync_http_client = DefaultHttpxClient(
+            limits=_limits(),
+            event_hooks=hooks if RATE_LIMIT_ENABLED else None,
+        )
+    return _sync_http_client
+
+def get_openai_client() -> AsyncOpenAI:
+    """재시도/제한 시간은 openai_call.call_openai()에서 처리하므로 SDK 자체 재시도는 끔"""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=get_http_client(), max_retries=0)
+    return _client
+
+async def close_openai_client() -> None:
+    global _client, _http_client, _sync_http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    if _sync_http_client is not None:
+        _sync_http_client.close()
+    _client = None
+    _http_client = None
+    _sync_http_client = None
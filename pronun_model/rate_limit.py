@@ -0,0 +1,318 @@
+# pronun_model/rate_limit.py
+
+"""
+OpenAI 호출 속도 조절 (모델별 토큰 버킷 + 우선순위 대기열).
+
+모든 OpenAI 요청은 공통 HTTP 클라이언트(openai_client)를 거치므로, 요청을 보내기 직전 httpx 이벤트 훅에서
+모델별 RPM/TPM 버킷의 한도를 확인합니다. 한도가 남아 있지 않으면 요청은 우선순위 대기열에서 기다리고,
+한도가 다시 차면 우선순위가 높은 요청(INTERACTIVE → BULK → BACKGROUND)부터, 같은 우선순위 안에서는 먼저 온 순서대로 보냅니다.
+인덱스 재생성이나 일괄 처리가 한도를 모두 써서 사용자 질문이 429를 받는 일을 막기 위한 것입니다.
+
+우선순위는 ContextVar로 전달되므로 호출하는 쪽에서 `with request_priority(Priority.BULK):`로 감싸면 됩니다.
+(기본값은 INTERACTIVE. run_blocking으로 넘긴 작업에도 그대로 전달됩니다.)
+그래도 429를 받으면 Retry-After 동안 해당 모델의 요청을 멈춥니다.
+"""
+
+from pronun_model.config import (
+    RATE_LIMIT_BURST_SECONDS,
+    RATE_LIMIT_WHISPER_RPM,
+    RATE_LIMIT_CHAT_RPM,
+    RATE_LIMIT_CHAT_TPM,
+    RATE_LIMIT_EMBEDDING_RPM,
+    RATE_LIMIT_EMBEDDING_TPM,
+    RATE_LIMIT_TTS_RPM,
+)
+from pronun_model.tokens import count_tokens
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+
+import httpx
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPLETION_TOKENS = 512  # max_tokens가 없는 채팅 요청의 예상 응답 토큰 수
+MESSAGE_OVERHEAD_TOKENS = 4  # 메시지마다 붙는 역할/구분 토큰
+MAX_POLL_SECONDS = 1.0  # 대기 중 한도를 다시 확인하는 최대 간격
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # 사용자 질문 (단일/스트리밍)
+    BULK = 1  # 일괄 처리 (batch)
+    BACKGROUND = 2  # 인덱스 생성/재생성, 변경 동기화
+
+
+_priority: ContextVar[Priority] = ContextVar("openai_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def request_priority(level: Priority) -> Iterator[None]:
+    """이 블록 안에서 보내는 OpenAI 요청의 우선순위 지정"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    """현재 컨텍스트(요청)의 우선순위"""
+    return _priority.get()
+
+
+class _Bucket:
+    """분당 한도를 초당 속도로 채우는 토큰 버킷. RATE_LIMIT_BURST_SECONDS초 분량까지 모아둘 수 있습니다."""
+
+    def __init__(self, per_minute: int, burst_seconds: float = RATE_LIMIT_BURST_SECONDS):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        """cost만큼 쓸 수 있을 때까지 남은 시간 (버킷보다 큰 요청은 가득 찼을 때 보냄)"""
+        self._refill(now)
+        cost = min(cost, self.capacity)
+        return 0.0 if self.tokens >= cost else (cost - self.tokens) / self.rate
+
+    def take(self, cost: float) -> None:
+        self.tokens -= min(cost, self.capacity)
+
+
+class _Waiter:
+    """대기 중인 요청 하나. 스레드(Event)와 이벤트 루프(Future) 양쪽에서 기다릴 수 있습니다."""
+
+    def __init__(self, priority: Priority, cost: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.priority = priority
+        self.cost = cost
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+        self._loop = loop
+        self.future = loop.create_future() if loop is not None else None
+        self.event = threading.Event() if loop is None else None
+
+    def grant(self) -> None:
+        self.granted = True
+        if self.future is not None:
+            self._loop.call_soon_threadsafe(_resolve, self.future)
+        else:
+            self.event.set()
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ModelLimiter:
+    """모델 하나의 RPM/TPM 버킷과 우선순위 대기열. 동기 스레드와 이벤트 루프에서 함께 사용합니다."""
+
+    def __init__(self, model: str, rpm: int, tpm: int = 0):
+        self.model = model
+        self.requests = _Bucket(rpm)
+        self.tokens = _Bucket(tpm) if tpm else None
+        self.granted = {level.name.lower(): 0 for level in Priority}
+        self.delayed = 0  # 한도 때문에 기다린 요청 수
+        self.wait_seconds = 0.0
+        self.throttled = 0  # 그래도 받은 429 수
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+
+    def _delay_locked(self, cost: int, now: float) -> float:
+        delay = max(0.0, self._paused_until - now, self.requests.wait_time(1, now))
+        if self.tokens is not None and cost:
+            delay = max(delay, self.tokens.wait_time(cost, now))
+        return delay
+
+    def _grant_locked(self) -> Optional[float]:
+        """
+        대기열 맨 앞부터 한도가 허락하는 만큼 요청을 보냅니다.
+
+        Returns:
+            Optional[float]: 맨 앞 요청이 보내질 때까지 남은 시간. 대기열이 비었으면 None.
+        """
+        now = time.monotonic()
+        while self._waiters:
+            waiter = self._waiters[0][2]
+            if waiter.cancelled:
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._delay_locked(waiter.cost, now)
+            if delay > 0:
+                return delay
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(waiter.cost)
+            waited = now - waiter.enqueued
+            if waited > 0.001:
+                self.delayed += 1
+                self.wait_seconds += waited
+            self.granted[waiter.priority.name.lower()] += 1
+            waiter.grant()
+        return None
+
+    def _enqueue(self, waiter: _Waiter) -> float:
+        with self._lock:
+            heapq.heappush(self._waiters, (waiter.priority, next(self._seq), waiter))
+            delay = self._grant_locked()
+        if not waiter.granted:
+            logger.debug(f"{self.model} 한도 대기: {delay:.2f}초, 대기 {len(self._waiters)}건")
+        return delay or 0.0
+
+    def _poll(self) -> float:
+        with self._lock:
+            return self._grant_locked() or 0.0
+
+    def acquire(self, priority: Priority, cost: int) -> None:
+        """한도가 날 때까지 현재 스레드를 멈춥니다 (langchain 동기 호출용)"""
+        waiter = _Waiter(priority, cost)
+        delay = self._enqueue(waiter)
+        while not waiter.granted:
+            waiter.event.wait(min(max(delay, 0.001), MAX_POLL_SECONDS))
+            if not waiter.granted:
+                delay = self._poll()
+
+    async def acquire_async(self, priority: Priority, cost: int) -> None:
+        """한도가 날 때까지 기다립니다. 취소되면 대기열에서 빠집니다."""
+        waiter = _Waiter(priority, cost, asyncio.get_running_loop())
+        delay = self._enqueue(waiter)
+        try:
+            while not waiter.granted:
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), min(max(delay, 0.001), MAX_POLL_SECONDS))
+                except asyncio.TimeoutError:
+                    delay = self._poll()
+        except asyncio.CancelledError:
+            with self._lock:
+                waiter.cancelled = not waiter.granted
+            raise
+
+    def pause(self, seconds: float) -> None:
+        """429를 받았을 때 Retry-After 동안 이 모델의 요청을 멈춤"""
+        with self._lock:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.warning(f"{self.model} 429 수신: {seconds:.1f}초 동안 요청을 멈춥니다.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = [w for _, _, w in self._waiters if not w.cancelled]
+            return {
+                "rpm": self.requests.per_minute,
+                "tpm": self.tokens.per_minute if self.tokens is not None else None,
+                "queued": {
+                    level.name.lower(): sum(1 for w in queued if w.priority == level) for level in Priority
+                },
+                "granted": dict(self.granted),
+                "delayed": self.delayed,
+                "avg_wait_seconds": round(self.wait_seconds / self.delayed, 3) if self.delayed else 0.0,
+                "throttled": self.throttled,
+            }
+
+
+_limiters: Dict[str, ModelLimiter] = {
+    "whisper-1": ModelLimiter("whisper-1", RATE_LIMIT_WHISPER_RPM),
+    "gpt-4o-mini": ModelLimiter("gpt-4o-mini", RATE_LIMIT_CHAT_RPM, RATE_LIMIT_CHAT_TPM),
+    "text-embedding-ada-002": ModelLimiter("text-embedding-ada-002", RATE_LIMIT_EMBEDDING_RPM, RATE_LIMIT_EMBEDDING_TPM),
+    "tts-1": ModelLimiter("tts-1", RATE_LIMIT_TTS_RPM),
+}
+
+
+def _chat_tokens(body: dict) -> int:
+    prompt = 0
+    for message in body.get("messages") or []:
+        content = message.get("content") or ""
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        prompt += count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+    completion = body.get("max_tokens") or body.get("max_completion_tokens") or DEFAULT_COMPLETION_TOKENS
+    return prompt + completion
+
+
+def _embedding_tokens(body: dict) -> int:
+    inputs = body.get("input") or []
+    if isinstance(inputs, str):
+        return count_tokens(inputs)
+    if inputs and isinstance(inputs[0], int):
+        return len(inputs)
+    # 문자열 목록 또는 토큰 ID 목록의 목록 (langchain은 토큰 ID로 보냄)
+    return sum(len(item) if isinstance(item, list) else count_tokens(item) for item in inputs)
+
+
+def _classify(request: httpx.Request) -> Tuple[Optional[ModelLimiter], int]:
+    """요청 경로와 본문으로 (모델 한도, 예상 토큰 수)를 구함. 한도를 관리하지 않는 요청이면 (None, 0)"""
+    path = request.url.path
+    if path.endswith("/audio/transcriptions") or path.endswith("/audio/translations"):
+        # multipart 본문은 읽지 않음 (Whisper는 whisper-1만 사용)
+        return _limiters.get("whisper-1"), 0
+    if not path.endswith(("/chat/completions", "/embeddings", "/audio/speech")):
+        return None, 0
+
+    try:
+        body = json.loads(request.content)
+    except (httpx.RequestNotRead, ValueError):
+        return None, 0
+    limiter = _limiters.get(body.get("model", ""))
+    if limiter is None or limiter.tokens is None:
+        return limiter, 0
+    if path.endswith("/chat/completions"):
+        return limiter, _chat_tokens(body)
+    return limiter, _embedding_tokens(body)
+
+
+def _retry_after(response: httpx.Response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("retry-after", 1)))
+    except ValueError:
+        return 1.0
+
+
+# httpx 이벤트 훅 (openai_client의 공통 클라이언트에 등록)
+async def pace_request(request: httpx.Request) -> None:
+    limiter, cost = _classify(request)
+    if limiter is not None:
+        await limiter.acquire_async(_priority.get(), cost)
+
+
+def pace_request_sync(request: httpx.Request) -> None:
+    limiter, cost = _classify(request)
+    if limiter is not None:
+        limiter.acquire(_priority.get(), cost)
+
+
+def _observe(response: httpx.Response) -> None:
+    if response.status_code == 429:
+        limiter, _ = _classify(response.request)
+        if limiter is not None:
+            limiter.pause(_retry_after(response))
+
+
+async def observe_response(response: httpx.Response) -> None:
+    _observe(response)
+
+
+def observe_response_sync(response: httpx.Response) -> None:
+    _observe(response)
+
+
+def rate_limit_stats() -> dict:
+    return {model: limiter.stats() for model, limiter in _limiters.items()}
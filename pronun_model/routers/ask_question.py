@@ -1,75 +1,401 @@
 # pronun_model/routers/ask_question.py
-import uuid, shutil, os, tempfile, logging
+import uuid, shutil, tempfile, logging, json, base64, asyncio, zipfile
 from pathlib import Path
+from typing import List, Literal, Optional, Tuple
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
-from pronun_model.utils.stt import STT
+from pronun_model.utils.stt import Transcript, transcribe
+from pronun_model.utils.correction_gate import decide_correction
+from pronun_model.utils.audio_preprocess import normalize_audio
 from pronun_model.utils.correct_text_with_llm import correct_text_with_llm
-from pronun_model.utils.qa import ask_question
-from pronun_model.utils.tts import TTS
-from pronun_model.schemas.feedback import AnswerResponse
+from pronun_model.utils.qa import ask_question, ask_question_stream
+from pronun_model.utils.tts import TTS, TTSPipeline, TTS_MODEL, TTS_VOICE
+from pronun_model.utils.tts_cache import TTSCache, get_tts_cache
+from pronun_model.utils.hot_audio import get_hot_audio, multipart_response
+from pronun_model.utils.mp3 import concat_mp3
+from pronun_model.utils.upload import AudioSource, UPLOAD_MAX_BYTES, UPLOAD_SPOOL_BYTES, UploadRoute, read_upload, release
+from pronun_model.config import (
+    CONVERT_TTS_DIR,
+    AUDIO_PREPROCESS_ENABLED,
+    CORRECTION_GATE_ENABLED,
+    BATCH_STT_CONCURRENCY,
+    BATCH_LLM_CONCURRENCY,
+    BATCH_TTS_CONCURRENCY,
+    BATCH_MAX_ITEMS,
+    BATCH_MAX_UNZIPPED_MB,
+)
+from pronun_model.schemas.feedback import AnswerResponse, BatchItemResponse, BatchItemError, CorrectionDecision
+from pronun_model.executor import run_blocking
+from pronun_model.admission import admit, stage
+from pronun_model.rate_limit import Priority, request_priority
 
-router = APIRouter()
+# 업로드 파일은 UPLOAD_SPOOL_MB까지 메모리에 두고 파싱 (upload.UploadRoute 참고)
+router = APIRouter(route_class=UploadRoute)
 logger = logging.getLogger(__name__)
 
-@router.post("/ask-question/", response_model=AnswerResponse, tags=["Q&A"])
+def _save_upload(fileobj, suffix: str) -> str:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        shutil.copyfileobj(fileobj, tmp)
+        return tmp.name
+
+def _audio_url(path) -> str:
+    """CONVERT_TTS_DIR 아래 파일 경로를 /tts/ URL로 변환 (예: /tts/cache/<hash>.mp3)"""
+    return "/tts/" + Path(path).resolve().relative_to(CONVERT_TTS_DIR.resolve()).as_posix()
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _prepare_audio(audio: AudioSource) -> Tuple[list, List[bool]]:
+    """
+    Whisper에 보낼 음성 조각: 모노/16 kHz/무음 제거/Opus로 정규화, 긴 음성은 분할 (비활성화 시 원본 그대로).
+    (조각 목록, 조각 경계별 겹침 여부) 반환
+    """
+    if not AUDIO_PREPROCESS_ENABLED:
+        return [audio], []
+    return await run_blocking(normalize_audio, audio)
+
+async def _correct(transcript: Transcript, use_correction: bool) -> Tuple[str, Optional[CorrectionDecision]]:
+    """
+    (선택) LLM 보정. 게이트가 켜져 있으면 신뢰도가 낮거나 문장이 이상한 결과만 보정합니다.
+    (질문, 보정 결정) 반환. use_correction=False면 결정은 None
+    """
+    if not use_correction:
+        return transcript.text, None
+
+    if CORRECTION_GATE_ENABLED:
+        decision = decide_correction(transcript)
+    else:
+        decision = CorrectionDecision(applied=True, reason="보정 게이트 비활성화")
+    logger.info(f"LLM 보정 {'실행' if decision.applied else '생략'}: {decision.reason}", extra={
+        "correction_applied": decision.applied,
+        "correction_reason": decision.reason,
+    })
+    if not decision.applied:
+        return transcript.text, decision
+
+    try:
+        async with stage("llm"):
+            return await correct_text_with_llm(transcript.text), decision
+    except HTTPException:
+        return transcript.text, CorrectionDecision(applied=False, reason=f"{decision.reason}, 보정 실패로 원문 사용")
+
+async def _transcribe(audio: AudioSource, use_correction: bool):
+    """음성 정규화 → STT 변환 후 (선택) LLM 보정. (원문, 질문, 보정 결정) 반환"""
+    async with stage("stt"):
+        transcript = await transcribe(*await _prepare_audio(audio))
+    if not transcript:
+        raise HTTPException(500, detail="STT 변환에 실패했습니다.")
+
+    question, decision = await _correct(transcript, use_correction)
+    return transcript.text, question, decision
+
+@router.post(
+    "/ask-question/",
+    response_model=AnswerResponse,
+    tags=["Q&A"],
+    responses={200: {"content": {"multipart/mixed": {}}, "description": "audio=multipart이면 JSON 파트 + audio/mpeg 파트"}},
+)
 async def ask_question_with_audio(
     question_audio: UploadFile = File(...),
     use_correction: bool = Query(
         True,
-        description="LLM 보정 사용 여부 (False면 STT 결과를 그대로 질문으로 사용)"
-    )
+        description="LLM 보정 사용 여부 (True면 신뢰도가 낮은 STT 결과만 보정, False면 STT 결과를 그대로 질문으로 사용)"
+    ),
+    audio: Literal["url", "multipart"] = Query(
+        "url",
+        description="음성 전달 방식 (url: audio_url로 따로 받음, multipart: 응답 하나에 JSON과 MP3를 함께 담음)"
+    ),
 ):
     # 1) 고유 ID 생성
     request_id = uuid.uuid4().hex
 
-    # 2) 오디오 임시 저장
-    suffix = Path(question_audio.filename).suffix
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        shutil.copyfileobj(question_audio.file, tmp)
-        tmp_path = tmp.name
-
+    # 입장 제어: 동시 처리 수를 넘으면 대기, 대기열이 가득 차거나 오래 기다리면 429/503
+    ticket = await admit()
+    question_data = None
     try:
-        # 3) STT 변환
-        raw_text = STT(tmp_path)
-        if not raw_text:
-            raise HTTPException(500, detail="STT 변환에 실패했습니다.")
+        # 2) 오디오 받기 (UPLOAD_SPOOL_MB 이하는 메모리로, 그보다 크면 디스크의 임시 파일 경로로)
+        question_data = await read_upload(question_audio)
 
-        # 4) (선택) LLM 보정
-        if use_correction:
-            try:
-                question = correct_text_with_llm(raw_text)
-            except HTTPException:
-                question = raw_text
-        else:
-            question = raw_text
+        # 3) STT 변환 + 4) (선택) LLM 보정
+        _, question, correction = await _transcribe(question_data, use_correction)
 
         # 5) Q&A
-        result = ask_question(question)
+        async with stage("llm"):
+            result = await ask_question(question)
         answer = result["answer"]  # 답변 텍스트
         hospitals = result.get("hospitals", [])  # 병원 목록
 
-        # 6) TTS 생성
-        tts_path = TTS(answer, request_id)
-        if not os.path.exists(tts_path):
-            raise HTTPException(500, detail="TTS 음성 파일 생성에 실패했습니다.")
+        # 6) TTS 생성 (실패하면 TTS()가 HTTPException을 발생시킴. 답변 전체 음성은 문장별 캐시를 이어 붙여
+        #    제공하므로 디스크에 파일이 없을 수 있음)
+        async with stage("tts"):
+            tts_path = await TTS(answer, request_id)
 
-        # 7) 클라이언트에 제공할 URL 생성
-        filename = Path(tts_path).name
-        audio_url = f"/tts/{filename}"
+        # 7) 클라이언트에 제공할 URL 생성 (같은 답변은 같은 캐시 파일을 가리킴)
+        audio_url = _audio_url(tts_path)
 
         # 8) JSON 응답
-        return AnswerResponse(
+        response = AnswerResponse(
             video_id=request_id,
             question=question,
             answer=answer,
             hospitals=hospitals,  # 새로 추가된 필드
-            audio_url=audio_url
+            audio_url=audio_url,
+            correction=correction,
+        )
+        if audio == "url":
+            return response
+
+        # 9) multipart: 음성을 응답에 직접 담아 /tts 추가 요청을 없앰
+        cache = get_tts_cache()
+        key = Path(tts_path).stem
+        hot = await run_blocking(cache.load_hot, key)
+        if hot is None:
+            raise HTTPException(500, detail="TTS 음성 파일 생성에 실패했습니다.")
+        return multipart_response(response, hot.data, f"{key}.mp3")
+    finally:
+        ticket.release()
+        if question_data is not None:
+            await run_blocking(release, question_data)
+
+
+@router.post("/ask-question/stream/", tags=["Q&A"])
+async def ask_question_with_audio_stream(
+    question_audio: UploadFile = File(...),
+    use_correction: bool = Query(
+        True,
+        description="LLM 보정 사용 여부 (True면 신뢰도가 낮은 STT 결과만 보정, False면 STT 결과를 그대로 질문으로 사용)"
+    )
+):
+    """
+    /ask-question/의 스트리밍(SSE) 버전. 결과가 생성되는 대로 다음 순서로 이벤트를 보냅니다.
+
+    - transcript: {"video_id", "raw_text", "question", "correction"}
+    - answer: {"delta"} (LLM 답변 조각, 여러 번)
+    - hospitals: {"answer", "hospitals"} (정리된 전체 답변과 병원 목록)
+    - audio: {"seq", "data"} (문장 단위 base64 MP3, 여러 번)
+    - done: {"audio_url"}
+    - error: {"status_code", "detail"} (오류 발생 시 마지막 이벤트)
+    """
+    request_id = uuid.uuid4().hex
+
+    # 입장 제어는 스트리밍 전에 해서 거절 시 429/503 상태 코드로 응답
+    ticket = await admit()
+    try:
+        # 응답 스트리밍이 시작되기 전에 업로드 파일을 읽음 (요청이 끝나면 UploadFile은 닫힘)
+        audio = await read_upload(question_audio)
+    except BaseException:
+        ticket.release()
+        raise
+
+    async def events():
+        # TTS 단계 자리는 문장별 API 호출 동안에만 잡음 (음성 이벤트를 보내는 동안에는 반납)
+        tts_pipeline = TTSPipeline(slot=lambda: stage("tts"))
+        producer = None
+        try:
+            raw_text, question, correction = await _transcribe(audio, use_correction)
+            yield _sse("transcript", {
+                "video_id": request_id,
+                "raw_text": raw_text,
+                "question": question,
+                "correction": correction.model_dump() if correction else None,
+            })
+
+            # 답변 문장이 완성되는 대로 TTS 변환을 시작 (오디오 이벤트는 hospitals 이후에 전송).
+            # LLM 단계 자리는 LLM 응답을 읽는 동안에만 잡고, 클라이언트에는 대기열을 거쳐 보냄
+            # (클라이언트가 느리게 읽어도 다른 요청의 LLM 자리를 막지 않도록)
+            items: asyncio.Queue = asyncio.Queue()
+
+            async def generate():
+                async with stage("llm"):
+                    async for item in ask_question_stream(question):
+                        if item["type"] == "delta":
+                            tts_pipeline.feed(item["text"])
+                        items.put_nowait(item)
+
+            producer = asyncio.create_task(generate())
+            producer.add_done_callback(lambda _: items.put_nowait(None))
+            result = None
+            while (item := await items.get()) is not None:
+                if item["type"] == "delta":
+                    yield _sse("answer", {"delta": item["text"]})
+                else:
+                    result = item
+            await producer  # LLM 단계 오류를 여기서 다시 발생
+            tts_pipeline.close()
+            yield _sse("hospitals", {"answer": result["answer"], "hospitals": result["hospitals"]})
+
+            segments = []
+            async for chunk in tts_pipeline:
+                yield _sse("audio", {"seq": len(segments), "data": base64.b64encode(chunk).decode("ascii")})
+                segments.append(chunk)
+
+            # 스트리밍한 음성도 /tts/ 경로로 다시 받을 수 있도록 기록 (문장별 음성은 이미 캐시에 있으므로
+            # 결합한 음성은 디스크에 다시 쓰지 않고 문장 목록만 남김)
+            key = TTSCache.key(result["answer"], TTS_MODEL, TTS_VOICE, 1.0)
+            audio_data = await run_blocking(concat_mp3, segments)
+            audio_path = await run_blocking(get_tts_cache().put_joined, key, tts_pipeline.keys, request_id)
+            get_hot_audio().put(key, audio_data)
+            yield _sse("done", {"audio_url": _audio_url(audio_path)})
+
+        except HTTPException as e:
+            yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.error(f"스트리밍 응답 중 오류 발생: {e}", extra={
+                "errorType": type(e).__name__,
+                "error_message": str(e)
+            })
+            yield _sse("error", {"status_code": 500, "detail": "서버 내부 오류가 발생했습니다."})
+        finally:
+            if producer is not None and not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+            await tts_pipeline.aclose()
+            ticket.release()
+            await run_blocking(release, audio)
+
+    def cleanup():
+        ticket.release()
+        release(audio)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # 스트림이 시작되지 않고 끝난 경우에도 입장권 반납과 임시 파일 삭제 (중복 호출은 무시됨)
+        background=BackgroundTask(cleanup),
+    )
+
+
+# 일괄 처리 단계별 동시 실행 수 (프로세스 전체에서 공유)
+_batch_stt = asyncio.Semaphore(BATCH_STT_CONCURRENCY)
+_batch_llm = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+_batch_tts = asyncio.Semaphore(BATCH_TTS_CONCURRENCY)
+
+AUDIO_SUFFIXES = {".mp3", ".mp4", ".mpeg", ".mpga", ".m4a", ".wav", ".webm", ".ogg", ".flac"}
+
+def _extract_zip(fileobj) -> List[Tuple[str, AudioSource]]:
+    """
+    zip 안의 음성 파일을 (파일 이름, 음성) 목록으로 반환.
+    UPLOAD_SPOOL_BYTES 이하인 파일은 메모리로 읽고, 그보다 큰 파일만 임시 파일로 풀어 경로를 돌려줌
+    """
+    items = []
+    try:
+        with zipfile.ZipFile(fileobj) as archive:
+            infos = [
+                info for info in archive.infolist()
+                if not info.is_dir() and Path(info.filename).suffix.lower() in AUDIO_SUFFIXES
+                and not Path(info.filename).name.startswith(".")
+            ]
+            if sum(info.file_size for info in infos) > BATCH_MAX_UNZIPPED_MB * 1024 * 1024:
+                raise HTTPException(413, detail="압축 해제 후 크기가 너무 큽니다.")
+            if any(info.file_size > UPLOAD_MAX_BYTES for info in infos):
+                raise HTTPException(413, detail=f"음성 파일은 최대 {UPLOAD_MAX_BYTES // (1024 * 1024)}MB까지 처리할 수 있습니다.")
+            for info in infos:
+                if info.file_size <= UPLOAD_SPOOL_BYTES:
+                    items.append((info.filename, (Path(info.filename).name, archive.read(info))))
+                else:
+                    with archive.open(info) as src:
+                        items.append((info.filename, _save_upload(src, Path(info.filename).suffix)))
+    except zipfile.BadZipFile as e:
+        raise HTTPException(400, detail="올바른 zip 파일이 아닙니다.") from e
+    except Exception:
+        for _, audio in items:
+            release(audio)
+        raise
+    return items
+
+async def _process_batch_item(index: int, filename: str, audio: AudioSource, use_correction: bool) -> BatchItemResponse:
+    """음성 파일 하나를 STT → (보정) → RAG → TTS 순서로 처리. 단계마다 해당 단계의 동시 실행 수를 지킴"""
+    video_id = uuid.uuid4().hex
+    try:
+        async with _batch_stt, stage("stt"):
+            transcript = await transcribe(*await _prepare_audio(audio))
+        if not transcript:
+            raise HTTPException(500, detail="STT 변환에 실패했습니다.")
+
+        async with _batch_llm:
+            question, correction = await _correct(transcript, use_correction)
+            async with stage("llm"):
+                result = await ask_question(question)
+
+        async with _batch_tts, stage("tts"):
+            tts_path = await TTS(result["answer"], video_id)
+
+        return BatchItemResponse(
+            index=index,
+            filename=filename,
+            video_id=video_id,
+            question=question,
+            answer=result["answer"],
+            hospitals=result.get("hospitals", []),
+            audio_url=_audio_url(tts_path),
+            correction=correction,
         )
 
+    except HTTPException as e:
+        return BatchItemResponse(index=index, filename=filename, video_id=video_id,
+                                 error=BatchItemError(status_code=e.status_code, detail=str(e.detail)))
+    except Exception as e:
+        logger.error(f"일괄 처리 항목 오류 ({filename}): {e}", extra={
+            "errorType": type(e).__name__,
+            "error_message": str(e)
+        })
+        return BatchItemResponse(index=index, filename=filename, video_id=video_id,
+                                 error=BatchItemError(status_code=500, detail="서버 내부 오류가 발생했습니다."))
     finally:
-        # 임시 파일 정리
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        await run_blocking(release, audio)
+
+
+@router.post("/ask-question/batch/", tags=["Q&A"])
+async def ask_question_batch(
+    files: List[UploadFile] = File(..., description="음성 파일 여러 개 또는 음성 파일을 담은 zip"),
+    use_correction: bool = Query(
+        True,
+        description="LLM 보정 사용 여부 (True면 신뢰도가 낮은 STT 결과만 보정, False면 STT 결과를 그대로 질문으로 사용)"
+    )
+):
+    """
+    여러 음성 질문을 한 번에 처리합니다. 항목들은 STT/LLM/TTS 단계별 동시 실행 수 안에서
+    파이프라인으로 처리되며(한 항목이 LLM 단계일 때 다음 항목은 STT 진행), 결과는 항목별로
+    처리가 끝나는 대로 NDJSON(한 줄에 BatchItemResponse 하나)으로 전송됩니다.
+    """
+    # 응답 스트리밍이 시작되기 전에 업로드 파일을 모두 읽음
+    items: List[Tuple[str, AudioSource]] = []
+    try:
+        for upload in files:
+            if Path(upload.filename).suffix.lower() == ".zip":
+                items.extend(await run_blocking(_extract_zip, upload.file))
+            else:
+                items.append((upload.filename, await read_upload(upload)))
+            if len(items) > BATCH_MAX_ITEMS:
+                raise HTTPException(413, detail=f"한 번에 최대 {BATCH_MAX_ITEMS}개까지 처리할 수 있습니다.")
+        if not items:
+            raise HTTPException(400, detail="처리할 음성 파일이 없습니다.")
+    except Exception:
+        for _, audio in items:
+            await run_blocking(release, audio)
+        raise
+
+    async def results():
+        # 작업은 생성 시점의 contextvars를 복사하므로, 일괄 처리의 OpenAI 요청은 모두 BULK 우선순위로 나감
+        with request_priority(Priority.BULK):
+            tasks = [
+                asyncio.create_task(_process_batch_item(index, filename, audio, use_correction))
+                for index, (filename, audio) in enumerate(items)
+            ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                yield item.model_dump_json() + "\n"
+        finally:
+            # 클라이언트 연결이 끊기면 남은 작업 취소 (시작 전에 취소된 항목의 임시 파일도 정리)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for _, audio in items:
+                await run_blocking(release, audio)
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
@@ -2,7 +2,9 @@
 
 from fastapi import APIRouter, HTTPException
 from pronun_model.config import UPLOAD_DIR
-from pronun_model.schemas.feedback import DeleteResponse
+from pronun_model.schemas.feedback import DeleteResponse, TTSDeleteResponse
+from pronun_model.utils.tts_cache import get_tts_cache
+from pronun_model.executor import run_blocking
 import logging
 
 router = APIRouter()
@@ -25,3 +27,26 @@ async def delete_video(video_id: str):
             raise HTTPException(500, detail=f"{f.name} 삭제 실패") from e
 
     return DeleteResponse(video_id=video_id, message="삭제 완료")
+
+
+@router.delete("/delete-tts/{video_id}", response_model=TTSDeleteResponse)
+async def delete_tts(video_id: str):
+    """
+    video_id 요청이 받은 TTS 음성 파일을 모두 삭제합니다.
+    같은 답변을 받은 다른 요청이 있으면 그 파일은 남겨두고 이 요청의 참조만 지웁니다.
+    """
+    try:
+        # 캐시에 기록된 이 요청의 참조만 지우므로 video_id가 접두사로 겹치는 다른 요청의 음성은 남음
+        result = await run_blocking(lambda: get_tts_cache().delete_owner(video_id))
+    except Exception as e:
+        logger.error(f"{video_id} TTS 삭제 실패: {e}", extra={
+            "errorType": type(e).__name__,
+            "error_message": str(e)
+        })
+        raise HTTPException(500, detail="TTS 음성 삭제 실패") from e
+    if result is None:
+        raise HTTPException(404, detail="삭제할 TTS 음성을 찾을 수 없습니다.")
+
+    logger.info(f"{video_id} TTS 삭제: {result['deleted_files']}개, {result['freed_bytes']} bytes, "
+                f"공유 중이라 남긴 파일 {result['shared_files']}개")
+    return TTSDeleteResponse(video_id=video_id, **result)
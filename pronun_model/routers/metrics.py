@@ -0,0 +1,89 @@
+# pronun_model/routers/metrics.py
+
+from fastapi import APIRouter, Request, Response
+
+from pronun_model.metrics import MetricFamily, OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE, render
+from pronun_model.utils.tts_cache import get_tts_cache
+from pronun_model.utils.hot_audio import get_hot_audio
+from pronun_model.utils.answer_cache import get_answer_cache
+from pronun_model.utils.qa import get_embeddings
+from pronun_model.openai_call import openai_stats
+from pronun_model.admission import admission_stats
+from pronun_model.rate_limit import rate_limit_stats
+from pronun_model.executor import run_blocking
+
+router = APIRouter()
+
+
+def _cache_families() -> list:
+    requests = MetricFamily("pronun_cache_requests", "counter", "캐시 조회 수 (result: hit, miss)")
+    entries = MetricFamily("pronun_cache_entries", "gauge", "캐시 항목 수")
+    size = MetricFamily("pronun_cache_bytes", "gauge", "캐시 사용 용량 (bytes)")
+    caches = {
+        "answer": get_answer_cache().stats(),
+        "tts": get_tts_cache().stats(),
+        "tts_hot": get_hot_audio().stats(),
+        "embedding": get_embeddings().stats(),
+    }
+    for name, stats in caches.items():
+        requests.add(stats["hits"], "_total", cache=name, result="hit")
+        requests.add(stats["misses"], "_total", cache=name, result="miss")
+        if "entries" in stats:
+            entries.add(stats["entries"], cache=name)
+        if "bytes" in stats:
+            size.add(stats["bytes"], cache=name)
+
+    reclaimed = MetricFamily("pronun_tts_reclaimed_bytes", "counter", "TTS 정리로 삭제한 용량 (reason: ttl, quota, orphan, deleted)")
+    for reason, counts in caches["tts"]["reclaimed"].items():
+        reclaimed.add(counts["bytes"], "_total", reason=reason)
+    return [requests, entries, size, reclaimed]
+
+
+def _openai_families() -> list:
+    families = {
+        field: MetricFamily(f"pronun_openai_{field}", "counter", f"OpenAI 호출 단계별 {label} 수")
+        for field, label in [("calls", "호출"), ("retries", "재시도"), ("hedges", "헤징 요청"),
+                             ("errors", "실패"), ("rejected", "회로 차단으로 거절한")]
+    }
+    circuit = MetricFamily("pronun_openai_circuit_open", "gauge", "회로 차단 상태 (1: open)")
+    for stage, stats in openai_stats().items():
+        for field, family in families.items():
+            family.add(stats[field], "_total", stage=stage)
+        circuit.add(0 if stats["circuit"] == "closed" else 1, stage=stage)
+
+    throttled = MetricFamily("pronun_rate_limit_throttled", "counter", "속도 조절 후에도 받은 429 수")
+    queued = MetricFamily("pronun_rate_limit_queued", "gauge", "모델별 한도 대기 중인 OpenAI 요청 수")
+    for model, stats in rate_limit_stats().items():
+        throttled.add(stats["throttled"], "_total", model=model)
+        for priority, count in stats["queued"].items():
+            queued.add(count, model=model, priority=priority)
+    return [*families.values(), circuit, throttled, queued]
+
+
+def _admission_families() -> list:
+    active = MetricFamily("pronun_admission_active", "gauge", "처리 중인 요청 수")
+    queued = MetricFamily("pronun_admission_queued", "gauge", "대기 중인 요청 수")
+    shed = MetricFamily("pronun_admission_shed", "counter", "과부하로 거절한 요청 수 (reason: queue_full, timeout)")
+    stats = admission_stats()
+    limiters = {"admission": stats["admission"], **stats["stages"]}
+    for name, limiter in limiters.items():
+        active.add(limiter["active"], limiter=name)
+        queued.add(limiter["queued"], limiter=name)
+        shed.add(limiter["rejected"], "_total", limiter=name, reason="queue_full")
+        shed.add(limiter["timed_out"], "_total", limiter=name, reason="timeout")
+    return [active, queued, shed]
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """
+    Prometheus 지표. 단계별 처리 시간 히스토그램, LLM 토큰/오류 카운터와
+    캐시 적중, OpenAI 재시도/오류, 입장 제어 대기열을 함께 내보냅니다.
+    Accept에 application/openmetrics-text가 있으면 request_id exemplar를 포함한 OpenMetrics 형식으로 응답합니다.
+    """
+    openmetrics = "application/openmetrics-text" in request.headers.get("accept", "")
+    # 캐시가 아직 없으면 생성하면서 디스크를 읽으므로 스레드 풀에서 수집
+    body = await run_blocking(
+        lambda: render([*_cache_families(), *_openai_families(), *_admission_families()], openmetrics=openmetrics)
+    )
+    return Response(content=body, media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
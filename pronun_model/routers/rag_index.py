@@ -0,0 +1,28 @@
+# pronun_model/routers/rag_index.py
+
+import logging
+
+from fastapi import APIRouter, HTTPException
+
+from pronun_model.utils.qa import refresh_retriever
+from pronun_model.schemas.feedback import RefreshResponse
+from pronun_model.executor import run_blocking
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.post("/refresh-index", response_model=RefreshResponse)
+async def refresh_index():
+    """
+    MongoDB 데이터로 RAG 인덱스를 다시 생성하여 교체합니다.
+    """
+    try:
+        await run_blocking(refresh_retriever)
+    except Exception as e:
+        logger.error(f"인덱스 갱신 실패: {e}", extra={
+            "errorType": type(e).__name__,
+            "error_message": str(e)
+        })
+        raise HTTPException(500, detail="인덱스 갱신에 실패했습니다.") from e
+
+    return RefreshResponse(success=True, message="인덱스 갱신 완료")
@@ -0,0 +1,44 @@
+# pronun_model/routers/stats.py
+
+from fastapi import APIRouter
+
+from pronun_model.utils.tts_cache import get_tts_cache
+from pronun_model.utils.hot_audio import get_hot_audio
+from pronun_model.utils.answer_cache import get_answer_cache
+from pronun_model.utils.qa import get_embeddings
+from pronun_model.utils.token_usage import usage_stats
+from pronun_model.openai_call import openai_stats
+from pronun_model.admission import admission_stats
+from pronun_model.rate_limit import rate_limit_stats
+from pronun_model.executor import run_blocking
+
+router = APIRouter()
+
+@router.get("/cache-stats")
+async def cache_stats():
+    """
+    캐시별 적중/미스 횟수와 적중률, 사용 용량, 모델별 LLM 토큰 사용량(프롬프트 캐시 적중 포함),
+    OpenAI 호출 단계별 재시도/헤징/오류 수와 지연(p50/p95), 회로 차단 상태를 반환합니다.
+    """
+    # 캐시가 아직 없으면 생성하면서 디스크를 읽으므로 스레드 풀에서 실행
+    return await run_blocking(_cache_stats)
+
+
+def _cache_stats() -> dict:
+    return {
+        "answer": get_answer_cache().stats(),
+        "tts": get_tts_cache().stats(),
+        "tts_hot": get_hot_audio().stats(),
+        "embedding": get_embeddings().stats(),
+        "llm_tokens": usage_stats(),
+        "openai": openai_stats(),
+    }
+
+
+@router.get("/queue-stats")
+async def queue_stats():
+    """
+    질문 요청 입장 제어와 STT/LLM/TTS 단계별 처리 중/대기 중인 요청 수, 거절 횟수,
+    OpenAI 모델별 RPM/TPM 한도와 우선순위별 대기/전송 수를 반환합니다.
+    """
+    return {**admission_stats(), "rate_limits": rate_limit_stats()}
@@ -1,7 +1,21 @@
-from .feedback import UploadResponse, AnswerResponse, DeleteResponse
+from .feedback import (
+    UploadResponse,
+    CorrectionDecision,
+    AnswerResponse,
+    DeleteResponse,
+    TTSDeleteResponse,
+    RefreshResponse,
+    BatchItemError,
+    BatchItemResponse,
+)
 
 __all__ = [
     "UploadResponse",
+    "CorrectionDecision",
     "AnswerResponse",
     "DeleteResponse",
+    "TTSDeleteResponse",
+    "RefreshResponse",
+    "BatchItemError",
+    "BatchItemResponse",
 ]
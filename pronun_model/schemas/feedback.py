@@ -7,13 +7,43 @@ class UploadResponse(BaseModel):
     video_id: str
     message: str
 
+class CorrectionDecision(BaseModel):
+    applied: bool    # LLM 보정을 했는지
+    reason: str      # 보정하거나 생략한 이유
+
 class AnswerResponse(BaseModel):
     video_id: str
     question: str
     answer: str
     hospitals: List[str]  # 병원 이름 목록을 포함하는 새 필드
     audio_url: str   # 추가
+    correction: Optional[CorrectionDecision] = None  # use_correction=False면 None
 
 class DeleteResponse(BaseModel):
     success: bool
-    message: str
\ No newline at end of file
+    message: str
+
+class TTSDeleteResponse(BaseModel):
+    video_id: str
+    deleted_files: int  # 삭제한 음성 파일 수
+    freed_bytes: int
+    shared_files: int   # 다른 요청도 사용 중이라 남겨둔 파일 수
+
+class RefreshResponse(BaseModel):
+    success: bool
+    message: str
+
+class BatchItemError(BaseModel):
+    status_code: int
+    detail: str
+
+class BatchItemResponse(BaseModel):
+    index: int       # 업로드 순서 (결과는 처리가 끝난 순서로 전송)
+    filename: str
+    video_id: Optional[str] = None
+    question: Optional[str] = None
+    answer: Optional[str] = None
+    hospitals: List[str] = []
+    audio_url: Optional[str] = None
+    correction: Optional[CorrectionDecision] = None
+    error: Optional[BatchItemError] = None
@@ -0,0 +1,55 @@
+# pronun_model/tokens.py
+
+"""
+토큰 수 계산 (tiktoken).
+
+프롬프트 구성(utils.prompt)과 OpenAI 호출 속도 조절(rate_limit)이 함께 사용하므로,
+utils 패키지(→ stt → openai_call → openai_client → rate_limit)를 거치지 않도록 패키지 최상위에 둡니다.
+"""
+
+import logging
+import math
+import re
+
+try:
+    import tiktoken
+except ImportError:  # 토크나이저가 없으면 글자 수로 추정
+    tiktoken = None
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+PROMPT_MODEL = "gpt-4o-mini"
+
+_encoding = None
+_encoding_failed = False
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def get_encoding():
+    """tiktoken 인코딩 (처음 호출 시 로드, 실패하면 이후 추정치 사용). 서비스 시작 시 미리 호출합니다."""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed and tiktoken is not None:
+        try:
+            try:
+                _encoding = tiktoken.encoding_for_model(PROMPT_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            # 인코딩 파일을 내려받지 못하는 환경 (오프라인 등)
+            _encoding_failed = True
+            logger.warning(f"tiktoken 인코딩 로드 실패, 글자 수로 토큰을 추정합니다: {e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수.
+
+    tiktoken을 사용할 수 없으면 한글 한 글자 = 1토큰, 그 밖의 문자 4글자 = 1토큰으로 넉넉하게 추정합니다.
+    """
+    encoding = get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    hangul = len(_HANGUL.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 4)
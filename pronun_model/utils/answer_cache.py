@@ -0,0 +1,191 @@
+# pronun_model/utils/answer_cache.py
+
+from ..config import (
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_SLOT_MINUTES,
+)
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+import copy
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+# (요일, 시간 슬롯, 인덱스 버전)
+Bucket = Tuple[int, int, str]
+
+
+def normalize_question(text: str) -> str:
+    """정확히 일치하는지 비교할 질문 형태 (띄어쓰기, 문장 부호, 대소문자 차이 무시)"""
+    return re.sub(r"[\W_]+", "", unicodedata.normalize("NFKC", text)).lower()
+
+
+@dataclass
+class AnswerKey:
+    """
+    답변 캐시 조회 키. signature와 vector 중 하나만 사용합니다.
+
+    - signature: 증상 사전 매칭 결과 (증상 ID, 질문에 나온 병원 ID, normalize_question한 질문).
+      같은 증상이라도 묻는 내용이 다를 수 있으므로 질문까지 정확히 일치하는 항목만 사용.
+    - vector: 사전 매칭에 실패한 질문의 임베딩. 유사도로 비교.
+    """
+    bucket: Bucket
+    signature: Optional[tuple] = None
+    vector: Optional[List[float]] = None
+
+
+@dataclass
+class _Entry:
+    bucket: Bucket
+    vector: Optional[np.ndarray]  # 정규화된 질문 임베딩 (사전 매칭 항목은 None)
+    signature: Optional[tuple]
+    result: dict
+    expires_at: float
+
+
+class AnswerCache:
+    """
+    의미 기반 답변 캐시.
+
+    질문 임베딩의 코사인 유사도가 ANSWER_CACHE_THRESHOLD 이상인 이전 질문이 같은 버킷에 있으면
+    저장된 {"answer", "hospitals"}를 그대로 돌려줍니다. 증상 사전에서 매칭된 질문은 임베딩 없이
+    매칭 결과와 질문(띄어쓰기, 문장 부호 제외)이 모두 같은 이전 질문의 답을 사용합니다. 답변은 현재 요일/시간(영업 여부)과
+    인덱스 내용에 따라 달라지므로 (요일, ANSWER_CACHE_SLOT_MINUTES분 단위 시간 슬롯, 인덱스 버전)이
+    같은 항목끼리만 비교합니다. 항목은 ANSWER_CACHE_TTL초 후 만료되며, 개수가
+    ANSWER_CACHE_MAX_ENTRIES를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다.
+    """
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl: float = ANSWER_CACHE_TTL,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        slot_minutes: int = ANSWER_CACHE_SLOT_MINUTES,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.slot_minutes = slot_minutes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._ids = count()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[Bucket, List[int]] = {}
+        self._signatures: Dict[Tuple[Bucket, tuple], int] = {}
+
+    def bucket(self, now: datetime, version: str) -> Bucket:
+        slot = (now.hour * 60 + now.minute) // self.slot_minutes
+        return now.weekday(), slot, version
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        if entry.signature is not None:
+            del self._signatures[(entry.bucket, entry.signature)]
+            return
+        ids = self._buckets[entry.bucket]
+        ids.remove(entry_id)
+        if not ids:
+            del self._buckets[entry.bucket]
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry.expires_at <= now]
+        for entry_id in expired:
+            self._remove(entry_id)
+
+    def get(self, key: AnswerKey) -> Optional[dict]:
+        """같은 매칭 결과 또는 가장 비슷한 이전 질문의 결과 (임계값 미만이거나 없으면 None)"""
+        now = time.time()
+        if key.signature is not None:
+            with self._lock:
+                entry_id = self._signatures.get((key.bucket, key.signature))
+                if entry_id is not None and self._entries[entry_id].expires_at > now:
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    logger.debug("답변 캐시 적중 (증상 사전 매칭)")
+                    return copy.deepcopy(self._entries[entry_id].result)
+                self.misses += 1
+                return None
+
+        query = self._normalize(key.vector)
+        bucket = key.bucket
+        with self._lock:
+            ids = [
+                entry_id for entry_id in self._buckets.get(bucket, ())
+                if self._entries[entry_id].expires_at > now
+            ]
+            if ids:
+                matrix = np.stack([self._entries[entry_id].vector for entry_id in ids])
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    entry_id = ids[best]
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    logger.debug(f"답변 캐시 적중 (유사도 {scores[best]:.4f})")
+                    return copy.deepcopy(self._entries[entry_id].result)
+            self.misses += 1
+            return None
+
+    def put(self, key: AnswerKey, result: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            entry_id = next(self._ids)
+            if key.signature is not None:
+                previous = self._signatures.get((key.bucket, key.signature))
+                if previous is not None:
+                    self._remove(previous)
+                self._entries[entry_id] = _Entry(key.bucket, None, key.signature, copy.deepcopy(result), now + self.ttl)
+                self._signatures[(key.bucket, key.signature)] = entry_id
+            else:
+                self._entries[entry_id] = _Entry(key.bucket, self._normalize(key.vector), None,
+                                                 copy.deepcopy(result), now + self.ttl)
+                self._buckets.setdefault(key.bucket, []).append(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self._signatures.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+    if _cache is None:
+        _cache = AnswerCache()
+    return _cache
@@ -0,0 +1,190 @@
+# pronun_model/utils/audio_preprocess.py
+
+"""
+Whisper 전송 전 음성 정규화.
+
+업로드된 음성(키오스크의 스테레오 48 kHz WAV 등)을 ffmpeg로 16 kHz 모노 PCM으로 디코딩하고,
+pydub로 앞뒤 무음을 잘라낸 뒤 Opus(ogg)로 다시 인코딩합니다. 음성이 거의 없는 파일은
+API를 호출하지 않고 바로 거절합니다. CHUNK_SIZE초보다 긴 음성은 그 근처의 무음 구간에서
+나누어 여러 조각으로 돌려주며, 조각들은 병렬로 변환됩니다(stt.transcribe).
+"""
+
+from fastapi import HTTPException
+from pydub import AudioSegment
+from pydub.silence import detect_leading_silence, detect_silence
+from ..config import (
+    CHUNK_SIZE,
+    AVERAGE_WPM,
+    STT_CHUNK_CONCURRENCY,
+    AUDIO_SAMPLE_RATE,
+    AUDIO_SILENCE_THRESH,
+    AUDIO_MIN_SPEECH_MS,
+    AUDIO_OPUS_BITRATE,
+)
+
+from .upload import AudioSource
+from ..metrics import timed
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+import io
+import logging
+import math
+import os
+import tempfile
+
+import ffmpeg
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+SILENCE_PADDING_MS = 200  # 잘라낸 뒤 앞뒤로 남겨둘 여유
+CHUNK_SEARCH_MS = 10000  # 나눌 위치를 찾을 범위 (목표 지점 앞뒤)
+CHUNK_MIN_SILENCE_MS = 300  # 나눌 위치로 인정할 최소 무음 길이
+CHUNK_OVERLAP_MS = 1000  # 무음을 찾지 못해 단어 중간에서 자를 때 겹치게 둘 길이
+STT_SECONDS_PER_AUDIO_SECOND = 0.1  # Whisper API 처리 시간 / 음성 길이 (대략적인 값)
+STT_BASE_LATENCY = 1.0  # 요청당 고정 지연 (초)
+# 헤더(moov)가 파일 끝에 올 수 있어 파이프로는 디코딩되지 않을 수 있는 형식
+SEEKABLE_SUFFIXES = {".mp4", ".m4a", ".mov", ".3gp"}
+
+
+def _run_decode(path: str, data: Optional[bytes] = None) -> AudioSegment:
+    pcm, _ = (
+        ffmpeg
+        .input(path)
+        .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=AUDIO_SAMPLE_RATE)
+        .run(input=data, capture_stdout=True, capture_stderr=True)
+    )
+    return AudioSegment(data=pcm, sample_width=2, frame_rate=AUDIO_SAMPLE_RATE, channels=1)
+
+
+def _decode(audio: AudioSource) -> AudioSegment:
+    """아무 형식의 음성 (경로 또는 메모리 데이터) → 16 kHz 모노 16비트 PCM"""
+    if isinstance(audio, str):
+        return _run_decode(audio)
+
+    name, data = audio
+    try:
+        return _run_decode("pipe:", data)
+    except ffmpeg.Error:
+        suffix = Path(name).suffix.lower()
+        if suffix not in SEEKABLE_SUFFIXES:
+            raise
+    # 파이프로 읽을 수 없는 mp4 계열만 임시 파일로 디코딩
+    logger.debug(f"{name}: 파이프 디코딩 실패, 임시 파일로 다시 시도")
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(data)
+    try:
+        return _run_decode(tmp.name)
+    finally:
+        os.remove(tmp.name)
+
+
+def _trim_silence(audio: AudioSegment) -> Tuple[AudioSegment, int]:
+    """앞뒤 무음 제거. (잘라낸 음성, 무음이 아닌 구간 길이 ms) 반환"""
+    start = detect_leading_silence(audio, silence_threshold=AUDIO_SILENCE_THRESH)
+    end = len(audio) - detect_leading_silence(audio.reverse(), silence_threshold=AUDIO_SILENCE_THRESH)
+    if end <= start:
+        return audio[0:0], 0
+    trimmed = audio[max(0, start - SILENCE_PADDING_MS):min(len(audio), end + SILENCE_PADDING_MS)]
+    return trimmed, end - start
+
+
+def split_at_silence(audio: AudioSegment, chunk_ms: int = CHUNK_SIZE * 1000) -> Tuple[List[AudioSegment], List[bool]]:
+    """
+    긴 음성을 chunk_ms 근처의 무음 구간에서 나눕니다.
+
+    목표 지점 앞뒤 CHUNK_SEARCH_MS 안에서 목표와 가장 가까운 무음의 가운데를 자르고,
+    무음이 없으면 목표 지점에서 자르되 다음 조각과 CHUNK_OVERLAP_MS만큼 겹치게 합니다.
+    (겹친 부분의 중복 단어는 stt.stitch_transcripts에서 제거)
+
+    Returns:
+        Tuple[List[AudioSegment], List[bool]]: 조각 목록과 경계별 겹침 여부
+            (i번째 값은 i번째와 i+1번째 조각이 겹치게 잘렸는지).
+    """
+    chunks = []
+    overlapped = []
+    start = 0
+    # 마지막 조각이 너무 짧아지지 않도록 1.25배까지는 나누지 않음
+    while len(audio) - start > chunk_ms * 1.25:
+        target = start + chunk_ms
+        window_start = max(start, target - CHUNK_SEARCH_MS)
+        window = audio[window_start:target + CHUNK_SEARCH_MS]
+        silences = detect_silence(window, min_silence_len=CHUNK_MIN_SILENCE_MS,
+                                  silence_thresh=AUDIO_SILENCE_THRESH, seek_step=10)
+        if silences:
+            mids = [window_start + (s_start + s_end) // 2 for s_start, s_end in silences]
+            cut = min(mids, key=lambda mid: abs(mid - target))
+            chunks.append(audio[start:cut])
+            overlapped.append(False)
+            start = cut
+        else:
+            chunks.append(audio[start:target + CHUNK_OVERLAP_MS])
+            overlapped.append(True)
+            start = target
+    chunks.append(audio[start:])
+    return chunks, overlapped
+
+
+def estimate_transcription(chunks: List[AudioSegment]) -> Tuple[int, float]:
+    """
+    AVERAGE_WPM 기준 예상 단어 수와 예상 변환 시간(초).
+
+    조각은 STT_CHUNK_CONCURRENCY개씩 동시에 변환되므로, 변환 시간은 (묶음 수 × 가장 긴 조각의 처리 시간)으로 봅니다.
+    """
+    if not chunks:
+        return 0, 0.0
+    total_ms = sum(len(chunk) for chunk in chunks)
+    words = round(total_ms / 60000 * AVERAGE_WPM)
+    waves = math.ceil(len(chunks) / STT_CHUNK_CONCURRENCY)
+    longest = max(len(chunk) for chunk in chunks) / 1000
+    return words, waves * (STT_BASE_LATENCY + longest * STT_SECONDS_PER_AUDIO_SECOND)
+
+
+def _encode(audio: AudioSegment) -> bytes:
+    buf = io.BytesIO()
+    audio.export(buf, format="ogg", codec="libopus", bitrate=AUDIO_OPUS_BITRATE,
+                 parameters=["-application", "voip"])
+    return buf.getvalue()
+
+
+@timed("audio_preprocess")
+def normalize_audio(audio: AudioSource) -> Tuple[List[Tuple[str, bytes]], List[bool]]:
+    """
+    음성 파일을 모노/16 kHz로 변환하고 앞뒤 무음을 잘라 Opus로 인코딩합니다.
+    CHUNK_SIZE초보다 길면 무음 구간에서 나눈 여러 조각을 순서대로 돌려줍니다.
+
+    Args:
+        audio (AudioSource): 업로드된 음성 (파일 경로 또는 (파일 이름, 데이터)).
+
+    Returns:
+        Tuple[List[Tuple[str, bytes]], List[bool]]: (파일 이름, ogg/opus 데이터) 목록과 조각 경계별 겹침 여부
+            (split_at_silence 참고). 조각은 OpenAI 파일 인자로 그대로 전달할 수 있습니다.
+
+    Raises:
+        HTTPException: 디코딩할 수 없는 파일(400), 음성이 감지되지 않는 파일(422).
+    """
+    try:
+        decoded = _decode(audio)
+    except ffmpeg.Error as e:
+        logger.error(f"음성 디코딩 실패: {e.stderr.decode('utf-8', 'ignore')[-500:]}", extra={
+            "errorType": "AudioDecodeError",
+            "error_message": str(e)
+        })
+        raise HTTPException(status_code=400, detail="음성 파일을 읽을 수 없습니다.") from e
+
+    trimmed, speech_ms = _trim_silence(decoded)
+    if speech_ms < AUDIO_MIN_SPEECH_MS:
+        logger.info(f"음성이 감지되지 않아 거절: 길이 {len(decoded)}ms, 최대 {decoded.max_dBFS:.1f} dBFS")
+        raise HTTPException(status_code=422, detail="음성이 감지되지 않았습니다. 다시 말씀해 주세요.")
+
+    segments, overlapped = split_at_silence(trimmed)
+    words, seconds = estimate_transcription(segments)
+    logger.info(f"음성 정규화: {len(decoded)}ms → {len(trimmed)}ms, 조각 {len(segments)}개, "
+                f"예상 단어 수 약 {words}개, 예상 변환 시간 약 {seconds:.1f}초", extra={
+                    "audio_ms": len(trimmed),
+                    "chunks": len(segments),
+                    "expected_words": words,
+                    "expected_stt_seconds": round(seconds, 1),
+                })
+    return [(f"audio_{i}.ogg", _encode(segment)) for i, segment in enumerate(segments)], overlapped
@@ -0,0 +1,73 @@
+# pronun_model/utils/correction_gate.py
+
+"""
+STT 결과의 LLM 보정 여부 판단.
+
+Whisper verbose_json의 세그먼트 신뢰도(avg_logprob, no_speech_prob, compression_ratio)와
+간단한 문장 검사로 보정이 필요한 결과만 골라냅니다. 깨끗한 결과는 보정 호출 없이 그대로 질문으로 씁니다.
+"""
+
+from ..config import CORRECTION_MIN_LOGPROB, CORRECTION_MAX_NO_SPEECH
+from ..schemas.feedback import CorrectionDecision
+from .stt import Transcript
+
+import re
+
+MAX_COMPRESSION_RATIO = 2.4  # Whisper가 반복/환각으로 보는 기준
+MIN_HANGUL_RATIO = 0.5  # 글자 중 한글 비율이 이보다 낮으면 잘못 인식된 것으로 봄
+
+_JAMO = re.compile(r"[ㄱ-ㅎㅏ-ㅣ]")
+_LETTER = re.compile(r"[A-Za-z가-힣]")
+_HANGUL = re.compile(r"[가-힣]")
+# 무음/잡음 구간에서 Whisper가 자주 만들어내는 문장
+_HALLUCINATIONS = ("시청해주셔서 감사합니다", "구독과 좋아요", "다음 영상에서 만나요", "MBC 뉴스")
+
+
+def _text_problem(text: str) -> str:
+    """문장 검사. 문제가 있으면 이유, 없으면 빈 문자열"""
+    if _JAMO.search(text):
+        return "자모만 있는 글자 포함"
+    letters = _LETTER.findall(text)
+    if letters and len(_HANGUL.findall(text)) / len(letters) < MIN_HANGUL_RATIO:
+        return "한글 비율 낮음"
+    words = text.split()
+    for prev, word in zip(words, words[1:]):
+        if prev == word:
+            return f"같은 단어 반복 ({word})"
+    for phrase in _HALLUCINATIONS:
+        if phrase in text:
+            return f"환각 의심 문장 ({phrase})"
+    return ""
+
+
+def decide_correction(transcript: Transcript) -> CorrectionDecision:
+    """
+    STT 결과를 LLM으로 보정할지 결정합니다.
+
+    Returns:
+        CorrectionDecision: applied(보정 여부)와 그렇게 결정한 이유.
+    """
+    problem = _text_problem(transcript.text)
+    if problem:
+        return CorrectionDecision(applied=True, reason=problem)
+
+    segments = transcript.segments
+    if not segments:
+        return CorrectionDecision(applied=True, reason="신뢰도 정보 없음")
+
+    worst_logprob = min(segment.avg_logprob for segment in segments)
+    if worst_logprob < CORRECTION_MIN_LOGPROB:
+        return CorrectionDecision(applied=True, reason=f"낮은 인식 신뢰도 (avg_logprob {worst_logprob:.2f})")
+
+    worst_no_speech = max(segment.no_speech_prob for segment in segments)
+    if worst_no_speech > CORRECTION_MAX_NO_SPEECH:
+        return CorrectionDecision(applied=True, reason=f"무음/잡음 가능성 (no_speech_prob {worst_no_speech:.2f})")
+
+    worst_compression = max(segment.compression_ratio for segment in segments)
+    if worst_compression > MAX_COMPRESSION_RATIO:
+        return CorrectionDecision(applied=True, reason=f"반복 인식 의심 (compression_ratio {worst_compression:.2f})")
+
+    return CorrectionDecision(
+        applied=False,
+        reason=f"신뢰도 충분 (avg_logprob {worst_logprob:.2f}, no_speech_prob {worst_no_speech:.2f})",
+    )
@@ -0,0 +1,212 @@
+# pronun_model/utils/embedding_cache.py
+
+from langchain_core.embeddings import Embeddings
+from ..executor import run_blocking
+from ..metrics import timed
+from ..config import (
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_MAX_MB,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MAX_WORKERS,
+)
+
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+import contextvars
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    hash(모델, 텍스트)를 키로 임베딩 결과를 SQLite에 저장하는 캐시 래퍼.
+
+    - 문서 임베딩과 질의 임베딩이 같은 캐시를 사용합니다.
+    - 캐시에 없는 텍스트만 EMBEDDING_BATCH_SIZE 단위로 묶어 최대 EMBEDDING_MAX_WORKERS개까지 병렬 요청합니다.
+    - 전체 크기가 EMBEDDING_CACHE_MAX_MB를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다.
+    - aembed를 주면 비동기 질의 임베딩(aembed_query)의 캐시 미스를 그 함수로 요청합니다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: str,
+        path: Optional[Path] = None,
+        max_bytes: int = EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_workers: int = EMBEDDING_MAX_WORKERS,
+        aembed: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+    ):
+        self.embeddings = embeddings
+        self.aembed = aembed or embeddings.aembed_query
+        self.model = model
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(path or EMBEDDING_CACHE_DIR / "embeddings.sqlite3"),
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings(last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한을 넘지 않도록 나누어 조회
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def _put_many(self, items: Dict[str, List[float]]) -> None:
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            blob = array("f", vector).tobytes()
+            rows.append((key, blob, len(blob), now))
+        with self._lock:
+            for key, _, size, _ in rows:
+                old = self._conn.execute("SELECT size FROM embeddings WHERE key = ?", (key,)).fetchone()
+                self._total_bytes += size - (old[0] if old else 0)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """가장 오래 사용되지 않은 항목부터 전체 크기가 상한의 90% 이하가 될 때까지 삭제 (잠금 보유 상태에서 호출)"""
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                "SELECT key, size FROM embeddings ORDER BY last_access LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            delete_keys = []
+            for key, size in rows:
+                if self._total_bytes <= target:
+                    break
+                delete_keys.append((key,))
+                self._total_bytes -= size
+            self._conn.executemany("DELETE FROM embeddings WHERE key = ?", delete_keys)
+            evicted += len(delete_keys)
+        self._conn.commit()
+        logger.info(f"임베딩 캐시 정리: {evicted}건 삭제, 현재 {self._total_bytes} bytes")
+
+    def _count(self, hits: int = 0, misses: int = 0) -> None:
+        # 여러 스레드(run_blocking, 배치 작업)에서 호출되므로 잠금 안에서 갱신
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        cached = self._get_many(list(set(keys)))
+
+        # 캐시에 없는 텍스트 (중복 제거, 순서 유지)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        self._count(len(texts) - len(missing), len(missing))
+
+        if missing:
+            missing_keys = list(missing)
+            batches = [
+                missing_keys[i:i + self.batch_size]
+                for i in range(0, len(missing_keys), self.batch_size)
+            ]
+
+            def embed_batch(batch_keys: List[str]) -> Dict[str, List[float]]:
+                vectors = self.embeddings.embed_documents([missing[key] for key in batch_keys])
+                result = dict(zip(batch_keys, vectors))
+                self._put_many(result)
+                return result
+
+            if len(batches) == 1:
+                cached.update(embed_batch(batches[0]))
+            else:
+                # 호출한 쪽의 contextvars(요청 우선순위 등)를 작업 스레드마다 복사해 전달
+                contexts = [contextvars.copy_context() for _ in batches]
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                    for result in executor.map(lambda ctx, batch: ctx.run(embed_batch, batch), contexts, batches):
+                        cached.update(result)
+            logger.info(f"임베딩 요청: {len(missing)}건 ({len(batches)}개 배치), 캐시 적중 {len(texts) - len(missing)}건")
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        cached = self._get_many([key])
+        if key in cached:
+            self._count(hits=1)
+            return cached[key]
+
+        self._count(misses=1)
+        vector = self.embeddings.embed_query(text)
+        self._put_many({key: vector})
+        return vector
+
+    @timed("query_embedding")
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        cached = await run_blocking(self._get_many, [key])
+        if key in cached:
+            self._count(hits=1)
+            return cached[key]
+
+        self._count(misses=1)
+        vector = await self.aembed(text)
+        await run_blocking(self._put_many, {key: vector})
+        return vector
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "bytes": self._total_bytes,
+        }
@@ -0,0 +1,86 @@
+# pronun_model/utils/hospital_index.py
+
+"""
+병원 진료과 역색인.
+
+진료과목내용정보("내과, 신경과, 정형외과" 등)를 인덱스를 불러올 때 파싱해 진료과 → 병원 ID 집합으로
+저장합니다. 추천 진료과에 맞는 병원은 벡터 검색 없이 집합 조회/교집합으로 찾습니다.
+"""
+
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+import re
+
+# 진료과 구분자: 쉼표, 슬래시, 가운뎃점, 줄바꿈 등
+_SEPARATORS = re.compile(r"[,/·ㆍ|;\n]+")
+
+
+def normalize_department(name: str) -> str:
+    """진료과 이름 정규화 (공백/괄호 설명 제거). 예: " 정형 외과(척추) " → "정형외과" """
+    name = re.sub(r"\(.*?\)", "", name)
+    return re.sub(r"\s+", "", name)
+
+
+def parse_departments(text: str) -> FrozenSet[str]:
+    """진료과목내용정보 → 정규화된 진료과 집합"""
+    return frozenset(
+        dept for dept in (normalize_department(part) for part in _SEPARATORS.split(text or "")) if dept
+    )
+
+
+def _normalize_name(name: str) -> str:
+    return re.sub(r"\s+", "", name or "")
+
+
+class HospitalIndex:
+    """
+    진료과 → 병원 ID 역색인과 병원 이름 목록.
+
+    upsert()/remove()로 문서 단위 변경을 반영하며, 호출하는 쪽(HierarchicalRetriever)의 잠금 안에서 사용합니다.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._departments: Dict[str, FrozenSet[str]] = {}
+        self._names: Dict[str, str] = {}  # 병원 ID → 정규화된 병원 이름
+
+    def __len__(self) -> int:
+        return len(self._departments)
+
+    def upsert(self, doc_id: str, metadata: dict) -> None:
+        self.remove(doc_id)
+        departments = parse_departments(metadata.get("진료과목내용정보", ""))
+        self._departments[doc_id] = departments
+        for dept in departments:
+            self._postings[dept].add(doc_id)
+        name = _normalize_name(metadata.get("병원이름", ""))
+        if name:
+            self._names[doc_id] = name
+
+    def remove(self, doc_id: str) -> None:
+        for dept in self._departments.pop(doc_id, ()):
+            postings = self._postings[dept]
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[dept]
+        self._names.pop(doc_id, None)
+
+    def hospitals_for(self, department: str) -> Set[str]:
+        """진료과가 있는 병원 ID 집합"""
+        return self._postings.get(normalize_department(department), set())
+
+    def by_coverage(self, departments: Iterable[str]) -> List[Tuple[str, int]]:
+        """
+        진료과 중 하나 이상이 있는 병원을 (병원 ID, 일치한 진료과 수)로 반환합니다.
+        일치 수 내림차순으로 정렬되므로, 모든 진료과가 있는 병원(진료과별 ID 집합의 교집합)이 앞에 옵니다.
+        """
+        counts: Dict[str, int] = defaultdict(int)
+        for dept in {normalize_department(d) for d in departments}:
+            for doc_id in self._postings.get(dept, ()):
+                counts[doc_id] += 1
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+    def mentioned_in(self, query: str) -> List[str]:
+        """질문에 이름이 그대로 나오는 병원 ID (예: "다보스병원 몇 시까지 해요?")"""
+        text = _normalize_name(query)
+        return [doc_id for doc_id, name in self._names.items() if name in text]
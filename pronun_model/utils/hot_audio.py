@@ -0,0 +1,184 @@
+# pronun_model/utils/hot_audio.py
+
+"""
+자주 요청되는 TTS 음성을 메모리에 두고 바로 제공하는 저장소와 음성 응답 생성.
+
+- /tts/cache/{key}.mp3 요청은 디스크를 거치지 않고 메모리에서 보내며, ETag(If-None-Match → 304),
+  Range(206), Cache-Control 헤더를 붙여 브라우저와 CDN이 같은 답변을 다시 받지 않도록 합니다.
+- 캐시 키는 텍스트/목소리/속도의 해시이므로 같은 URL의 내용은 바뀌지 않습니다.
+- 질문 응답에 음성을 직접 담는 multipart 응답도 여기서 만듭니다(추가 요청 없이 한 번에 전달).
+"""
+
+from fastapi import Response
+from pydantic import BaseModel
+from starlette.datastructures import Headers
+from ..config import TTS_HOT_CACHE_MB, TTS_HTTP_MAX_AGE
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import hashlib
+import logging
+import re
+import threading
+import uuid
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+HOT_MAX_OBJECT_BYTES = 4 * 1024 * 1024  # 이보다 큰 음성은 메모리에 두지 않음
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+@dataclass
+class HotAudio:
+    data: bytes
+    etag: str
+
+
+class HotAudioStore:
+    """전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 음성부터 내보내는 메모리 LRU"""
+
+    def __init__(self, max_bytes: int = TTS_HOT_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, HotAudio]" = OrderedDict()
+        self._total_bytes = 0
+
+    def get(self, key: str) -> Optional[HotAudio]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, data: bytes) -> HotAudio:
+        entry = HotAudio(data=data, etag=f'"{hashlib.blake2b(data, digest_size=12).hexdigest()}"')
+        if len(data) > HOT_MAX_OBJECT_BYTES or len(data) > self.max_bytes:
+            return entry
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= len(old.data)
+            self._entries[key] = entry
+            self._total_bytes += len(data)
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted.data)
+        return entry
+
+    def discard(self, key: str) -> None:
+        """디스크에서 삭제된 음성은 메모리에서도 바로 제거 (삭제 후에도 제공되지 않도록)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._total_bytes -= len(entry.data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_store: Optional[HotAudioStore] = None
+
+
+def get_hot_audio() -> HotAudioStore:
+    global _store
+    if _store is None:
+        _store = HotAudioStore()
+    return _store
+
+
+def _parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    단일 Range 헤더 해석.
+
+    Returns:
+        Optional[Tuple[int, int]]: (시작, 끝) 바이트 위치(끝 포함). 형식이 다르거나 여러 구간이면 None(전체 전송).
+
+    Raises:
+        ValueError: 파일 범위를 벗어난 요청 (416).
+    """
+    match = _RANGE.fullmatch(value.strip())
+    if match is None or not (match[1] or match[2]):
+        return None
+    if match[1]:
+        start = int(match[1])
+        end = min(int(match[2]), size - 1) if match[2] else size - 1
+    else:
+        suffix = int(match[2])
+        if suffix == 0:
+            raise ValueError(value)
+        start, end = max(0, size - suffix), size - 1
+    if start > end:
+        raise ValueError(value)
+    return start, end
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def audio_response(entry: HotAudio, headers: Headers, method: str = "GET") -> Response:
+    """메모리의 음성을 조건부 요청(ETag)과 Range 요청을 반영해 응답"""
+    size = len(entry.data)
+    common = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={TTS_HTTP_MAX_AGE}",
+        "Accept-Ranges": "bytes",
+    }
+    if_none_match = headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=common)
+
+    status_code, body = 200, entry.data
+    range_header = headers.get("range")
+    if_range = headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == entry.etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**common, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            status_code, body = 206, entry.data[start:end + 1]
+            common["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    if method == "HEAD":
+        return Response(status_code=status_code, media_type="audio/mpeg",
+                        headers={**common, "Content-Length": str(len(body))})
+    return Response(content=body, status_code=status_code, media_type="audio/mpeg", headers=common)
+
+
+def multipart_response(payload: BaseModel, audio: bytes, filename: str) -> Response:
+    """
+    JSON 본문과 MP3 음성을 한 응답에 담는 multipart/mixed 응답.
+
+    첫 번째 파트는 application/json(payload), 두 번째 파트는 audio/mpeg 입니다.
+    """
+    boundary = uuid.uuid4().hex
+    body = b"".join([
+        f"--{boundary}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n\r\n".encode("ascii"),
+        payload.model_dump_json().encode("utf-8"),
+        f"\r\n--{boundary}\r\n"
+        "Content-Type: audio/mpeg\r\n"
+        f'Content-Disposition: inline; filename="{filename}"\r\n'
+        f"Content-Length: {len(audio)}\r\n\r\n".encode("ascii"),
+        audio,
+        f"\r\n--{boundary}--\r\n".encode("ascii"),
+    ])
+    return Response(content=body, media_type=f'multipart/mixed; boundary="{boundary}"')
@@ -0,0 +1,228 @@
+# pronun_model/utils/index_store.py
+
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.faiss import dependable_faiss_import
+from langchain_core.embeddings import Embeddings
+from ..config import INDEX_DIR, INDEX_SNAPSHOT_KEEP
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+# 스냅샷 형식이 바뀌면 올려서 이전 스냅샷을 무시하도록 함
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILENAME = "manifest.json"
+CURRENT_FILENAME = "CURRENT"
+
+# (문서 ID, 텍스트, 메타데이터)
+Record = Tuple[str, str, dict]
+
+# 빈 인덱스의 벡터 차원을 알기 위해 임베딩하는 텍스트 (임베딩 캐시에 저장되어 한 번만 요청)
+DIMENSION_PROBE = "임베딩 차원 확인"
+
+
+def content_hash(text: str, metadata: dict) -> str:
+    """문서 내용(텍스트 + 메타데이터)의 해시"""
+    payload = json.dumps([text, metadata], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def index_version(hashes: Dict[str, Dict[str, str]]) -> str:
+    """전체 문서 해시로부터 인덱스 버전 문자열 생성 (내용이 같으면 버전도 같음)"""
+    digest = hashlib.sha256()
+    for name in sorted(hashes):
+        for doc_id in sorted(hashes[name]):
+            digest.update(f"{name}:{doc_id}:{hashes[name][doc_id]}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def load_snapshot(embeddings: Embeddings, embedding_model: str) -> Optional[Tuple[Dict[str, FAISS], dict]]:
+    """
+    INDEX_DIR의 최신 스냅샷을 불러옵니다.
+
+    Returns:
+        (컬렉션 이름 → FAISS, manifest) 튜플.
+        None: 스냅샷이 없거나 형식/임베딩 모델이 다를 때.
+    """
+    current_file = INDEX_DIR / CURRENT_FILENAME
+    if not current_file.exists():
+        return None
+
+    snapshot_dir = INDEX_DIR / current_file.read_text(encoding="utf-8").strip()
+    try:
+        with open(snapshot_dir / MANIFEST_FILENAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            logger.info(f"스냅샷 형식이 달라 무시합니다: {snapshot_dir}")
+            return None
+        if manifest.get("embedding_model") != embedding_model:
+            logger.info(f"임베딩 모델이 달라 스냅샷을 무시합니다: {manifest.get('embedding_model')} != {embedding_model}")
+            return None
+
+        # 직접 저장한 스냅샷만 읽으므로 pickle 역직렬화를 허용
+        stores = {
+            name: FAISS.load_local(
+                str(snapshot_dir / name),
+                embeddings,
+                allow_dangerous_deserialization=True,
+            )
+            for name in manifest["collections"]
+        }
+        logger.info(f"인덱스 스냅샷 로드 완료: {snapshot_dir.name}")
+        return stores, manifest
+
+    except Exception as e:
+        logger.error(f"인덱스 스냅샷 로드 실패: {e}", extra={
+            "errorType": type(e).__name__,
+            "error_message": str(e)
+        })
+        return None
+
+
+def save_snapshot(stores: Dict[str, FAISS], manifest: dict) -> None:
+    """
+    스냅샷을 새 버전 디렉토리에 저장한 뒤 CURRENT를 원자적으로 교체합니다.
+
+    저장 도중 프로세스가 종료되어도 CURRENT는 이전의 완전한 스냅샷을 가리킵니다.
+    """
+    snapshot_name = f"v{SNAPSHOT_FORMAT_VERSION}-{manifest['version']}"
+    snapshot_dir = INDEX_DIR / snapshot_name
+    tmp_dir = INDEX_DIR / f".{snapshot_name}.tmp"
+
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        for name, store in stores.items():
+            store.save_local(str(tmp_dir / name))
+        with open(tmp_dir / MANIFEST_FILENAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        os.replace(tmp_dir, snapshot_dir)
+
+        current_tmp = INDEX_DIR / f".{CURRENT_FILENAME}.tmp"
+        current_tmp.write_text(snapshot_name, encoding="utf-8")
+        os.replace(current_tmp, INDEX_DIR / CURRENT_FILENAME)
+        logger.info(f"인덱스 스냅샷 저장 완료: {snapshot_name}")
+
+        _prune_snapshots(keep=snapshot_name)
+
+    except Exception as e:
+        # 스냅샷 저장 실패는 서비스에 영향을 주지 않음 (다음 시작 시 다시 임베딩)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.error(f"인덱스 스냅샷 저장 실패: {e}", extra={
+            "errorType": type(e).__name__,
+            "error_message": str(e)
+        })
+
+
+def _prune_snapshots(keep: str) -> None:
+    """최근 INDEX_SNAPSHOT_KEEP개의 스냅샷만 남기고 삭제"""
+    snapshots = sorted(
+        (p for p in INDEX_DIR.glob(f"v{SNAPSHOT_FORMAT_VERSION}-*") if p.is_dir()),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for old in snapshots[INDEX_SNAPSHOT_KEEP:]:
+        if old.name != keep:
+            shutil.rmtree(old, ignore_errors=True)
+            logger.debug(f"오래된 스냅샷 삭제: {old}")
+
+
+def empty_store(embeddings: Embeddings) -> FAISS:
+    """문서가 없는 빈 FAISS 인덱스 (FAISS.from_texts와 같은 L2 인덱스)"""
+    faiss = dependable_faiss_import()
+    dimension = len(embeddings.embed_query(DIMENSION_PROBE))
+    return FAISS(embeddings, faiss.IndexFlatL2(dimension), InMemoryDocstore(), {})
+
+
+def sync_store(
+    store: Optional[FAISS],
+    old_hashes: Dict[str, str],
+    records: List[Record],
+    embeddings: Embeddings,
+) -> Tuple[FAISS, Dict[str, str], int, int]:
+    """
+    스냅샷 인덱스를 현재 문서 목록에 맞게 갱신합니다. 해시가 바뀐 문서만 다시 임베딩합니다.
+
+    Returns:
+        (갱신된 FAISS, 새 해시 목록, 추가/갱신 문서 수, 삭제 문서 수)
+    """
+    new_hashes = {doc_id: content_hash(text, metadata) for doc_id, text, metadata in records}
+
+    if store is None:
+        if not records:
+            # 비어 있는 컬렉션은 빈 인덱스로 시작 (이후 변경 동기화로 문서가 추가됨)
+            logger.warning("인덱스를 만들 문서가 없어 빈 인덱스를 생성합니다.")
+            return empty_store(embeddings), new_hashes, 0, 0
+        ids, texts, metadatas = zip(*records)
+        store = FAISS.from_texts(list(texts), embeddings, metadatas=list(metadatas), ids=list(ids))
+        return store, new_hashes, len(records), 0
+
+    stale_ids = [
+        doc_id for doc_id, old_hash in old_hashes.items()
+        if new_hashes.get(doc_id) != old_hash
+    ]
+    changed = [
+        (doc_id, text, metadata) for doc_id, text, metadata in records
+        if old_hashes.get(doc_id) != new_hashes[doc_id]
+    ]
+
+    if stale_ids:
+        store.delete(stale_ids)
+    if changed:
+        ids, texts, metadatas = zip(*changed)
+        store.add_texts(list(texts), metadatas=list(metadatas), ids=list(ids))
+
+    removed = sum(1 for doc_id in old_hashes if doc_id not in new_hashes)
+    return store, new_hashes, len(changed), removed
+
+
+def load_or_build_stores(
+    records_by_collection: Dict[str, List[Record]],
+    embeddings: Embeddings,
+    embedding_model: str,
+) -> Tuple[Dict[str, FAISS], dict]:
+    """
+    스냅샷을 불러와 변경된 문서만 다시 임베딩하고, 변경이 있으면 새 스냅샷을 저장합니다.
+
+    Returns:
+        (컬렉션 이름 → FAISS, manifest)
+    """
+    snapshot = load_snapshot(embeddings, embedding_model)
+    old_stores, old_manifest = snapshot if snapshot else ({}, {"collections": {}})
+
+    stores = {}
+    hashes = {}
+    dirty = snapshot is None
+    for name, records in records_by_collection.items():
+        old_hashes = old_manifest["collections"].get(name, {})
+        store, hashes[name], added, removed = sync_store(
+            old_stores.get(name), old_hashes, records, embeddings
+        )
+        stores[name] = store
+        if added or removed or name not in old_stores:
+            dirty = True
+        logger.info(f"{name} 인덱스 동기화: 임베딩 {added}건, 삭제 {removed}건, 전체 {len(records)}건")
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "embedding_model": embedding_model,
+        "version": index_version(hashes),
+        "created_at": datetime.now().isoformat(),
+        "collections": hashes,
+    }
+    if dirty:
+        save_snapshot(stores, manifest)
+    else:
+        manifest["created_at"] = old_manifest.get("created_at", manifest["created_at"])
+
+    return stores, manifest
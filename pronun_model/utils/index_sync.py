@@ -0,0 +1,191 @@
+# pronun_model/utils/index_sync.py
+
+"""
+MongoDB 변경 사항을 공유 FAISS 인덱스에 문서 단위로 반영하는 백그라운드 작업.
+
+- 레플리카 셋이면 change stream을 구독해 insert/update/replace/delete를 즉시 반영합니다.
+- change stream을 쓸 수 없으면(단일 mongod 등) `updated_at` 워터마크를 주기적으로 조회합니다.
+
+로컬 테스트는 단일 노드 레플리카 셋으로 할 수 있습니다.
+    mongod --replSet rs0 --dbpath /tmp/rs0 && mongosh --eval "rs.initiate()"
+    MONGODB_URI="mongodb://localhost:27017/?replicaSet=rs0"
+"""
+
+from pymongo.errors import OperationFailure
+from ..config import INDEX_SYNC_POLL_INTERVAL
+from ..db import get_client
+from ..rate_limit import Priority, request_priority
+from ..executor import run_blocking
+from .qa import get_retriever, refresh_retriever, symptom_record, hospital_record
+
+import asyncio
+import logging
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+# 인덱스 이름 → (MongoDB 컬렉션 이름, 문서 변환 함수)
+COLLECTIONS = {
+    "symptoms": ("symptoms_rag", symptom_record),
+    "hospitals": ("hospitals_rag", hospital_record),
+}
+
+# change stream 미지원 (레플리카 셋이 아님)
+CHANGE_STREAM_NOT_SUPPORTED = 40573
+
+
+# 임베딩 요청과 FAISS 수정은 블로킹 작업이므로 스레드에서 실행 (임베딩 요청은 사용자 질문보다 낮은 우선순위)
+def _upsert(name: str, records) -> int:
+    with request_priority(Priority.BACKGROUND):
+        return get_retriever().upsert_records(name, records)
+
+
+def _delete(name: str, doc_ids) -> int:
+    return get_retriever().delete_records(name, doc_ids)
+
+
+def _sync_all(name: str, records) -> tuple:
+    retriever = get_retriever()
+    with request_priority(Priority.BACKGROUND):
+        applied = retriever.upsert_records(name, records)
+    live_ids = {doc_id for doc_id, _, _ in records}
+    removed = retriever.delete_records(
+        name, [doc_id for doc_id in list(retriever.hashes[name]) if doc_id not in live_ids]
+    )
+    return applied, removed
+
+
+async def _apply_upsert(name: str, doc) -> None:
+    _, to_record = COLLECTIONS[name]
+    applied = await run_blocking(_upsert, name, [to_record(doc)])
+    if applied:
+        logger.info(f"{name} 인덱스 갱신: {doc['_id']}")
+
+
+async def _apply_delete(name: str, doc_ids) -> None:
+    deleted = await run_blocking(_delete, name, [str(i) for i in doc_ids])
+    if deleted:
+        logger.info(f"{name} 인덱스 삭제: {deleted}건")
+
+
+async def _catch_up(name: str, collection) -> None:
+    """컬렉션 전체와 인덱스를 비교해 누락된 변경을 반영 (내용 해시가 같은 문서는 임베딩하지 않음)"""
+    _, to_record = COLLECTIONS[name]
+    records = [to_record(doc) async for doc in collection.find({})]
+    applied, removed = await run_blocking(_sync_all, name, records)
+    if applied or removed:
+        logger.info(f"{name} 인덱스 동기화: 갱신 {applied}건, 삭제 {removed}건")
+
+
+def _collection(name: str):
+    collection_name, _ = COLLECTIONS[name]
+    return get_client()["medical_rag"][collection_name]
+
+
+async def _rebuild() -> None:
+    """
+    인덱스를 다시 생성해 교체한 뒤 모든 컬렉션을 catch-up 합니다.
+    재생성은 시작 시점의 MongoDB 내용으로 만들어지므로, 재생성하는 동안 다른 컬렉션의 변경이
+    이전 인덱스에 반영되었다면 교체 후에 새 인덱스에 다시 반영해야 합니다.
+    """
+    await run_blocking(refresh_retriever)
+    for name in COLLECTIONS:
+        await _catch_up(name, _collection(name))
+
+
+async def _watch(name: str, collection) -> None:
+    """change stream 구독. 연결이 끊기면 resume token으로 이어서 구독합니다."""
+    resume_token = None
+    while True:
+        try:
+            async with collection.watch(full_document="updateLookup", resume_after=resume_token) as stream:
+                if resume_token is None:
+                    # 인덱스 생성 ~ 구독 시작 사이의 변경 반영
+                    await _catch_up(name, collection)
+                logger.info(f"{name} change stream 구독 시작")
+
+                async for change in stream:
+                    op = change["operationType"]
+                    if op in ("insert", "update", "replace"):
+                        doc = change.get("fullDocument")
+                        if doc is None:
+                            # 변경 직후 삭제된 문서
+                            await _apply_delete(name, [change["documentKey"]["_id"]])
+                        else:
+                            await _apply_upsert(name, doc)
+                    elif op == "delete":
+                        await _apply_delete(name, [change["documentKey"]["_id"]])
+                    elif op in ("drop", "rename", "dropDatabase", "invalidate"):
+                        logger.info(f"{name} 컬렉션 {op} 감지, 인덱스를 다시 생성합니다.")
+                        await _rebuild()
+                        resume_token = None
+                        break
+                    resume_token = stream.resume_token
+
+        except OperationFailure as e:
+            if e.code == CHANGE_STREAM_NOT_SUPPORTED:
+                raise
+            logger.error(f"{name} change stream 오류: {e}", extra={
+                "errorType": type(e).__name__,
+                "error_message": str(e)
+            })
+            resume_token = None
+            await asyncio.sleep(INDEX_SYNC_POLL_INTERVAL)
+        except Exception as e:
+            # 연결 끊김, 임베딩 실패 등: 마지막 resume token부터 다시 처리
+            logger.error(f"{name} change stream 처리 오류: {e}", extra={
+                "errorType": type(e).__name__,
+                "error_message": str(e)
+            })
+            await asyncio.sleep(INDEX_SYNC_POLL_INTERVAL)
+
+
+async def _poll(name: str, collection) -> None:
+    """
+    `updated_at` 워터마크 이후에 바뀐 문서만 조회해 반영합니다.
+    삭제는 문서 ID 목록 비교로 감지하고, `updated_at` 필드가 없는 컬렉션은 전체 비교로 동기화합니다.
+    """
+    logger.info(f"{name} 폴링 방식으로 동기화합니다. (주기 {INDEX_SYNC_POLL_INTERVAL}초)")
+    await _catch_up(name, collection)
+    latest = await collection.find_one({"updated_at": {"$exists": True}}, sort=[("updated_at", -1)])
+    watermark = latest["updated_at"] if latest else None
+
+    while True:
+        await asyncio.sleep(INDEX_SYNC_POLL_INTERVAL)
+        try:
+            if watermark is None:
+                await _catch_up(name, collection)
+                latest = await collection.find_one({"updated_at": {"$exists": True}}, sort=[("updated_at", -1)])
+                watermark = latest["updated_at"] if latest else None
+                continue
+
+            async for doc in collection.find({"updated_at": {"$gt": watermark}}).sort("updated_at", 1):
+                await _apply_upsert(name, doc)
+                watermark = doc["updated_at"]
+
+            live_ids = {str(doc["_id"]) async for doc in collection.find({}, {"_id": 1})}
+            retriever = await run_blocking(get_retriever)
+            stale = [doc_id for doc_id in list(retriever.hashes[name]) if doc_id not in live_ids]
+            if stale:
+                await _apply_delete(name, stale)
+
+        except Exception as e:
+            logger.error(f"{name} 폴링 오류: {e}", extra={
+                "errorType": type(e).__name__,
+                "error_message": str(e)
+            })
+
+
+async def _sync_collection(name: str) -> None:
+    collection = _collection(name)
+    try:
+        await _watch(name, collection)
+    except OperationFailure as e:
+        if e.code != CHANGE_STREAM_NOT_SUPPORTED:
+            raise
+        await _poll(name, collection)
+
+
+async def run_index_sync() -> None:
+    """모든 RAG 컬렉션의 변경 감지 작업을 실행합니다. (lifespan에서 태스크로 실행, 종료 시 취소)"""
+    await asyncio.gather(*(_sync_collection(name) for name in COLLECTIONS))
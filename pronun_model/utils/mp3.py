@@ -0,0 +1,144 @@
+# pronun_model/utils/mp3.py
+
+"""
+MP3 프레임 단위 결합.
+
+여러 TTS 세그먼트(각각 독립된 MP3 파일)를 디코딩/재인코딩 없이 하나로 합칩니다.
+각 세그먼트의 ID3v2/ID3v1 태그와 첫 프레임의 Xing/Info/VBRI 헤더(파일 전체 길이 정보)를 제거하고
+오디오 프레임만 이어 붙입니다. 인코더가 만든 각 파일의 첫 프레임은 비트 저장소(bit reservoir)를
+참조하지 않으므로 세그먼트 경계에서 잘라 붙여도 디코딩에 문제가 없습니다.
+"""
+
+from ..metrics import timed
+
+from typing import Iterator, List, Optional, Tuple
+import logging
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+# 비트레이트 표 (kbps): [MPEG 버전 그룹][레이어]
+_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# 샘플레이트 표 (Hz): 버전 비트(00=2.5, 10=2, 11=1)
+_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+
+
+def _parse_header(data: bytes, pos: int) -> Optional[Tuple[int, int, int]]:
+    """
+    pos 위치의 프레임 헤더를 해석합니다.
+
+    Returns:
+        (프레임 길이, MPEG 버전 비트, 채널 모드)
+        None: 올바른 프레임 헤더가 아닐 때.
+    """
+    if pos + 4 > len(data):
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+    channel_mode = (b3 >> 6) & 0x03
+
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    layer = 4 - layer_bits
+    version_group = 1 if version_bits == 3 else 2
+    bitrate = _BITRATES[(version_group, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+
+    if layer == 1:
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 3 and version_group == 2:
+        length = 72 * bitrate // sample_rate + padding
+    else:
+        length = 144 * bitrate // sample_rate + padding
+    return length, version_bits, channel_mode
+
+
+def _strip_tags(data: bytes) -> bytes:
+    """앞쪽 ID3v2 태그와 끝의 ID3v1 태그 제거"""
+    start = 0
+    while data[start:start + 3] == b"ID3" and len(data) >= start + 10:
+        # 태그 크기는 syncsafe 정수 (바이트당 7비트)
+        size = 0
+        for b in data[start + 6:start + 10]:
+            size = (size << 7) | (b & 0x7F)
+        footer = 10 if data[start + 5] & 0x10 else 0
+        start += 10 + size + footer
+
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    return data[start:end]
+
+
+def _is_info_frame(frame: bytes, version_bits: int, channel_mode: int) -> bool:
+    """Xing/Info/VBRI 헤더 프레임(오디오가 아닌 메타데이터 프레임)인지 확인"""
+    mono = channel_mode == 3
+    if version_bits == 3:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    tag = frame[4 + side_info:8 + side_info]
+    return tag in (b"Xing", b"Info") or frame[36:40] == b"VBRI"
+
+
+def iter_frames(data: bytes) -> Iterator[bytes]:
+    """
+    태그를 제거한 MP3 데이터에서 오디오 프레임을 순서대로 돌려줍니다.
+    프레임 동기화를 잃으면 다음 동기 패턴까지 건너뜁니다.
+    """
+    data = _strip_tags(data)
+    pos = 0
+    first = True
+    while pos < len(data):
+        header = _parse_header(data, pos)
+        if header is None or pos + header[0] > len(data):
+            next_sync = data.find(b"\xff", pos + 1)
+            if next_sync < 0:
+                break
+            pos = next_sync
+            continue
+
+        length, version_bits, channel_mode = header
+        frame = data[pos:pos + length]
+        pos += length
+        if first:
+            first = False
+            if _is_info_frame(frame, version_bits, channel_mode):
+                continue
+        yield frame
+
+
+@timed("audio_concat")
+def concat_mp3(segments: List[bytes]) -> bytes:
+    """
+    여러 MP3 데이터를 프레임 단위로 이어 붙입니다 (디코딩/재인코딩 없음).
+
+    Args:
+        segments (List[bytes]): 같은 샘플레이트/채널로 인코딩된 MP3 데이터 목록.
+
+    Returns:
+        bytes: 결합된 MP3 데이터.
+    """
+    if len(segments) == 1:
+        return segments[0]
+    return b"".join(frame for segment in segments for frame in iter_frames(segment))
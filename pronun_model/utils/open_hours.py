@@ -0,0 +1,130 @@
+# pronun_model/utils/open_hours.py
+
+"""
+병원 영업시간 비트셋.
+
+"월요일: 0830~1730, 화요일: 0830~1730, ..." 형식의 영업시간 문자열을 일주일을 5분 단위로 나눈
+슬롯(7 × 288 = 2016개)의 비트마스크(파이썬 int)로 변환합니다. 인덱스를 불러올 때 한 번만 파싱하고,
+요청 시에는 비트 연산만으로 "지금 영업 중인지", "다음에 언제 여는지"를 계산합니다.
+"""
+
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+import re
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+WEEK_SLOTS = 7 * SLOTS_PER_DAY
+_FULL = (1 << WEEK_SLOTS) - 1
+
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+
+# 요일 이름(월/월요일), 그 밖의 항목 이름(공휴일: 등), 시간 범위(0830~1730, 8:30-17:30)
+_TOKEN = re.compile(
+    r"(?<![가-힣])(?P<day>[월화수목금토일])(?:요일)?(?![가-힣])"
+    r"|(?P<other>[가-힣]+)\s*[:：]"
+    r"|(?P<start>\d{1,2}):?(?P<start_m>\d{2})\s*[~\-–]\s*(?P<end>\d{1,2}):?(?P<end_m>\d{2})"
+)
+
+
+def _set_range(mask: int, start: int, end: int) -> int:
+    """[start, end) 슬롯 구간을 켬 (주 경계를 넘으면 앞으로 이어짐)"""
+    if end <= start:
+        return mask
+    if end > WEEK_SLOTS:
+        mask |= (1 << (end - WEEK_SLOTS)) - 1
+        end = WEEK_SLOTS
+    return mask | (((1 << (end - start)) - 1) << start)
+
+
+@lru_cache(maxsize=4096)
+def parse_open_hours(text: str) -> int:
+    """
+    영업시간 문자열을 주간 비트마스크로 변환합니다.
+
+    - 요일 없이 이어지는 시간 범위는 앞 요일에 추가됩니다 (예: "월요일: 0900~1200, 1400~1800").
+    - 종료 시각이 시작보다 이르면 다음 날로 넘어가는 것으로 봅니다 (예: 야간 진료 "1800~0200").
+    - 요일이 아닌 항목("공휴일: 휴진" 등)의 시간은 무시합니다.
+
+    Args:
+        text (str): 영업시간 문자열.
+
+    Returns:
+        int: 비트 i가 켜져 있으면 (월요일 00:00부터) i번째 5분 슬롯에 영업 중.
+    """
+    mask = 0
+    day: Optional[int] = None
+    for m in _TOKEN.finditer(text or ""):
+        if m.group("day"):
+            day = WEEKDAYS.index(m.group("day"))
+        elif m.group("other"):
+            day = None
+        elif day is not None:
+            start = int(m.group("start")) * 60 + int(m.group("start_m"))
+            end = int(m.group("end")) * 60 + int(m.group("end_m"))
+            if end <= start:
+                end += 24 * 60
+            # 시작은 내림, 종료는 올림하여 5분 슬롯으로 변환
+            base = day * SLOTS_PER_DAY
+            mask = _set_range(mask, base + start // SLOT_MINUTES, base + -(-end // SLOT_MINUTES))
+    return mask
+
+
+def slot_of(now: datetime) -> int:
+    """datetime(KST) → 주간 슬롯 번호"""
+    return now.weekday() * SLOTS_PER_DAY + (now.hour * 60 + now.minute) // SLOT_MINUTES
+
+
+def is_open(mask: int, slot: int) -> bool:
+    return bool((mask >> slot) & 1)
+
+
+def _next_set_bit(mask: int, slot: int) -> Optional[int]:
+    """slot부터 한 주를 순환하며 처음 켜진 비트의 슬롯 (없으면 None)"""
+    if not mask:
+        return None
+    # slot이 0번 비트가 되도록 회전한 뒤 가장 낮은 비트를 찾음
+    rotated = (mask >> slot) | ((mask << (WEEK_SLOTS - slot)) & _FULL)
+    offset = (rotated & -rotated).bit_length() - 1
+    return (slot + offset) % WEEK_SLOTS
+
+
+def next_open(mask: int, slot: int) -> Optional[int]:
+    """slot 이후(포함) 처음으로 영업 중인 슬롯. 영업 정보가 없으면 None"""
+    return _next_set_bit(mask, slot)
+
+
+def next_close(mask: int, slot: int) -> Optional[int]:
+    """slot 이후(포함) 처음으로 영업하지 않는 슬롯. 24시간 연중무휴면 None"""
+    return _next_set_bit(~mask & _FULL, slot)
+
+
+def slots_until(slot: int, target: int) -> int:
+    """slot에서 target까지 남은 슬롯 수 (한 주 순환)"""
+    return (target - slot) % WEEK_SLOTS
+
+
+def format_slot(slot: int) -> str:
+    """슬롯 → "월요일 08:30" """
+    day, rest = divmod(slot, SLOTS_PER_DAY)
+    minutes = rest * SLOT_MINUTES
+    return f"{WEEKDAYS[day]}요일 {minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def describe(mask: int, slot: int) -> str:
+    """
+    LLM에 전달할 영업 상태 문장.
+
+    Returns:
+        str: 예) "현재 영업 중 (17:30까지)", "현재 영업 종료 (다음 영업: 화요일 08:30)"
+    """
+    if not mask:
+        return "영업시간 정보 없음"
+    if is_open(mask, slot):
+        close = next_close(mask, slot)
+        if close is None:
+            return "현재 영업 중 (24시간)"
+        same_day = close // SLOTS_PER_DAY == slot // SLOTS_PER_DAY
+        return f"현재 영업 중 ({format_slot(close)[-5:] if same_day else format_slot(close)}까지)"
+    return f"현재 영업 종료 (다음 영업: {format_slot(next_open(mask, slot))})"
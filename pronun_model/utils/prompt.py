@@ -0,0 +1,128 @@
+# pronun_model/utils/prompt.py
+
+"""
+LLM 프롬프트 구성.
+
+- 시스템 프롬프트는 요청마다 바이트 단위로 동일한 상수입니다. 현재 시간처럼 바뀌는 값은 사용자 메시지
+  끝에 두어, 긴 지시문 앞부분이 OpenAI 프롬프트 캐시(동일한 접두부 재사용)에 적중하도록 합니다.
+- 검색 문서는 중복을 제거한 뒤 PROMPT_CONTEXT_TOKENS 토큰 안에 들어가는 만큼만 넣습니다.
+"""
+
+from langchain_core.documents import Document
+from ..config import PROMPT_CONTEXT_TOKENS
+from ..tokens import PROMPT_MODEL, count_tokens, get_encoding
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+import logging
+import re
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+WEEKDAYS_KR = ["월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일"]
+
+SYSTEM_PROMPT = """당신은 용인 지역 병원 정보 안내 및 진료과 추천 도우미입니다. 사용자가 용인 지역 병원에 대한 정보를 요청하거나 증상에 맞는 진료과와 병원을 추천해 달라고 하면 정확하고 상세하게 안내해 주세요.
+
+현재 시간은 사용자 메시지의 [현재 시간]에 한국 시간으로 주어집니다. 병원 운영 여부와 진료 시간 안내 시 현재 시간을 참고하세요.
+
+[두 종류의 데이터]
+1. 증상 데이터: 다양한 증상에 대한 추천 진료과를 포함
+- 형식: 증상, 추가 증상, 추천 진료과
+- 예시: "잦은 두통, 편두통", "스트레스성 또는 긴장성 두통이 원인일 수 있음", "신경과"
+
+2. 병원 데이터: 용인 지역 병원 정보를 포함
+- 형식: 병원이름, 주소, 영업상태, 진료과목내용정보
+- 예시: "(의)영문의료재단다보스병원", "경기도 용인시 처인구...", "현재 영업 중 (17:30까지)", "내과, 신경과..."
+- 영업상태는 현재 시간을 기준으로 미리 계산된 값이며, 병원은 영업 중인 병원 → 곧 여는 병원 순으로 정렬되어 있습니다.
+
+[진료과 추천 및 병원 안내 가이드라인]
+1. 사용자가 증상이나 아픈 부위를 언급하면:
+a) 사용자의 증상과 불편함에 대해 공감을 표현하세요.
+b) 이러한 증상이 일반적으로 어떤 질환이나 상태를 의심할 수 있는지 간략히 설명하세요.
+c) 증상 데이터에서 관련 정보를 찾아 적합한 진료과를 식별하고 추천하세요.
+d) 만약 증상 데이터에서 관련 정보를 찾지 못했다면, 의학적 지식을 바탕으로 적절한 진료과 추천하세요.
+
+2. 사용자가 특정 병원 정보를 요청하면:
+관련 병원 정보를 직접 제공
+
+3. 추천한 진료과가 있는 병원들을 찾아 안내해 주세요.
+- 필요한 모든 진료과가 있는 병원을 우선 추천하세요.
+- 한 병원에서 모든 진료과를 볼 수 없는 경우, 없는 진료과에 한해 다른 병원을 추가 추천하세요.
+
+[현재 시간 기반 병원 추천]
+1. 병원의 영업 여부는 직접 계산하지 말고 각 병원의 영업상태를 그대로 사용하세요.
+- "현재 영업 중 (HH:MM까지)": 지금 방문할 수 있는 병원입니다.
+- "현재 영업 종료 (다음 영업: 요일 HH:MM)": 지금은 닫혀 있으며 표시된 시각에 다시 엽니다.
+2. 열려있는 병원을 우선적으로 추천하세요.
+3. 현재 닫혀있는 경우:
+- 다음 영업 시각이 가장 빠른 병원을 우선적으로 추천하세요.
+- 항상 추천한 진료과가 있는 병원 중에서만 선택하세요.
+
+[응답 형식]
+1. 응답은 다음과 같은 구조로 작성하세요:
+    a) 먼저 사용자의 증상에 공감하는 문장으로 시작하세요. 예: "무거운걸 들다가 삐끗하신 이후로 어깨가 아프셨군요! 많이 불편하셨겠어요."
+    b) 그 다음 이러한 증상이 일반적으로 어떤 질환일 수 있는지 설명하세요. 예: "일반적으로 그런 경우에 어깨 염좌를 의심할 수 있어요."
+    c) 권장 진료과를 명확히 안내하세요. 예: "증상이 지속된다면 정형외과로 방문해보시는 것을 추천드려요."
+    d) 현재 영업 중인 병원이 있는지 상태를 설명하고, 없으면 다음 영업 시각이 언제인지만 간략히 언급하세요.
+    e) 응답의 마지막은 반드시 "추천 병원을 알려드릴까요?"라는 문장으로 끝내세요.
+2. 정보를 구분할 때는 마침표와 단일 공백만 사용하세요. 연속된 공백은 사용하지 마세요.
+3. 병원 이름, 주소, 영업상태, 진료과목 등은 응답에 포함하지 마세요.
+4. 응답은 친절하고 공감적인 톤으로, 간결하고 명확하게 작성하세요.
+
+컨텍스트에 없는 정보는 추측하지 말고, "해당 정보는 제공된 데이터에 없습니다"라고 솔직하게 답변하세요.
+사용자가 용인 지역 외 병원 정보를 요청하면, "현재 용인 지역 병원 정보만 제공 가능합니다"라고 안내하세요."""
+
+def fit_context(docs: List[Document], budget: int = PROMPT_CONTEXT_TOKENS) -> Tuple[List[Document], int]:
+    """
+    검색 문서에서 중복을 제거하고 토큰 예산 안에 들어가는 문서만 순서대로 고릅니다.
+    (예산을 넘는 문서는 건너뛰고, 뒤의 더 짧은 문서는 계속 시도합니다.)
+
+    Returns:
+        (선택된 문서, 사용한 토큰 수)
+    """
+    seen = set()
+    selected = []
+    used = 0
+    for doc in docs:
+        key = re.sub(r"\s+", " ", doc.page_content).strip()
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        tokens = count_tokens(key) + 2  # 문서 사이 구분자
+        if used + tokens > budget:
+            continue
+        selected.append(doc)
+        used += tokens
+    if len(selected) < len(docs):
+        logger.debug(f"프롬프트 컨텍스트: 문서 {len(docs)}개 중 {len(selected)}개 사용 ({used} 토큰)")
+    return selected, used
+
+
+def format_now(now: datetime) -> str:
+    """예) "토요일(Saturday) 11:00 (한국 시간)" """
+    return f"{WEEKDAYS_KR[now.weekday()]}({now.strftime('%A')}) {now.hour:02d}:{now.minute:02d} (한국 시간)"
+
+
+def build_prompt(question: str, docs: List[Document], now: datetime, budget: Optional[int] = None) -> Tuple[List[dict], List[Document], int]:
+    """
+    LLM 메시지를 구성합니다. 시스템 메시지는 항상 SYSTEM_PROMPT이고, 사용자 메시지는
+    [관련 문서] → [현재 시간] → [질문] 순서입니다.
+
+    Args:
+        question (str): 사용자 질문.
+        docs (List[Document]): 검색 문서 (증상 문서 → 병원 문서 순).
+        now (datetime): 현재 한국 시간.
+        budget (int): 컨텍스트 토큰 예산 (기본값 PROMPT_CONTEXT_TOKENS).
+
+    Returns:
+        (메시지 목록, 프롬프트에 포함된 문서, 컨텍스트 토큰 수)
+    """
+    selected, context_tokens = fit_context(docs, PROMPT_CONTEXT_TOKENS if budget is None else budget)
+    context = "\n\n".join(doc.page_content.strip() for doc in selected)
+    user_content = f"[관련 문서]\n{context}\n\n[현재 시간]\n{format_now(now)}\n\n[질문]\n{question}"
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_content},
+    ]
+    return messages, selected, context_tokens
@@ -1,280 +1,566 @@
-from openai import OpenAI
 from fastapi import HTTPException
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough, RunnableParallel
-from langchain.chains import create_retrieval_chain
-from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
 from pronun_model.openai_config import OPENAI_API_KEY
+from pronun_model.openai_client import get_http_client, get_sync_http_client
+from pronun_model.rate_limit import Priority, request_priority
+from pronun_model.executor import run_blocking
+from pronun_model.openai_call import call_openai
+from pronun_model.metrics import STAGE_SECONDS, observe_stage
+from pronun_model.utils.index_store import (
+    Record,
+    content_hash,
+    index_version,
+    load_snapshot,
+    load_or_build_stores,
+)
+from pronun_model.utils.embedding_cache import CachedEmbeddings
+from pronun_model.utils.answer_cache import AnswerKey, get_answer_cache, normalize_question
+from pronun_model.utils import open_hours
+from pronun_model.utils.hospital_index import HospitalIndex
+from pronun_model.utils.symptom_matcher import SymptomMatcher
+from pronun_model.utils.prompt import PROMPT_MODEL, build_prompt
+from pronun_model.utils.token_usage import record_usage
+from pronun_model.config import (
+    ANSWER_CACHE_ENABLED,
+    HOSPITAL_CANDIDATES,
+    SYMPTOM_MATCHER_ENABLED,
+    OPENAI_TIMEOUT_LLM,
+    OPENAI_TIMEOUT_EMBEDDING,
+    OPENAI_MAX_RETRIES,
+)
 
 import os
 import re
 import logging
+import threading
+import time
 from datetime import datetime
 import pytz
-from langchain.schema.retriever import BaseRetriever
-from langchain.schema import Document
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional
 from pymongo import MongoClient
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-ada-002"
+KST = pytz.timezone('Asia/Seoul')
+
+# MongoDB 문서 → (문서 ID, 텍스트, 메타데이터) 변환
+def symptom_record(doc) -> Record:
+    text = f"증상: {doc.get('증상', '')}\n추가 증상: {doc.get('추가 증상', '')}\n추천 진료과: {doc.get('추천 진료과', '')}"
+    metadata = {
+        "증상": doc.get("증상", ""),
+        "추가 증상": doc.get("추가 증상", ""),
+        "추천 진료과": doc.get("추천 진료과", "")
+    }
+    return str(doc["_id"]), text, metadata
+
+
+def hospital_record(doc) -> Record:
+    text = f"병원이름: {doc.get('병원이름', '')}\n주소: {doc.get('주소', '')}\n영업시간: {doc.get('영업시간', '')}\n진료과목내용정보: {doc.get('진료과목내용정보', '')}"
+    metadata = {
+        "병원이름": doc.get("병원이름", ""),
+        "주소": doc.get("주소", ""),
+        "영업시간": doc.get("영업시간", ""),
+        "진료과목내용정보": doc.get("진료과목내용정보", "")
+    }
+    return str(doc["_id"]), text, metadata
+
+
 # MongoDB 데이터 로드 함수
 def load_mongodb_data():
-    """MongoDB에서 데이터를 가져와 텍스트와 메타데이터로 변환"""
+    """MongoDB에서 데이터를 가져와 (문서 ID, 텍스트, 메타데이터) 목록으로 변환"""
     try:
         # MongoDB 연결
-        client = MongoClient(os.getenv("MONGODB_URI"))
-        db = client["medical_rag"]
-        
-        # 증상 데이터 로드
-        symptoms_data = list(db["symptoms_rag"].find({}))
-        symptoms_texts = []
-        symptoms_metadatas = []
-        
-        for doc in symptoms_data:
-            text = f"증상: {doc.get('증상', '')}\n추가 증상: {doc.get('추가 증상', '')}\n추천 진료과: {doc.get('추천 진료과', '')}"
-            symptoms_texts.append(text)
-            symptoms_metadatas.append({
-                "증상": doc.get("증상", ""),
-                "추가 증상": doc.get("추가 증상", ""),
-                "추천 진료과": doc.get("추천 진료과", "")
-            })
-        
-        # 병원 데이터 로드
-        hospitals_data = list(db["hospitals_rag"].find({}))
-        hospitals_texts = []
-        hospitals_metadatas = []
-        
-        for doc in hospitals_data:
-            text = f"병원이름: {doc.get('병원이름', '')}\n주소: {doc.get('주소', '')}\n영업시간: {doc.get('영업시간', '')}\n진료과목내용정보: {doc.get('진료과목내용정보', '')}"
-            hospitals_texts.append(text)
-            hospitals_metadatas.append({
-                "병원이름": doc.get("병원이름", ""),
-                "주소": doc.get("주소", ""),
-                "영업시간": doc.get("영업시간", ""),
-                "진료과목내용정보": doc.get("진료과목내용정보", "")
-            })
-        
-        return symptoms_texts, symptoms_metadatas, hospitals_texts, hospitals_metadatas
+        with MongoClient(os.getenv("MONGODB_URI")) as client:
+            db = client["medical_rag"]
+
+            # 증상 데이터 로드
+            symptoms_records = [symptom_record(doc) for doc in db["symptoms_rag"].find({})]
+
+            # 병원 데이터 로드
+            hospitals_records = [hospital_record(doc) for doc in db["hospitals_rag"].find({})]
+
+        return symptoms_records, hospitals_records
     
     except Exception as e:
         logger.error(f"MongoDB 데이터 로드 중 오류 발생: {e}")
         raise
 
 
-def get_retriever():
-    """FAISS 벡터 스토어 및 리트리버 생성"""
+class HierarchicalRetriever:
+    """
+    증상 → 진료과 → 병원 순서로 검색하는 계층적 리트리버.
+
+    여러 요청이 동시에 검색하고, 변경 감지 작업(index_sync)이 문서 단위로 인덱스를 수정합니다.
+    질의 임베딩은 잠금 밖에서 계산하고, FAISS 검색/수정만 잠금 안에서 수행합니다.
+
+    병원 영업시간은 인덱스를 불러올 때 주간 비트셋으로 변환해 두고(open_hours), 검색된 병원을
+    현재 영업 여부와 다음 영업 시각 순으로 정렬한 뒤 영업 상태 문장만 LLM에 전달합니다.
+
+    추천 진료과에 맞는 병원은 진료과 역색인(hospital_index)에서 바로 찾고, 진료과를 찾지 못했거나
+    해당 병원이 없을 때만 병원 벡터 검색을 사용합니다.
+
+    증상도 질문에 증상 사전의 표현이 그대로 나오면 Aho-Corasick 매칭(symptom_matcher)으로 바로 찾고,
+    일치하는 증상이 없거나 모호할 때만 질의를 임베딩해 벡터 검색합니다.
+    """
+
+    def __init__(self, symptoms_vectordb: FAISS, hospitals_vectordb: FAISS, manifest: Optional[dict] = None):
+        self.symptoms_vectordb = symptoms_vectordb
+        self.hospitals_vectordb = hospitals_vectordb
+        self.stores = {"symptoms": symptoms_vectordb, "hospitals": hospitals_vectordb}
+        # 컬렉션별 문서 ID → 내용 해시 (스냅샷 manifest와 같은 형식)
+        self.hashes = {name: dict((manifest or {}).get("collections", {}).get(name, {})) for name in self.stores}
+        self.version = (manifest or {}).get("version") or index_version(self.hashes)  # 인덱스 내용 버전
+        self._lock = threading.Lock()
+
+        # 증상 사전 매칭
+        self.symptom_matcher = SymptomMatcher()
+        for doc_id in symptoms_vectordb.index_to_docstore_id.values():
+            doc = symptoms_vectordb.docstore.search(doc_id)
+            if isinstance(doc, Document):
+                self.symptom_matcher.upsert(doc_id, doc.metadata)
+
+        # 병원 문서 ID → 주간 영업시간 비트셋, 진료과 → 병원 ID 역색인
+        self.open_hours: Dict[str, int] = {}
+        self.hospital_index = HospitalIndex()
+        for doc_id in hospitals_vectordb.index_to_docstore_id.values():
+            doc = hospitals_vectordb.docstore.search(doc_id)
+            if isinstance(doc, Document):
+                self.open_hours[doc_id] = open_hours.parse_open_hours(doc.metadata.get("영업시간", ""))
+                self.hospital_index.upsert(doc_id, doc.metadata)
+
+    def _search(self, store: FAISS, query: str, k: int) -> List[Document]:
+        vector = store.embeddings.embed_query(query)
+        return self._search_by_vector(store, vector, k)
+
+    def upsert_records(self, name: str, records: List[Record]) -> int:
+        """문서를 추가하거나 내용이 바뀐 문서의 벡터를 교체합니다. 반환값은 실제로 반영된 문서 수."""
+        store = self.stores[name]
+        hashes = self.hashes[name]
+        changed = [
+            (doc_id, text, metadata, content_hash(text, metadata))
+            for doc_id, text, metadata in records
+            if hashes.get(doc_id) != content_hash(text, metadata)
+        ]
+        if not changed:
+            return 0
+
+        vectors = store.embeddings.embed_documents([text for _, text, _, _ in changed])
+        with self._lock:
+            existing = [doc_id for doc_id, _, _, _ in changed if doc_id in hashes]
+            if existing:
+                store.delete(existing)
+            store.add_embeddings(
+                [(text, vector) for (_, text, _, _), vector in zip(changed, vectors)],
+                metadatas=[metadata for _, _, metadata, _ in changed],
+                ids=[doc_id for doc_id, _, _, _ in changed],
+            )
+            for doc_id, _, _, digest in changed:
+                hashes[doc_id] = digest
+            if name == "hospitals":
+                for doc_id, _, metadata, _ in changed:
+                    self.open_hours[doc_id] = open_hours.parse_open_hours(metadata.get("영업시간", ""))
+                    self.hospital_index.upsert(doc_id, metadata)
+            else:
+                for doc_id, _, metadata, _ in changed:
+                    self.symptom_matcher.upsert(doc_id, metadata)
+            self.version = index_version(self.hashes)
+        return len(changed)
+
+    def delete_records(self, name: str, ids: List[str]) -> int:
+        """문서 ID로 벡터를 삭제합니다. 반환값은 실제로 삭제된 문서 수."""
+        store = self.stores[name]
+        hashes = self.hashes[name]
+        with self._lock:
+            ids = [doc_id for doc_id in ids if doc_id in hashes]
+            if not ids:
+                return 0
+            store.delete(ids)
+            for doc_id in ids:
+                del hashes[doc_id]
+                self.open_hours.pop(doc_id, None)
+                self.hospital_index.remove(doc_id)
+                self.symptom_matcher.remove(doc_id)
+            self.version = index_version(self.hashes)
+        return len(ids)
+
+    def _search_by_vector(self, store: FAISS, vector: List[float], k: int) -> List[Document]:
+        name = "symptoms" if store is self.symptoms_vectordb else "hospitals"
+        with observe_stage(f"search_{name}"), self._lock:
+            return store.similarity_search_by_vector(vector, k=k)
+
+    async def _asearch(self, store: FAISS, query: str, k: int) -> List[Document]:
+        vector = await store.embeddings.aembed_query(query)
+        # FAISS 검색은 CPU 작업이므로 스레드 풀에서 실행
+        return await run_blocking(self._search_by_vector, store, vector, k)
+
+    @staticmethod
+    def _recommended_departments(symptoms_docs: List[Document]) -> List[str]:
+        # 추천 진료과 추출
+        recommended_depts = []
+        for doc in symptoms_docs:
+            if hasattr(doc, 'metadata') and '추천 진료과' in doc.metadata:
+                depts = doc.metadata['추천 진료과'].split('/')
+                recommended_depts.extend([dept.strip() for dept in depts])
+            elif hasattr(doc, 'page_content'):
+                content = doc.page_content
+                if '추천 진료과:' in content or '추천 진료과' in content:
+                    if '추천 진료과:' in content:
+                        dept_part = content.split('추천 진료과:')[1].split('\n')[0]
+                    else:
+                        lines = content.split('\n')
+                        for i, line in enumerate(lines):
+                            if '추천 진료과' in line and i+1 < len(lines):
+                                dept_part = lines[i+1]
+                                break
+                        else:
+                            continue
+                    depts = dept_part.split('/')
+                    recommended_depts.extend([dept.strip() for dept in depts])
+
+        # 중복 제거
+        return list(set(dept for dept in recommended_depts if dept))
+
+    @staticmethod
+    def _enhance_query(query: str, recommended_depts: List[str]) -> str:
+        # 쿼리 강화
+        enhanced_query = query
+        if recommended_depts:
+            enhanced_query += f" 진료과: {', '.join(recommended_depts)}"
+        return enhanced_query
+
+    def rank_hospitals(
+        self,
+        docs: List[Document],
+        now: Optional[datetime] = None,
+        k: int = 8,
+        coverage: Optional[Dict[str, int]] = None,
+    ) -> List[Document]:
+        """
+        검색된 병원을 현재 영업 중인 병원 → 곧 여는 병원 → 영업시간 정보 없는 병원 순으로 정렬합니다.
+        coverage(병원 ID → 일치한 추천 진료과 수)가 주어지면 더 많은 진료과가 있는 병원이 먼저 옵니다.
+        (같은 순위 안에서는 검색 순서 유지)
+
+        반환되는 문서는 사본이며, 영업시간 줄이 "영업상태: 현재 영업 중 (17:30까지)" 같은
+        계산된 문장으로 바뀝니다. 원본 문서(docstore)는 수정하지 않습니다.
+        """
+        slot = open_hours.slot_of(now or datetime.now(KST))
+        coverage = coverage or {}
+        ranked = []
+        for rank, doc in enumerate(docs):
+            mask = self.open_hours.get(doc.id)
+            if mask is None:
+                mask = open_hours.parse_open_hours(doc.metadata.get("영업시간", ""))
+            matched = -coverage.get(doc.id, 0)
+            if open_hours.is_open(mask, slot):
+                key = (matched, 0, 0, rank)
+            elif mask:
+                key = (matched, 1, open_hours.slots_until(slot, open_hours.next_open(mask, slot)), rank)
+            else:
+                key = (matched, 2, 0, rank)
+            ranked.append((key, doc, mask))
+        ranked.sort(key=lambda item: item[0])
+
+        result = []
+        for _, doc, mask in ranked[:k]:
+            status = open_hours.describe(mask, slot)
+            content = re.sub(r"^영업시간:.*$", f"영업상태: {status}", doc.page_content, count=1, flags=re.M)
+            result.append(Document(id=doc.id, page_content=content, metadata={**doc.metadata, "영업상태": status}))
+        return result
+
+    def _indexed_hospitals(self, query: str, departments: List[str], now: Optional[datetime]) -> List[Document]:
+        """
+        진료과 역색인으로 병원을 찾습니다 (임베딩/벡터 검색 없음).
+        질문에 이름이 나온 병원을 가장 앞에 두고, 추천 진료과를 모두 갖춘 병원 → 일부만 있는 병원 순으로 정렬합니다.
+        """
+        with observe_stage("search_hospital_index"), self._lock:
+            coverage = dict(self.hospital_index.by_coverage(departments))
+            for doc_id in self.hospital_index.mentioned_in(query):
+                coverage[doc_id] = len(departments) + 1
+            docs = [self.hospitals_vectordb.docstore.search(doc_id) for doc_id in coverage]
+        docs = [doc for doc in docs if isinstance(doc, Document)]
+        return self.rank_hospitals(docs, now, k=8, coverage=coverage)
+
+    def _matched_symptoms(self, query: str, k: int = 3) -> Optional[List[Document]]:
+        """증상 사전 매칭 결과 (일치하는 증상이 없거나 모호하면 None → 벡터 검색)"""
+        if not SYMPTOM_MATCHER_ENABLED:
+            return None
+        with observe_stage("search_symptom_matcher"), self._lock:
+            doc_ids = self.symptom_matcher.match(query)
+            if not doc_ids:
+                return None
+            docs = [self.symptoms_vectordb.docstore.search(doc_id) for doc_id in doc_ids[:k]]
+        return [doc for doc in docs if isinstance(doc, Document)] or None
+
+    def match_signature(self, query: str, symptoms_docs: List[Document]) -> tuple:
+        """
+        사전 매칭된 질문의 답변 캐시 키: (매칭된 증상 ID, 질문에 이름이 나온 병원 ID, 정규화한 질문).
+        같은 증상이라도 묻는 내용("두통이 뭐예요?" / "두통에 좋은 병원 알려줘")이 다르면 다른 키가 됩니다.
+        """
+        with self._lock:
+            mentioned = self.hospital_index.mentioned_in(query)
+        return tuple(sorted(doc.id for doc in symptoms_docs)), tuple(sorted(mentioned)), normalize_question(query)
+
+    def get_relevant_documents(self, query: str, now: Optional[datetime] = None) -> List[Document]:
+        # 증상 관련 문서 검색 (사전 매칭 → 없으면 벡터 검색)
+        symptoms_docs = self._matched_symptoms(query) or self._search(self.symptoms_vectordb, query, k=3)
+
+        # 병원 정보 검색: 진료과 역색인 → (없으면) 벡터 검색 후보를 영업 상태 순으로 8개 선택
+        departments = self._recommended_departments(symptoms_docs)
+        hospitals_docs = self._indexed_hospitals(query, departments, now)
+        if not hospitals_docs:
+            enhanced_query = self._enhance_query(query, departments)
+            hospitals_docs = self._search(self.hospitals_vectordb, enhanced_query, k=HOSPITAL_CANDIDATES)
+            hospitals_docs = self.rank_hospitals(hospitals_docs, now, k=8)
+
+        # 결과 통합
+        return symptoms_docs + hospitals_docs
+
+    async def aget_relevant_documents(
+        self,
+        query: str,
+        now: Optional[datetime] = None,
+        matched: Optional[List[Document]] = None,
+    ) -> List[Document]:
+        """
+        get_relevant_documents의 비동기 버전 (질의 임베딩은 공유 AsyncOpenAI 연결 풀 사용).
+        matched: 이미 구한 사전 매칭 결과 (답변 캐시 키를 만들 때 매칭한 경우 다시 매칭하지 않음, 일치 없음은 [])
+        """
+        if matched is None:
+            matched = self._matched_symptoms(query)
+        symptoms_docs = matched or await self._asearch(self.symptoms_vectordb, query, k=3)
+        departments = self._recommended_departments(symptoms_docs)
+        hospitals_docs = self._indexed_hospitals(query, departments, now)
+        if not hospitals_docs:
+            enhanced_query = self._enhance_query(query, departments)
+            hospitals_docs = await self._asearch(self.hospitals_vectordb, enhanced_query, k=HOSPITAL_CANDIDATES)
+            hospitals_docs = self.rank_hospitals(hospitals_docs, now, k=8)
+        return symptoms_docs + hospitals_docs
+
+
+_embeddings: Optional[CachedEmbeddings] = None
+
+
+async def _aembed_query(text: str) -> List[float]:
+    """질의 임베딩 요청 (요청 처리 경로이므로 call_openai의 제한 시간/재시도/헤징/회로 차단 적용)"""
+    response = await call_openai(
+        "embedding",
+        lambda client: client.embeddings.create(model=EMBEDDING_MODEL, input=text),
+    )
+    return response.data[0].embedding
+
+
+def get_embeddings() -> CachedEmbeddings:
+    """문서/질의 임베딩 모델 (프로세스 전역, 디스크 캐시 사용)"""
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = CachedEmbeddings(
+            # 문서 임베딩(인덱스 생성/동기화, 스레드 풀의 동기 호출)은 call_openai를 거치지 않으므로 SDK 재시도 사용
+            OpenAIEmbeddings(
+                model=EMBEDDING_MODEL,
+                openai_api_key=OPENAI_API_KEY,
+                request_timeout=OPENAI_TIMEOUT_EMBEDDING,
+                max_retries=OPENAI_MAX_RETRIES,
+                http_client=get_sync_http_client(),
+                http_async_client=get_http_client()
+            ),
+            model=EMBEDDING_MODEL,
+            aembed=_aembed_query,
+        )
+    return _embeddings
+
+
+def build_retriever() -> HierarchicalRetriever:
+    """
+    FAISS 벡터 스토어 및 리트리버 생성
+
+    디스크 스냅샷(INDEX_DIR)을 먼저 불러온 뒤 내용이 바뀐 문서만 다시 임베딩합니다.
+    MongoDB에 연결할 수 없으면 마지막 스냅샷으로 서비스합니다.
+    """
     try:
         # 임베딩 모델
-        embeddings = OpenAIEmbeddings(
-            model="text-embedding-ada-002",
-            openai_api_key=OPENAI_API_KEY
-        )
-        
+        embeddings = get_embeddings()
+
         # MongoDB 데이터 로드
-        symptoms_texts, symptoms_metadatas, hospitals_texts, hospitals_metadatas = load_mongodb_data()
-        
-        # FAISS 벡터 스토어 생성
-        symptoms_vectordb = FAISS.from_texts(symptoms_texts, embeddings, metadatas=symptoms_metadatas)
-        hospitals_vectordb = FAISS.from_texts(hospitals_texts, embeddings, metadatas=hospitals_metadatas)
-        
-        # 리트리버 생성
-        symptoms_retriever = symptoms_vectordb.as_retriever(search_kwargs={"k": 3})
-        hospitals_retriever = hospitals_vectordb.as_retriever(search_kwargs={"k": 8})
-        
-        # 계층적 검색 함수 정의 (클래스 대신 사용)
-        def hierarchical_retriever(query):
-            # 증상 관련 문서 검색
-            symptoms_docs = symptoms_retriever.get_relevant_documents(query)
-            
-            # 추천 진료과 추출
-            recommended_depts = []
-            for doc in symptoms_docs:
-                if hasattr(doc, 'metadata') and '추천 진료과' in doc.metadata:
-                    depts = doc.metadata['추천 진료과'].split('/')
-                    recommended_depts.extend([dept.strip() for dept in depts])
-                elif hasattr(doc, 'page_content'):
-                    content = doc.page_content
-                    if '추천 진료과:' in content or '추천 진료과' in content:
-                        if '추천 진료과:' in content:
-                            dept_part = content.split('추천 진료과:')[1].split('\n')[0]
-                        else:
-                            lines = content.split('\n')
-                            for i, line in enumerate(lines):
-                                if '추천 진료과' in line and i+1 < len(lines):
-                                    dept_part = lines[i+1]
-                                    break
-                            else:
-                                continue
-                        depts = dept_part.split('/')
-                        recommended_depts.extend([dept.strip() for dept in depts])
-            
-            # 중복 제거
-            recommended_depts = list(set(recommended_depts))
-            
-            # 쿼리 강화
-            enhanced_query = query
-            if recommended_depts:
-                enhanced_query += f" 진료과: {', '.join(recommended_depts)}"
-            
-            # 병원 정보 검색
-            hospitals_docs = hospitals_retriever.get_relevant_documents(enhanced_query)
-            
-            # 결과 통합
-            return symptoms_docs + hospitals_docs
-        
-        # 함수를 리트리버처럼 작동하게 만듦
-        class FunctionBasedRetriever(BaseRetriever):
-            def get_relevant_documents(self, query):
-                return hierarchical_retriever(query)
-        
-        return FunctionBasedRetriever()
-        
+        try:
+            symptoms_records, hospitals_records = load_mongodb_data()
+        except Exception:
+            snapshot = load_snapshot(embeddings, EMBEDDING_MODEL)
+            if snapshot is None:
+                raise
+            stores, manifest = snapshot
+            logger.info(f"MongoDB 로드 실패로 스냅샷 {manifest['version']}을 사용합니다.")
+            return HierarchicalRetriever(stores["symptoms"], stores["hospitals"], manifest)
+
+        # 스냅샷 로드 + 변경분 임베딩 (사용자 질문보다 낮은 우선순위로 요청)
+        with request_priority(Priority.BACKGROUND):
+            stores, manifest = load_or_build_stores(
+                {"symptoms": symptoms_records, "hospitals": hospitals_records},
+                embeddings,
+                EMBEDDING_MODEL,
+            )
+
+        logger.info(f"리트리버 생성 완료: 증상 {len(symptoms_records)}건, 병원 {len(hospitals_records)}건, 버전 {manifest['version']}")
+        return HierarchicalRetriever(stores["symptoms"], stores["hospitals"], manifest)
+
     except Exception as e:
         logger.error(f"리트리버 생성 중 오류 발생: {e}")
         raise
 
-# 3) 최신 방식의 QA 체인 생성
-def get_qa_chain():
-    retriever = get_retriever()
-    llm = ChatOpenAI(
-        model_name="gpt-4o-mini",
-        openai_api_key=OPENAI_API_KEY,
-        temperature=0
-    )
-    
-    # 현재 한국 시간 가져오기
-    kst = pytz.timezone('Asia/Seoul')
-    now = datetime.now(kst)
-    current_day_en = now.strftime("%A")  # 영어 요일
-    weekday_map = {
-        "Monday": "월요일", 
-        "Tuesday": "화요일", 
-        "Wednesday": "수요일", 
-        "Thursday": "목요일", 
-        "Friday": "금요일", 
-        "Saturday": "토요일", 
-        "Sunday": "일요일"
-    }
-    current_day_kr = weekday_map[current_day_en]  # 한국어 요일
-    current_hour = now.hour
-    current_minute = now.minute
-    current_time_formatted = f"{current_hour:02d}{current_minute:02d}"  # HHMM 형식 (예: 0830)
-    current_time_display = f"{current_hour:02d}:{current_minute:02d}"  # HH:MM 형식 (예: 08:30)
-    
-    # 문서 포맷팅 함수
-    def format_docs(docs):
-        return "\n\n".join(doc.page_content for doc in docs)
-    
-    # 프롬프트 템플릿 생성
-    system_prompt = f"""
-    당신은 용인 지역 병원 정보 안내 및 진료과 추천 도우미입니다. 사용자가 용인 지역 병원에 대한 정보를 요청하거나 증상에 맞는 진료과와 병원을 추천해 달라고 하면 정확하고 상세하게 안내해 주세요.
-
-    현재 시간은 {current_day_kr}({current_day_en}) {current_time_display} (한국 시간)입니다. 병원 운영 여부와 진료 시간 안내 시 현재 시간을 참고하세요.
-
-    [두 종류의 데이터]
-    1. 증상 데이터: 다양한 증상에 대한 추천 진료과를 포함
-    - 형식: 증상, 추가 증상, 추천 진료과
-    - 예시: "잦은 두통, 편두통", "스트레스성 또는 긴장성 두통이 원인일 수 있음", "신경과"
-
-    2. 병원 데이터: 용인 지역 병원 정보를 포함
-    - 형식: 병원이름, 주소, 영업시간, 진료과목내용정보
-    - 예시: "(의)영문의료재단다보스병원", "경기도 용인시 처인구...", "월요일: 0830~1730...", "내과, 신경과..."
-
-    [진료과 추천 및 병원 안내 가이드라인]
-    1. 사용자가 증상이나 아픈 부위를 언급하면:
-    a) 사용자의 증상과 불편함에 대해 공감을 표현하세요.
-    b) 이러한 증상이 일반적으로 어떤 질환이나 상태를 의심할 수 있는지 간략히 설명하세요.
-    c) 증상 데이터에서 관련 정보를 찾아 적합한 진료과를 식별하고 추천하세요.
-    d) 만약 증상 데이터에서 관련 정보를 찾지 못했다면, 의학적 지식을 바탕으로 적절한 진료과 추천하세요.
-
-    2. 사용자가 특정 병원 정보를 요청하면:
-    관련 병원 정보를 직접 제공
-
-    3. 추천한 진료과가 있는 병원들을 찾아 안내해 주세요.
-    - 필요한 모든 진료과가 있는 병원을 우선 추천하세요.
-    - 한 병원에서 모든 진료과를 볼 수 없는 경우, 없는 진료과에 한해 다른 병원을 추가 추천하세요.
-
-    [현재 시간 기반 병원 추천]
-    1. 영업시간 형식은 "요일: HHMM~HHMM" 형식으로 되어 있습니다. (예: 월요일: 0830~1730)
-    2. 현재 시간({current_day_kr} {current_time_display})에 열려있는 병원을 확인하세요.
-    - 현재 요일과 시간(HHMM 형식: {current_time_formatted})을 영업시간과 비교하세요.
-    - 예: 현재 월요일 09:30이라면, "월요일: 0830~1730"인 병원은 영업 중입니다.
-    3. 열려있는 병원을 우선적으로 추천하세요.
-    4. 현재 닫혀있는 경우:
-    - 오늘 이후 다음 영업일과 시간을 확인하세요.
-    - 다음날 가장 빠르게 열리는 병원을 우선적으로 추천하세요.
-    - 항상 추천한 진료과가 있는 병원 중에서만 선택하세요.
-
-    [응답 형식]
-    1. 응답은 다음과 같은 구조로 작성하세요:
-        a) 먼저 사용자의 증상에 공감하는 문장으로 시작하세요. 예: "무거운걸 들다가 삐끗하신 이후로 어깨가 아프셨군요! 많이 불편하셨겠어요."
-        b) 그 다음 이러한 증상이 일반적으로 어떤 질환일 수 있는지 설명하세요. 예: "일반적으로 그런 경우에 어깨 염좌를 의심할 수 있어요."
-        c) 권장 진료과를 명확히 안내하세요. 예: "증상이 지속된다면 정형외과로 방문해보시는 것을 추천드려요."
-        d) 현재 영업 중인 병원이 있는지 상태를 설명하고, 없으면 다음 영업일이 언제인지만 간략히 언급하세요.
-        e) 응답의 마지막은 반드시 "추천 병원을 알려드릴까요?"라는 문장으로 끝내세요.
-    2. 정보를 구분할 때는 마침표와 단일 공백만 사용하세요. 연속된 공백은 사용하지 마세요.
-    3. 병원 이름, 주소, 영업시간, 진료과목 등은 응답에 포함하지 마세요.
-    4. 응답은 친절하고 공감적인 톤으로, 간결하고 명확하게 작성하세요.
-
-    컨텍스트에 없는 정보는 추측하지 말고, "해당 정보는 제공된 데이터에 없습니다"라고 솔직하게 답변하세요.
-    사용자가 용인 지역 외 병원 정보를 요청하면, "현재 용인 지역 병원 정보만 제공 가능합니다"라고 안내하세요.
+
+# 프로세스 전역 리트리버 (시작 시 한 번 생성, refresh_retriever()로만 교체)
+_retriever: Optional[HierarchicalRetriever] = None
+_retriever_lock = threading.Lock()
+
+
+def init_retriever() -> HierarchicalRetriever:
+    """리트리버가 아직 없으면 생성합니다. 동시에 호출되어도 한 번만 생성됩니다."""
+    global _retriever
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                _retriever = build_retriever()
+    return _retriever
+
+
+def refresh_retriever() -> HierarchicalRetriever:
+    """
+    MongoDB에서 데이터를 다시 읽어 인덱스를 재생성한 뒤 교체합니다.
+
+    새 인덱스를 완성한 다음 참조만 바꾸므로, 재생성 중에도 기존 요청은 이전 인덱스로 계속 처리됩니다.
     """
+    global _retriever
+    with _retriever_lock:
+        _retriever = build_retriever()
+    return _retriever
+
+
+def get_retriever() -> HierarchicalRetriever:
+    """공유 리트리버 반환 (시작 시 생성되지 않았다면 첫 호출에서 생성)"""
+    return _retriever or init_retriever()
+
+
+_llm: Optional[ChatOpenAI] = None
+
+
+def get_llm() -> ChatOpenAI:
+    global _llm
+    if _llm is None:
+        _llm = ChatOpenAI(
+            model_name=PROMPT_MODEL,
+            openai_api_key=OPENAI_API_KEY,
+            temperature=0,
+            stream_usage=True,  # 스트리밍에서도 토큰 사용량 수신
+            # 재시도/헤징/회로 차단은 call_openai("llm", ...)에서 처리하므로 SDK 재시도는 끔 (재시도가 겹치지 않도록)
+            request_timeout=OPENAI_TIMEOUT_LLM,
+            max_retries=0,
+            http_client=get_sync_http_client(),
+            http_async_client=get_http_client()
+        )
+    return _llm
+
+# 병원 이름 추출 함수
+def extract_hospitals(docs):
+    hospital_names = []
+    for doc in docs:
+        content = doc.page_content
+        if "병원이름:" in content:
+            hospital_name = content.split("병원이름:")[1].split("\n")[0].strip()
+            hospital_names.append(hospital_name)
     
-    # 병원 이름 추출 함수
-    def extract_hospitals(docs):
-        hospital_names = []
-        for doc in docs:
-            content = doc.page_content
-            if "병원이름:" in content:
-                hospital_name = content.split("병원이름:")[1].split("\n")[0].strip()
-                hospital_names.append(hospital_name)
-        
-        # 중복 제거 및 최대 3개로 제한
-        return list(set(hospital_names))[:3]
+    # 중복 제거 및 최대 3개로 제한 (문서 순서 = 영업 상태 순위이므로 순서 유지)
+    return list(dict.fromkeys(hospital_names))[:3]
+
+
+# 응답 후처리 - 더 강화된 버전
+def postprocess_answer(text: str) -> str:
+    # 모든 줄바꿈을 공백으로 변환
+    processed_response = text.replace("\n", " ")
+    # 연속된 공백을 하나의 공백으로 변환 (정규식 사용)
+    processed_response = re.sub(r'\s+', ' ', processed_response)
+    # 문장 앞뒤 공백 제거
+    return processed_response.strip()
+
+
+# 답변 캐시 키: (증상 사전 매칭 결과 또는 질문 임베딩, (요일, 시간 슬롯, 인덱스 버전))
+async def answer_cache_key(
+    retriever: HierarchicalRetriever,
+    question: str,
+    now: datetime,
+    matched: Optional[List[Document]],
+) -> Optional[AnswerKey]:
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    bucket = get_answer_cache().bucket(now, retriever.version)
+    if matched:
+        # 사전에서 증상을 찾은 질문은 임베딩 요청 없이 매칭 결과와 질문이 같은 항목만 사용
+        return AnswerKey(bucket, signature=retriever.match_signature(question, matched))
+    # 질문 임베딩은 임베딩 캐시에 저장되므로 이어지는 문서 검색에서 다시 요청하지 않음
+    vector = await get_embeddings().aembed_query(question)
+    return AnswerKey(bucket, vector=vector)
+
+
+# 문서 검색 + 프롬프트 구성
+async def build_messages(
+    retriever: HierarchicalRetriever,
+    question: str,
+    now: Optional[datetime] = None,
+    matched: Optional[List[Document]] = None,
+):
+    """(메시지, 병원 목록, 컨텍스트 토큰 수) 반환"""
+    if now is None:
+        now = datetime.now(KST)
+
+    # 1. 문서 검색
+    docs = await retriever.aget_relevant_documents(question, now, matched)
+
+    # 2. 중복 제거 + 토큰 예산 안에서 프롬프트 구성 (고정 지시문 → 문서/현재 시간/질문)
+    messages, docs, context_tokens = build_prompt(question, docs, now)
+
+    hospitals = extract_hospitals(docs)
+    return messages, hospitals, context_tokens
+
+
+# 4) QA 체인 생성 (공유 리트리버/LLM 사용, 요청마다 인덱스를 만들지 않음)
+def get_qa_chain():
+    retriever = get_retriever()
+    llm = get_llm()
 
     # 매우 간단한 체인 구현
-    def simple_qa_chain(question):
-        # 1. 문서 검색
-        docs = retriever.get_relevant_documents(question)
-        
-        hospitals = extract_hospitals(docs)
+    async def simple_qa_chain(question):
+        # 비슷한 질문이 같은 시간대에 이미 처리되었으면 캐시된 결과 반환
+        now = datetime.now(KST)
+        # 증상 사전 매칭은 한 번만 (답변 캐시 키와 문서 검색에 함께 사용, 일치 없음은 [])
+        matched = retriever._matched_symptoms(question) or []
+        cache_key = await answer_cache_key(retriever, question, now, matched)
+        if cache_key is not None:
+            cached = get_answer_cache().get(cache_key)
+            if cached is not None:
+                return cached
 
-        # 2. 문서 형식 변환
-        formatted_docs = " ".join(doc.page_content for doc in docs)
-        
-        # 3. 프롬프트 구성
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"질문과 관련된 문서입니다: {formatted_docs} 질문: {question}"}
-        ]
+        messages, hospitals, context_tokens = await build_messages(retriever, question, now, matched)
         
         # 4. LLM 호출
-        response = llm.invoke(messages)
+        with observe_stage("llm_completion"):
+            response = await call_openai("llm", lambda _: llm.ainvoke(messages))
+        record_usage(PROMPT_MODEL, response.usage_metadata, context_tokens)
         
-        # 응답 후처리 - 더 강화된 버전
-        processed_response = response.content
-        # 5. 모든 줄바꿈을 공백으로 변환
-        processed_response = processed_response.replace("\n", " ")
-        # 6. 연속된 공백을 하나의 공백으로 변환 (정규식 사용)
-        processed_response = re.sub(r'\s+', ' ', processed_response)
-        # 7. 문장 앞뒤 공백 제거
-        processed_response = processed_response.strip()
-        
-        # 8. 결과 반환 - 딕셔너리로 변경
-        return {
-            "answer": processed_response,
+        # 5. 결과 반환 - 딕셔너리로 변경
+        result = {
+            "answer": postprocess_answer(response.content),
             "hospitals": hospitals
         }
+        if cache_key is not None:
+            get_answer_cache().put(cache_key, result)
+        return result
     
     return simple_qa_chain
 
 
-# 4) 질의 함수
-def ask_question(question: str) -> dict:
+# 5) 질의 함수
+async def ask_question(question: str) -> dict:
     """
     RAG 기반 질의:
     
@@ -283,12 +569,106 @@ def ask_question(question: str) -> dict:
     3) 응답 및 병원 목록 반환
     """
     try:
-        qa_chain = get_qa_chain()
-        result = qa_chain(question)
+        # 리트리버가 아직 없으면 생성(블로킹)하므로 스레드 풀에서 실행
+        qa_chain = await run_blocking(get_qa_chain)
+        result = await qa_chain(question)
         return result  # 이제 {"answer": "...", "hospitals": [...]} 형태의 딕셔너리 반환
+    except HTTPException:
+        # OpenAI 호출 오류는 call_openai()에서 로그를 남기고 변환함 (회로 차단 503 등 유지)
+        raise
     except Exception as e:
         logger.error(f"RAG 질의 중 오류 발생: {e}", extra={
             "errorType": type(e).__name__,
             "error_message": str(e)
         })
+        raise HTTPException(status_code=500, detail=f"RAG 질의 오류: {e}")
+
+
+async def _open_stream(messages):
+    """LLM 스트림을 열고 첫 조각까지 받음 → (첫 조각 또는 None, 스트림)"""
+    stream = get_llm().astream(messages)
+    try:
+        return await stream.__anext__(), stream
+    except StopAsyncIteration:
+        return None, stream
+    except BaseException:
+        # 실패/헤징에서 진 요청의 연결 정리
+        await stream.aclose()
+        raise
+
+
+async def _astream_llm(messages) -> AsyncIterator:
+    """
+    LLM 스트리밍. 첫 조각을 받기 전까지는 call_openai로 제한 시간/재시도/헤징/회로 차단을 적용하고,
+    답변 조각을 보내기 시작한 뒤에는 (중복 출력이 되지 않도록) 재시도하지 않습니다.
+    """
+    first, stream = await call_openai("llm", lambda _: _open_stream(messages))
+    try:
+        if first is not None:
+            yield first
+        async for chunk in stream:
+            yield chunk
+    finally:
+        await stream.aclose()
+
+
+async def ask_question_stream(question: str) -> AsyncIterator[dict]:
+    """
+    ask_question의 스트리밍 버전.
+
+    Yields:
+        {"type": "delta", "text": "..."}: LLM이 생성하는 답변 조각 (줄바꿈/연속 공백 정리됨)
+        {"type": "result", "answer": "...", "hospitals": [...]}: 마지막 이벤트 (ask_question 결과와 동일)
+    """
+    try:
+        retriever = await run_blocking(get_retriever)
+
+        now = datetime.now(KST)
+        # 증상 사전 매칭은 한 번만 (답변 캐시 키와 문서 검색에 함께 사용, 일치 없음은 [])
+        matched = retriever._matched_symptoms(question) or []
+        cache_key = await answer_cache_key(retriever, question, now, matched)
+        if cache_key is not None:
+            cached = get_answer_cache().get(cache_key)
+            if cached is not None:
+                yield {"type": "delta", "text": cached["answer"]}
+                yield {"type": "result", **cached}
+                return
+
+        messages, hospitals, context_tokens = await build_messages(retriever, question, now, matched)
+
+        chunks = []
+        last_char = " "  # 답변 앞 공백 제거
+        started = time.perf_counter()
+        async for chunk in _astream_llm(messages):
+            if not chunks and chunk.content:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_first_token")
+            if chunk.usage_metadata:
+                record_usage(PROMPT_MODEL, chunk.usage_metadata, context_tokens)
+            if not chunk.content:
+                continue
+            chunks.append(chunk.content)
+            # 조각 경계를 넘는 연속 공백도 하나로 정리
+            delta = re.sub(r'\s+', ' ', chunk.content)
+            if last_char == " " and delta.startswith(" "):
+                delta = delta[1:]
+            if delta:
+                last_char = delta[-1]
+                yield {"type": "delta", "text": delta}
+
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_completion")
+
+        result = {
+            "answer": postprocess_answer("".join(chunks)),
+            "hospitals": hospitals,
+        }
+        if cache_key is not None:
+            get_answer_cache().put(cache_key, result)
+        yield {"type": "result", **result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"RAG 스트리밍 질의 중 오류 발생: {e}", extra={
+            "errorType": type(e).__name__,
+            "error_message": str(e)
+        })
         raise HTTPException(status_code=500, detail=f"RAG 질의 오류: {e}")
\ No newline at end of file
@@ -1,136 +1,134 @@
-from fastapi import HTTPException
-from openai import OpenAI
-from openai import (
-    AuthenticationError,
-    APIError,
-    APITimeoutError,
-    APIConnectionError,
-    RateLimitError,
-    BadRequestError,
-    OpenAIError,
-    ConflictError,
-    InternalServerError,
-    NotFoundError,
-    PermissionDeniedError,
-    UnprocessableEntityError
-)
-from ..openai_config import OPENAI_API_KEY
-from typing import Optional
+from ..openai_call import call_openai
+from ..config import STT_CHUNK_CONCURRENCY
+from ..metrics import timed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+import asyncio
 import logging
+import re
+import time
 
 # 모듈별 로거 생성
 logger = logging.getLogger(__name__)
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+MAX_OVERLAP_WORDS = 20  # 조각 경계에서 중복으로 볼 최대 단어 수
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
 
-def STT(audio_file_path: str) -> Optional[str]:
+
+@dataclass
+class Segment:
+    """Whisper verbose_json 세그먼트의 신뢰도 정보"""
+    duration: float
+    avg_logprob: float
+    no_speech_prob: float
+    compression_ratio: float
+
+
+@dataclass
+class Transcript:
+    text: str
+    segments: List[Segment] = field(default_factory=list)  # 비어 있으면 신뢰도 정보 없음
+
+
+def _word_key(word: str) -> str:
+    """겹침 비교용 단어 정규화 (문장부호/대소문자 무시)"""
+    return _NON_WORD.sub("", word.lower())
+
+
+def stitch_transcripts(transcripts: List[str], overlapped: Sequence[bool]) -> str:
     """
-    주어진 오디오 파일을 텍스트로 변환(STT).
+    조각별 변환 결과를 순서대로 이어 붙입니다.
+
+    조각이 겹치게 잘린 경계(무음을 찾지 못한 경계, overlapped[i]가 참)에서는 앞 조각의 끝 단어들과
+    다음 조각의 첫 단어들이 같으므로, 일치하는 가장 긴 단어열(최대 MAX_OVERLAP_WORDS개)을 한 번만 남깁니다.
+    무음에서 자른 경계는 겹치지 않으므로 경계에서 실제로 반복한 말("아파요 아파요")도 그대로 둡니다.
+    """
+    words: List[str] = []
+    for i, transcript in enumerate(transcripts):
+        next_words = (transcript or "").split()
+        limit = min(MAX_OVERLAP_WORDS, len(words), len(next_words)) if i and overlapped[i - 1] else 0
+        for k in range(limit, 0, -1):
+            if [_word_key(w) for w in words[-k:]] == [_word_key(w) for w in next_words[:k]]:
+                next_words = next_words[k:]
+                break
+        words.extend(next_words)
+    return " ".join(words)
+
+
+@timed("stt")
+async def transcribe(
+    chunks: List[Union[str, Tuple[str, bytes]]],
+    overlapped: Optional[Sequence[bool]] = None,
+) -> Optional[Transcript]:
+    """
+    음성 조각들을 동시에(STT_CHUNK_CONCURRENCY개까지) 변환하고 순서대로 이어 붙입니다.
+    조각 하나라도 실패하면 나머지 변환을 취소하고 그 오류를 그대로 올립니다.
 
     Args:
-        audio_file_path (str): 입력 오디오 파일 경로.
+        chunks: STT()에 전달할 음성 조각 목록 (audio_preprocess.normalize_audio 결과 등).
+        overlapped: 조각 경계별 겹침 여부 (없으면 겹치지 않은 것으로 봄).
 
     Returns:
-        str: 변환된 텍스트.
-        None: 변환 실패 시.
+        Transcript: 이어 붙인 텍스트와 전체 세그먼트 신뢰도 정보.
+        None: 변환 결과가 비어 있을 때.
     """
+    if len(chunks) == 1:
+        return await STT(chunks[0])
+
+    semaphore = asyncio.Semaphore(STT_CHUNK_CONCURRENCY)
+
+    async def run(chunk):
+        async with semaphore:
+            return await STT(chunk)
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(run(chunk)) for chunk in chunks]
     try:
-        with open(audio_file_path, "rb") as audio_file:
-            response = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language='ko'
-            )
-        transcript = response.text
-        return transcript
-
-    except AuthenticationError as e:
-        logger.error(f"STT 변환 중 인증 오류 발생: {e}", extra={
-            "errorType": "AuthenticationError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=401, detail="인증 오류: API 키를 확인해주세요.") from e
-
-    except PermissionDeniedError as e:
-        logger.error(f"STT 변환 중 권한 오류 발생: {e}", extra={
-            "errorType": "PermissionDeniedError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=403, detail="권한 오류: API 사용 권한을 확인해주세요.") from e
-
-    except RateLimitError as e:
-        logger.error(f"STT 변환 중 Rate Limit 초과: {e}", extra={
-            "errorType": "RateLimitError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=429, detail="요청 제한 초과: 요청 속도를 줄여주세요.") from e
-
-    except BadRequestError as e:
-        logger.error(f"STT 변환 중 잘못된 요청 오류 발생: {e}", extra={
-            "errorType": "BadRequestError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=400, detail="잘못된 요청: 요청 데이터를 확인해주세요.") from e
-
-    except ConflictError as e:
-        logger.error(f"STT 변환 중 충돌 오류 발생: {e}", extra={
-            "errorType": "ConflictError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=409, detail="충돌 오류: 요청을 다시 시도해주세요.") from e
-
-    except InternalServerError as e:
-        logger.error(f"STT 변환 중 내부 서버 오류 발생: {e}", extra={
-            "errorType": "InternalServerError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=502, detail="내부 서버 오류: 나중에 다시 시도해주세요.") from e
-
-    except NotFoundError as e:
-        logger.error(f"STT 변환 중 자원 미존재 오류 발생: {e}", extra={
-            "errorType": "NotFoundError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=404, detail="자원이 존재하지 않습니다.") from e
-
-    except UnprocessableEntityError as e:
-        logger.error(f"STT 변환 중 처리 불가능한 엔티티 오류 발생: {e}", extra={
-            "errorType": "UnprocessableEntityError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=422, detail="처리 불가능한 데이터입니다.") from e
-
-    except APIError as e:
-        logger.error(f"STT 변환 중 API 오류 발생: {e}", extra={
-            "errorType": "APIError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=502, detail="서버 오류: 나중에 다시 시도해주세요.") from e
-
-    except APITimeoutError as e:
-        logger.error(f"STT 변환 중 API 타임아웃 오류 발생: {e}", extra={
-            "errorType": "APITimeoutError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=504, detail="서버 응답 지연: 나중에 다시 시도해주세요.") from e
-
-    except APIConnectionError as e:
-        logger.error(f"STT 변환 중 API 연결 오류 발생: {e}", extra={
-            "errorType": "APIConnectionError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=503, detail="연결 오류: 네트워크 상태를 확인해주세요.") from e
-
-    except OpenAIError as e:
-        logger.error(f"STT 변환 중 OpenAI 라이브러리 오류 발생: {e}", extra={
-            "errorType": "OpenAIError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=500, detail="OpenAI 처리 중 알 수 없는 오류가 발생했습니다.") from e
-
-    except Exception as e:
-        logger.error(f"STT 변환 오류: {e}", extra={
-            "errorType": type(e).__name__,
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=500, detail="STT 변환 중 오류 발생") from e
\ No newline at end of file
+        transcripts = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    text = stitch_transcripts(
+        [transcript.text if transcript else "" for transcript in transcripts],
+        overlapped or [False] * (len(chunks) - 1),
+    )
+    logger.info(f"긴 음성 변환 완료: 조각 {len(chunks)}개, {len(text.split())}단어, "
+                f"{time.perf_counter() - started:.1f}초")
+    if not text:
+        return None
+    segments = [segment for transcript in transcripts if transcript for segment in transcript.segments]
+    return Transcript(text=text, segments=segments)
+
+
+async def STT(audio: Union[str, Tuple[str, bytes]]) -> Optional[Transcript]:
+    """
+    주어진 오디오 파일을 텍스트로 변환(STT).
+    verbose_json으로 요청해 세그먼트별 avg_logprob/no_speech_prob도 함께 받습니다 (보정 여부 판단용).
+
+    Args:
+        audio (str | Tuple[str, bytes]): 입력 오디오 파일 경로, 또는 정규화된 (파일 이름, 데이터).
+
+    Returns:
+        Transcript: 변환된 텍스트와 세그먼트 신뢰도 정보.
+        None: 변환 결과가 비어 있을 때.
+    """
+    response = await call_openai("stt", lambda client: client.audio.transcriptions.create(
+        model="whisper-1",
+        file=Path(audio) if isinstance(audio, str) else audio,
+        language='ko',
+        response_format="verbose_json",
+    ))
+    if not response.text:
+        return None
+    segments = [
+        Segment(
+            duration=segment.end - segment.start,
+            avg_logprob=segment.avg_logprob,
+            no_speech_prob=segment.no_speech_prob,
+            compression_ratio=segment.compression_ratio,
+        )
+        for segment in response.segments or []
+    ]
+    return Transcript(text=response.text.strip(), segments=segments)
@@ -0,0 +1,158 @@
+# pronun_model/utils/symptom_matcher.py
+
+"""
+규칙 기반 증상 → 진료과 매칭.
+
+증상 데이터의 증상/추가 증상 표현으로 Aho-Corasick 자동자를 만들어, 질문에 그대로 나오는 증상을
+한 번의 선형 탐색으로 찾습니다. 질문과 사전 모두 공백/문장부호를 제거하고 끝의 조사·어미를
+정리해서 비교하므로 "두통이 심해요", "두 통" 같은 표현도 "두통"과 일치합니다.
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+import re
+
+# 용어 구분자: 쉼표, 슬래시, 가운뎃점, 줄바꿈 등
+_SEPARATORS = re.compile(r"[,/·ㆍ|;\n]+")
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+# 사전 용어 끝에 붙은 조사/어미 (예: "어지러움이" → "어지러움", "삐끗함" 그대로)
+_TRAILING_PARTICLES = re.compile(r"(이|가|을|를|은|는|도|에|의|으로|로|과|와)$")
+
+MIN_TERM_LENGTH = 2  # 한 글자 용어("열" 등)는 다른 단어에 포함되기 쉬워 제외
+
+
+def normalize(text: str) -> str:
+    """소문자화 후 공백/문장부호 제거"""
+    return _NON_WORD.sub("", (text or "").lower())
+
+
+def normalize_term(term: str) -> str:
+    term = normalize(term)
+    stripped = _TRAILING_PARTICLES.sub("", term)
+    return stripped if len(stripped) >= MIN_TERM_LENGTH else term
+
+
+def split_terms(text: str) -> Set[str]:
+    """증상 필드 → 정규화된 용어 집합"""
+    terms = (normalize_term(part) for part in _SEPARATORS.split(text or ""))
+    return {term for term in terms if len(term) >= MIN_TERM_LENGTH}
+
+
+class AhoCorasick:
+    """여러 패턴을 한 번에 찾는 Aho-Corasick 자동자 (문자 단위)"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+
+        for pattern in patterns:
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(pattern)
+
+        # 실패 링크 (BFS, 루트의 자식은 루트로 실패)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """text에서 찾은 모든 패턴을 (시작, 끝, 패턴)으로 반환"""
+        matches = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for pattern in self._out[node]:
+                matches.append((i + 1 - len(pattern), i + 1, pattern))
+        return matches
+
+
+class SymptomMatcher:
+    """
+    증상 용어 → 증상 문서 ID 사전과 Aho-Corasick 자동자.
+
+    문서가 바뀌면 자동자는 다음 match() 호출 때 다시 만듭니다.
+    호출하는 쪽(HierarchicalRetriever)의 잠금 안에서 사용합니다.
+    """
+
+    def __init__(self):
+        self._docs: Dict[str, Tuple[Set[str], FrozenSet[str]]] = {}  # 문서 ID → (용어, 추천 진료과)
+        self._term_docs: Dict[str, Set[str]] = {}
+        self._automaton: Optional[AhoCorasick] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def upsert(self, doc_id: str, metadata: dict) -> None:
+        self.remove(doc_id)
+        terms = split_terms(metadata.get("증상", "")) | split_terms(metadata.get("추가 증상", ""))
+        departments = frozenset(
+            dept.strip() for dept in (metadata.get("추천 진료과") or "").split("/") if dept.strip()
+        )
+        if not terms or not departments:
+            return
+        self._docs[doc_id] = (terms, departments)
+        for term in terms:
+            self._term_docs.setdefault(term, set()).add(doc_id)
+        self._automaton = None
+
+    def remove(self, doc_id: str) -> None:
+        terms, _ = self._docs.pop(doc_id, (set(), None))
+        for term in terms:
+            doc_ids = self._term_docs[term]
+            doc_ids.discard(doc_id)
+            if not doc_ids:
+                del self._term_docs[term]
+        if terms:
+            self._automaton = None
+
+    def match(self, question: str) -> Optional[List[str]]:
+        """
+        질문에 나온 증상과 일치하는 증상 문서 ID를 반환합니다.
+
+        겹치는 일치는 긴 용어를 우선합니다("편두통" 안의 "두통"은 버림). 일치한 용어 중 하나라도
+        추천 진료과가 서로 다른 여러 문서에 걸쳐 있으면 모호한 것으로 보고 None을 반환합니다.
+
+        Returns:
+            List[str]: 일치한 용어 길이의 합이 큰 순서의 문서 ID.
+            None: 일치하는 증상이 없거나 모호할 때 (벡터 검색으로 대체).
+        """
+        if self._automaton is None:
+            self._automaton = AhoCorasick(self._term_docs)
+
+        text = normalize(question)
+        matches = sorted(self._automaton.find(text), key=lambda m: (-(m[1] - m[0]), m[0]))
+        used = [False] * len(text)
+        selected = []
+        for start, end, term in matches:
+            if not any(used[start:end]):
+                used[start:end] = [True] * (end - start)
+                selected.append(term)
+        if not selected:
+            return None
+
+        scores: Dict[str, int] = {}
+        for term in selected:
+            doc_ids = self._term_docs[term]
+            if len({self._docs[doc_id][1] for doc_id in doc_ids}) > 1:
+                return None
+            for doc_id in doc_ids:
+                scores[doc_id] = scores.get(doc_id, 0) + len(term)
+        return sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
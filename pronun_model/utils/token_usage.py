@@ -0,0 +1,60 @@
+# pronun_model/utils/token_usage.py
+
+from ..metrics import LLM_TOKENS
+
+from collections import defaultdict
+from typing import Dict, Optional
+import logging
+import threading
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_totals: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+
+def record_usage(model: str, usage: Optional[dict], context_tokens: int = 0) -> None:
+    """
+    LLM 호출 한 번의 토큰 사용량을 기록합니다 (요청별 로그 + 모델별 누적).
+
+    Args:
+        model (str): 모델 이름.
+        usage (dict): LangChain usage_metadata ({"input_tokens", "output_tokens", "input_token_details": {"cache_read"}}).
+        context_tokens (int): 프롬프트에 넣은 검색 문서의 (추정) 토큰 수.
+    """
+    if not usage:
+        return
+    prompt_tokens = usage.get("input_tokens", 0)
+    completion_tokens = usage.get("output_tokens", 0)
+    cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+
+    with _lock:
+        totals = _totals[model]
+        totals["requests"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+        totals["cached_tokens"] += cached_tokens
+    LLM_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+    LLM_TOKENS.inc(completion_tokens, model=model, kind="completion")
+    LLM_TOKENS.inc(cached_tokens, model=model, kind="cached")
+
+    logger.info("LLM 토큰 사용량", extra={
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cached_tokens": cached_tokens,
+        "context_tokens": context_tokens,
+    })
+
+
+def usage_stats() -> dict:
+    """모델별 누적 토큰 사용량과 프롬프트 캐시 적중 비율"""
+    with _lock:
+        return {
+            model: {
+                **totals,
+                "cached_ratio": totals["cached_tokens"] / totals["prompt_tokens"] if totals["prompt_tokens"] else 0.0,
+            }
+            for model, totals in _totals.items()
+        }
@@ -1,188 +1,228 @@
 # pronun_model/utils/tts.py
 
 from fastapi import HTTPException
-from pydub import AudioSegment
-import math
-import os
-import uuid
-from openai import OpenAI
-from openai import (
-    AuthenticationError,
-    APIError,
-    APITimeoutError,
-    APIConnectionError,
-    RateLimitError,
-    BadRequestError,
-    OpenAIError,
-    ConflictError,
-    InternalServerError,
-    NotFoundError,
-    PermissionDeniedError,
-    UnprocessableEntityError
-)
-from ..openai_config import OPENAI_API_KEY
-from ..config import CONVERT_TTS_DIR
+import asyncio
+import re
+from pathlib import Path
+from ..openai_call import call_openai
+from ..executor import run_blocking
+from ..metrics import timed
+from .mp3 import concat_mp3
+from .tts_cache import TTSCache, get_tts_cache
+from .hot_audio import get_hot_audio
+from ..config import CONVERT_TTS_DIR, TTS_MAX_CONCURRENCY
+from contextlib import nullcontext
+from typing import AsyncContextManager, AsyncIterator, Callable, List, Optional
 import logging
 
 # 모듈별 로거 생성
 logger = logging.getLogger(__name__) 
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+def _write_file(path, content: bytes) -> None:
+    with open(path, 'wb') as f:
+        f.write(content)
 
-def TTS(script, video_id: str, output_path=None, speed=1.0):
-    """
-    텍스트를 음성으로 변환(TTS)합니다. 스크립트가 4000자 이상일 경우, 분할하여 여러 개의 음성 파일을 생성한 후 결합합니다.
 
-    Args:
-        script (str): 입력 텍스트.
-        output_path (str): 생성될 음성 파일 경로.
-        video_id (str): video_id 
-        speed (float): 음성 속도 조절 (0.5 ~ 4.0).
+TTS_MODEL = "tts-1"
+TTS_VOICE = "alloy"
 
-    Returns:
-        str: 생성된 음성 파일 경로.
-        None: 변환 실패 시.
-    """
-    try:
-        if output_path is None:
-            # 고유한 파일 이름 생성
-            filename = f"{video_id}_TTS_{uuid.uuid4()}.mp3"
-            output_path = CONVERT_TTS_DIR / filename
-        else:
-            output_path = Path(output_path)
-            if not output_path.is_absolute():
-                output_path = CONVERT_TTS_DIR / output_path
-
-        num = math.ceil(len(script) / 4000)
-
-        if num == 1:
-            response = client.audio.speech.create(
-                model="tts-1",
-                voice="alloy",
-                input=script,
-                speed=speed
-            )
-            with open(output_path, 'wb') as f:
-                f.write(response.content)  # 수정된 부분
-        else:
-            tts_files = []
-            for i in range(num):
-                segment = script[4000 * i : 4000 * (i + 1)]
-                segment_filename = f"{video_id}_TTS_{i}_{uuid.uuid4()}.mp3"
-                tts_segment_path = CONVERT_TTS_DIR / segment_filename
-
-                response = client.audio.speech.create(
-                    model="tts-1",
-                    voice="alloy",
-                    input=segment,
-                    speed=speed
-                )
-                with open(tts_segment_path, 'wb') as f:
-                    f.write(response.content)  # 수정된 부분
-                logger.debug(f"TTS segment {i+1} saved at {tts_segment_path}")
-                tts_files.append(tts_segment_path)
-
-            # 여러 개의 TTS 파일을 결합
-            combined_audio = AudioSegment.empty()
-            for tts_file in tts_files:
-                audio_segment = AudioSegment.from_mp3(tts_file)
-                combined_audio += audio_segment
-                os.remove(tts_file)  # 임시 파일 삭제
-                logger.debug(f"Combined and removed segment file {tts_file}")
-
-            # 결합된 오디오 저장
-            combined_audio.export(output_path, format="mp3")
-
-        logging.info(f"TTS 생성 완료: {output_path}")
-        return str(output_path.resolve())
+# 문장 경계: 문장부호 뒤의 공백 (예: "...불편하셨겠어요. 일반적으로...")
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…。])\s+')
+TTS_MAX_INPUT_CHARS = 4000
 
-    except AuthenticationError as e:
-        logger.error(f"TTS 변환 중 인증 오류 발생: {e}", extra={
-            "errorType": "AuthenticationError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=401, detail="인증 오류: API 키를 확인해주세요.") from e
 
-    except PermissionDeniedError as e:
-        logger.error(f"TTS 변환 중 권한 오류 발생: {e}", extra={
-            "errorType": "PermissionDeniedError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=403, detail="권한 오류: API 사용 권한을 확인해주세요.") from e
+def _split_long(sentence: str, max_chars: int = TTS_MAX_INPUT_CHARS) -> List[str]:
+    """max_chars를 넘는 문장을 단어 경계에서 나눔"""
+    parts = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        parts.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        parts.append(sentence)
+    return parts
 
-    except RateLimitError as e:
-        logger.error(f"TTS 변환 중 Rate Limit 초과: {e}", extra={
-            "errorType": "RateLimitError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=429, detail="요청 제한 초과: 요청 속도를 줄여주세요.") from e
 
-    except BadRequestError as e:
-        logger.error(f"TTS 변환 중 잘못된 요청 오류 발생: {e}", extra={
-            "errorType": "BadRequestError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=400, detail="잘못된 요청: 요청 데이터를 확인해주세요.") from e
+@timed("tts_synthesis")
+async def _synthesize(text: str, speed: float) -> bytes:
+    response = await call_openai("tts", lambda client: client.audio.speech.create(
+        model=TTS_MODEL,
+        voice=TTS_VOICE,
+        input=text,
+        speed=speed
+    ))
+    return response.content
 
-    except ConflictError as e:
-        logger.error(f"TTS 변환 중 충돌 오류 발생: {e}", extra={
-            "errorType": "ConflictError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=409, detail="충돌 오류: 요청을 다시 시도해주세요.") from e
 
-    except InternalServerError as e:
-        logger.error(f"TTS 변환 중 내부 서버 오류 발생: {e}", extra={
-            "errorType": "InternalServerError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=502, detail="내부 서버 오류: 나중에 다시 시도해주세요.") from e
+class TTSPipeline:
+    """
+    문장 단위 병렬 TTS.
 
-    except NotFoundError as e:
-        logger.error(f"TTS 변환 중 자원 미존재 오류 발생: {e}", extra={
-            "errorType": "NotFoundError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=404, detail="자원이 존재하지 않습니다.") from e
+    feed()로 텍스트를 조금씩 넣으면(LLM 스트리밍 등) 문장이 완성되는 즉시 변환을 시작하고,
+    동시에 최대 TTS_MAX_CONCURRENCY개 문장을 변환합니다. 반복(async for)하면 앞 문장부터 순서대로
+    음성(bytes)을 돌려주므로, 뒤 문장이 변환되는 동안 첫 문장을 먼저 전달할 수 있습니다.
+    이미 변환한 적 있는 문장(맺음말 등)은 TTS 캐시에서 가져옵니다.
+    keys에는 세그먼트의 캐시 키가 순서대로 쌓입니다 (답변 전체 음성 기록용, TTSCache.put_joined).
 
-    except UnprocessableEntityError as e:
-        logger.error(f"TTS 변환 중 처리 불가능한 엔티티 오류 발생: {e}", extra={
-            "errorType": "UnprocessableEntityError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=422, detail="처리 불가능한 데이터입니다.") from e
+    slot: API 호출마다 잡을 자리 (예: lambda: stage("tts")). 음성을 받아가는 쪽이 느려도 자리를 붙잡지 않도록
+    TTS API를 호출하는 동안에만 잡습니다.
+    """
 
-    except APIError as e:
-        logger.error(f"TTS 변환 중 API 오류 발생: {e}", extra={
-            "errorType": "APIError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=502, detail="서버 오류: 나중에 다시 시도해주세요.") from e
+    def __init__(
+        self,
+        speed: float = 1.0,
+        max_concurrency: int = TTS_MAX_CONCURRENCY,
+        slot: Optional[Callable[[], AsyncContextManager]] = None,
+    ):
+        self.speed = speed
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._slot = slot or nullcontext
+        self._buffer = ""
+        self.keys: List[str] = []
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+        self._changed = asyncio.Event()
+
+    def _schedule(self, sentence: str) -> None:
+        for segment in _split_long(sentence.strip()):
+            key = TTSCache.key(segment, TTS_MODEL, TTS_VOICE, self.speed)
+            self.keys.append(key)
+            self._tasks.append(asyncio.create_task(self._render(segment, key)))
+        self._changed.set()
+
+    async def _render(self, segment: str, key: str) -> bytes:
+        cache = get_tts_cache()
+        audio = await run_blocking(cache.get, key)
+        if audio is not None:
+            return audio
+
+        async with self._semaphore, self._slot():
+            audio = await _synthesize(segment, self.speed)
+            logger.debug(f"TTS 세그먼트 변환 완료: {len(segment)}자")
+        await run_blocking(cache.put, key, audio)
+        return audio
+
+    def feed(self, text: str) -> None:
+        """텍스트를 추가하고, 완성된 문장은 바로 변환을 시작합니다."""
+        self._buffer += text
+        parts = SENTENCE_BOUNDARY.split(self._buffer)
+        # 마지막 조각은 아직 끝나지 않은 문장일 수 있으므로 남겨둠
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                self._schedule(sentence)
+        self._buffer = parts[-1]
+
+    def close(self) -> None:
+        """남은 텍스트를 마지막 문장으로 변환합니다. 이후 feed()는 사용할 수 없습니다."""
+        if self._buffer.strip():
+            self._schedule(self._buffer)
+        self._buffer = ""
+        self._closed = True
+        self._changed.set()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        index = 0
+        while True:
+            if index < len(self._tasks):
+                yield await self._tasks[index]
+                index += 1
+            elif self._closed:
+                return
+            else:
+                self._changed.clear()
+                await self._changed.wait()
+
+    async def aclose(self) -> None:
+        """아직 끝나지 않은 변환 작업을 취소합니다."""
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+async def TTS(script, video_id: str, output_path=None, speed=1.0):
+    """
+    텍스트를 음성으로 변환(TTS)합니다. 문장 단위로 나누어 병렬로 생성한 후 MP3 프레임 단위로 결합합니다.
+    문장별 음성은 TTS 캐시에 저장되고, 결합한 음성은 hash(모델, 목소리, 속도, 텍스트)를 키로 문장 목록만 기록한 뒤
+    메모리(hot_audio)에 올려 둡니다. 같은 텍스트는 API를 다시 호출하지 않습니다.
 
-    except APITimeoutError as e:
-        logger.error(f"TTS 변환 중 API 타임아웃 오류 발생: {e}", extra={
-            "errorType": "APITimeoutError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=504, detail="서버 응답 지연: 나중에 다시 시도해주세요.") from e
+    Args:
+        script (str): 입력 텍스트.
+        output_path (str): 생성될 음성 파일 경로 (지정하지 않으면 캐시 파일 경로를 반환).
+        video_id (str): 요청 ID. 캐시 파일을 이 요청이 사용한다고 기록합니다(요청 단위 삭제용).
+        speed (float): 음성 속도 조절 (0.5 ~ 4.0).
 
-    except APIConnectionError as e:
-        logger.error(f"TTS 변환 중 API 연결 오류 발생: {e}", extra={
-            "errorType": "APIConnectionError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=503, detail="연결 오류: 네트워크 상태를 확인해주세요.") from e
+    Returns:
+        str: 음성 경로. output_path를 지정하지 않으면 /tts/cache/{key}.mp3 로 제공되는 캐시 경로이며,
+            문장이 둘 이상이면 디스크에 파일은 없습니다 (요청 시 문장별 음성을 이어 붙여 제공).
+    """
+    try:
+        cache = get_tts_cache()
+        key = TTSCache.key(script, TTS_MODEL, TTS_VOICE, speed)
+        entry = await run_blocking(cache.load_hot, key)
+
+        if entry is None:
+            # 문장 단위로 나누어 병렬 변환 (순서 유지)
+            pipeline = TTSPipeline(speed=speed)
+            pipeline.feed(script)
+            pipeline.close()
+            try:
+                segments = [audio async for audio in pipeline]
+            finally:
+                await pipeline.aclose()
+            logger.debug(f"TTS 세그먼트 {len(segments)}개 생성")
+
+            # 세그먼트를 메모리에서 MP3 프레임 단위로 결합 (임시 파일/재인코딩 없음)
+            audio = await run_blocking(concat_mp3, segments)
+            # 세그먼트는 이미 캐시에 있으므로 결합한 음성은 디스크에 다시 쓰지 않고 세그먼트 목록만 기록
+            await run_blocking(cache.put_joined, key, pipeline.keys, video_id)
+            # 곧 이어질 /tts 다운로드(또는 multipart 응답)를 다시 결합하지 않고 처리
+            entry = get_hot_audio().put(key, audio)
+            logger.info(f"TTS 생성 완료 ({video_id}): {key}")
+        else:
+            await run_blocking(cache.claim, key, video_id)
+            logger.info(f"TTS 캐시 적중 ({video_id}): {key}")
 
-    except OpenAIError as e:
-        logger.error(f"TTS 변환 중 OpenAI 라이브러리 오류 발생: {e}", extra={
-            "errorType": "OpenAIError",
-            "error_message": str(e)
-        })
-        raise HTTPException(status_code=500, detail="OpenAI 처리 중 알 수 없는 오류가 발생했습니다.") from e
+        if output_path is None:
+            return str(cache.path(key).resolve())
+
+        # 경로를 지정한 경우 음성을 파일로 저장
+        output_path = Path(output_path)
+        if not output_path.is_absolute():
+            output_path = CONVERT_TTS_DIR / output_path
+        await run_blocking(_write_file, output_path, entry.data)
+        return str(output_path.resolve())
+
+    except HTTPException:
+        # OpenAI 호출 오류는 call_openai()에서 로그를 남기고 변환함
+        raise
 
     except Exception as e:
         logger.error(f"TTS 변환 오류: {e}", extra={
             "errorType": type(e).__name__,
             "error_message": str(e)
         })
-        raise HTTPException(status_code=500, detail="TTS 변환 중 오류 발생.") from e
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="TTS 변환 중 오류 발생.") from e
+
+
+async def TTS_stream(script, speed=1.0) -> AsyncIterator[bytes]:
+    """
+    텍스트를 문장 단위로 나누어 병렬로 음성 변환하고, 앞 문장부터 순서대로 MP3 바이트를 전달합니다.
+
+    Args:
+        script (str): 입력 텍스트.
+        speed (float): 음성 속도 조절 (0.5 ~ 4.0).
+
+    Yields:
+        bytes: 문장(세그먼트) 하나의 MP3 데이터.
+    """
+    pipeline = TTSPipeline(speed=speed)
+    pipeline.feed(script)
+    pipeline.close()
+    try:
+        async for audio in pipeline:
+            yield audio
+    finally:
+        await pipeline.aclose()
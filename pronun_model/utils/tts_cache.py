@@ -0,0 +1,550 @@
+# pronun_model/utils/tts_cache.py
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+from ..config import (
+    CONVERT_TTS_DIR,
+    TTS_CACHE_DIR,
+    TTS_META_DIR,
+    TTS_CACHE_MAX_MB,
+    TTS_CACHE_TTL_HOURS,
+    TTS_JANITOR_INTERVAL,
+    TTS_EVICT_GRACE,
+)
+from ..executor import run_blocking
+from .hot_audio import HOT_MAX_OBJECT_BYTES, HotAudio, audio_response, get_hot_audio
+from .mp3 import concat_mp3
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# 모듈별 로거 생성
+logger = logging.getLogger(__name__)
+
+RECLAIM_REASONS = ("ttl", "quota", "orphan", "deleted")
+
+
+class TTSCache:
+    """
+    hash(모델, 목소리, 속도, 텍스트)를 키로 음성 파일을 한 번만 저장하는 디스크 캐시.
+
+    - 파일은 TTS_CACHE_DIR/{key}.mp3 에 저장되며 /tts/cache/{key}.mp3 로 그대로 제공됩니다.
+    - 전체 크기가 TTS_CACHE_MAX_MB를 넘으면 가장 오래 사용되지 않은 파일부터 삭제합니다.
+    - TTS_CACHE_TTL_HOURS 동안 사용되지 않은 파일은 주기적인 정리(sweep)에서 삭제합니다.
+    - 다운로드 중(lease)이거나 최근 TTS_EVICT_GRACE초 안에 사용된 파일은 삭제하지 않습니다.
+    - 사용 순서는 파일 mtime에도 기록되어 재시작 후에도 유지됩니다.
+    - 같은 답변은 여러 요청이 같은 파일을 공유하므로, 어떤 요청(video_id)이 어떤 파일을 받았는지
+      TTS_META_DIR의 SQLite에 기록해 두고 요청 단위 삭제(delete_owner)에 사용합니다.
+    - 문장(세그먼트)을 이어 붙인 답변 전체 음성은 파일로 다시 저장하지 않고 세그먼트 키 목록(joined)만
+      기록해 두었다가, 요청이 오면 세그먼트를 이어 붙여 메모리(hot_audio)에서 제공합니다(put_joined).
+
+    파일 I/O를 하므로 이벤트 루프에서는 run_blocking으로 호출합니다.
+    """
+
+    def __init__(
+        self,
+        directory: Path = TTS_CACHE_DIR,
+        max_bytes: int = TTS_CACHE_MAX_MB * 1024 * 1024,
+        ttl: float = TTS_CACHE_TTL_HOURS * 3600,
+        grace: float = TTS_EVICT_GRACE,
+        refs_path: Optional[Path] = None,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.grace = grace
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.sweeps = 0
+        self.last_sweep: Optional[float] = None
+        self.reclaimed = {reason: {"files": 0, "bytes": 0} for reason in RECLAIM_REASONS}
+
+        self._lock = threading.Lock()
+        # 키 → (크기, 마지막 사용 시각). 오래 사용되지 않은 순서
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._total_bytes = 0
+        self._leases: Dict[str, int] = {}
+
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(str(refs_path or TTS_META_DIR / "refs.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS refs ("
+            " video_id TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " PRIMARY KEY (video_id, key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_refs_key ON refs(key)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS joined ("
+            " key TEXT NOT NULL,"
+            " idx INTEGER NOT NULL,"
+            " part TEXT NOT NULL,"
+            " PRIMARY KEY (key, idx))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_joined_part ON joined(part)")
+        self._db.commit()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for key, size, mtime in sorted(self._scan(), key=lambda item: item[2]):
+            self._entries[key] = (size, mtime)
+            self._total_bytes += size
+        logger.info(f"TTS 캐시 로드: {len(self._entries)}개, {self._total_bytes} bytes")
+
+    @staticmethod
+    def key(text: str, model: str, voice: str, speed: float) -> str:
+        payload = f"{model}\0{voice}\0{speed:g}\0{text}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.mp3"
+
+    def _scan(self) -> List[Tuple[str, int, float]]:
+        """디스크의 캐시 파일 목록 (키, 크기, mtime)"""
+        files = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".mp3") and not entry.name.startswith("."):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((entry.name[:-4], stat.st_size, stat.st_mtime))
+        return files
+
+    def _add_ref(self, key: str, owner: str) -> None:
+        with self._db_lock:
+            self._db.execute("INSERT OR IGNORE INTO refs (video_id, key, created) VALUES (?, ?, ?)",
+                             (owner, key, time.time()))
+            self._db.commit()
+
+    def _parts(self, key: str) -> Optional[List[str]]:
+        """이어 붙인 음성의 세그먼트 키 목록 (순서대로). 이어 붙인 음성이 아니면 None"""
+        with self._db_lock:
+            rows = self._db.execute("SELECT part FROM joined WHERE key = ? ORDER BY idx", (key,)).fetchall()
+        return [part for (part,) in rows] or None
+
+    def _touch(self, key: str) -> bool:
+        """캐시 적중 처리. 파일이 외부에서 삭제되었으면 항목을 정리하고 False 반환"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False
+            try:
+                os.utime(self.path(key))
+            except FileNotFoundError:
+                self._total_bytes -= self._entries.pop(key)[0]
+                self.misses += 1
+                return False
+            self._entries[key] = (self._entries[key][0], time.time())
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True
+
+    def lookup(self, key: str, owner: Optional[str] = None) -> Optional[Path]:
+        """캐시된 파일 경로 (없으면 None). owner를 주면 그 요청이 이 파일을 사용한다고 기록"""
+        if not self._touch(key):
+            return None
+        if owner:
+            self._add_ref(key, owner)
+        return self.path(key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """캐시된 음성 데이터 (없으면 None)"""
+        if not self._touch(key):
+            return None
+        try:
+            return self.path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes, owner: Optional[str] = None) -> Path:
+        """음성 데이터를 저장하고 경로를 반환합니다. 같은 키가 있으면 덮어씁니다."""
+        path = self.path(key)
+        # 다운로드 중인 클라이언트가 잘린 파일을 받지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = self.directory / f".{key}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes += len(data) - self._entries.pop(key, (0, 0.0))[0]
+            self._entries[key] = (len(data), time.time())
+            victims = self._evict(keep=key)
+        self._unlink(victims, "quota")
+        if owner:
+            self._add_ref(key, owner)
+        return path
+
+    def put_joined(self, key: str, parts: List[str], owner: Optional[str] = None) -> Path:
+        """
+        세그먼트(parts, 이미 캐시에 저장됨)를 순서대로 이어 붙인 음성을 key로 기록합니다.
+        같은 음성을 디스크에 두 번 저장하지 않도록 파일 대신 세그먼트 키 목록만 남기며,
+        /tts/cache/{key}.mp3 요청이 오면 load_hot()이 세그먼트를 이어 붙여 제공합니다.
+
+        Returns:
+            Path: 음성 URL에 사용할 캐시 경로 (세그먼트가 둘 이상이면 디스크에 파일은 없음).
+        """
+        with self._db_lock:
+            if parts != [key]:
+                self._db.execute("DELETE FROM joined WHERE key = ?", (key,))
+                self._db.executemany("INSERT INTO joined (key, idx, part) VALUES (?, ?, ?)",
+                                     [(key, idx, part) for idx, part in enumerate(parts)])
+                self._db.commit()
+        if owner:
+            self.claim(key, owner)
+        return self.path(key)
+
+    def claim(self, key: str, owner: str) -> None:
+        """owner 요청이 이 음성(이어 붙인 음성이면 그 세그먼트들도)을 사용한다고 기록"""
+        keys = {key, *(self._parts(key) or [])}
+        now = time.time()
+        with self._db_lock:
+            self._db.executemany("INSERT OR IGNORE INTO refs (video_id, key, created) VALUES (?, ?, ?)",
+                                 [(owner, ref, now) for ref in keys])
+            self._db.commit()
+
+    def _join(self, key: str) -> Optional[bytes]:
+        """기록된 세그먼트를 이어 붙임. 이어 붙인 음성이 아니거나 세그먼트가 하나라도 없으면 None"""
+        parts = self._parts(key)
+        if parts is None:
+            return None
+        segments = []
+        for part in parts:
+            data = self.get(part)
+            if data is None:
+                return None
+            segments.append(data)
+        return concat_mp3(segments)
+
+    def hot(self, key: str) -> Optional[HotAudio]:
+        """메모리에 올라와 있는 음성. 디스크에서 삭제되었으면(다른 워커의 정리/삭제 포함) 내리고 None"""
+        entry = get_hot_audio().get(key)
+        if entry is None:
+            return None
+        if self.path(key).exists():
+            self._mark_used(key)
+            return entry
+        # 이어 붙인 음성은 세그먼트가 삭제되면 기록(joined)도 함께 지워짐 (_drop_joined)
+        parts = self._parts(key)
+        if parts is None:
+            get_hot_audio().discard(key)
+            return None
+        for part in parts:
+            self._mark_used(part)
+        return entry
+
+    def load_hot(self, key: str, max_bytes: Optional[int] = None) -> Optional[HotAudio]:
+        """
+        메모리에 없으면 디스크에서 읽어 올립니다. 파일이 없거나 max_bytes보다 크면 None.
+        이어 붙인 음성은 세그먼트를 이어 붙여 올립니다 (디스크에서 보낼 파일이 없으므로 max_bytes와 상관없음).
+        """
+        entry = self.hot(key)
+        if entry is not None:
+            return entry
+        path = self.path(key)
+        try:
+            if max_bytes is not None and path.stat().st_size > max_bytes:
+                return None
+            data = path.read_bytes()
+        except FileNotFoundError:
+            data = self._join(key)
+            if data is None:
+                return None
+        else:
+            self._mark_used(key)
+        return get_hot_audio().put(key, data)
+
+    def _mark_used(self, key: str) -> None:
+        """다운로드도 사용으로 기록 (메모리에서만 갱신, 정리 시 mtime과 함께 반영)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = (self._entries[key][0], time.time())
+                self._entries.move_to_end(key)
+
+    @contextmanager
+    def lease(self, key: str) -> Iterator[None]:
+        """파일을 보내는 동안 정리 작업이 삭제하지 않도록 표시 (다운로드도 사용으로 기록)"""
+        self._mark_used(key)
+        with self._lock:
+            self._leases[key] = self._leases.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                if self._leases[key] <= 1:
+                    del self._leases[key]
+                else:
+                    self._leases[key] -= 1
+
+    def _protected(self, key: str, last_used: float, now: float) -> bool:
+        return key in self._leases or now - last_used < self.grace
+
+    def _detach(self, key: str) -> Tuple[str, Optional[int]]:
+        """목록에서 제외 (잠금 보유 상태에서 호출). 파일 삭제는 잠금 밖에서 _unlink로 합니다."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return key, None
+        self._total_bytes -= entry[0]
+        return key, entry[0]
+
+    def _unlink(self, victims: List[Tuple[str, Optional[int]]], reason: str) -> List[Tuple[str, int]]:
+        """
+        _detach한 파일을 삭제합니다. 디스크 작업 동안 다른 요청(조회, 다운로드)이 잠금을 기다리지 않도록 잠금 밖에서 호출합니다.
+
+        Returns:
+            List[Tuple[str, int]]: 실제로 삭제한 (키, 크기). 이미 없거나 그 사이 다시 사용된 파일은 제외.
+        """
+        removed = []
+        for key, size in victims:
+            get_hot_audio().discard(key)
+            with self._lock:
+                # 목록에서 뺀 뒤 다시 저장되었거나, TTL/상한 정리 대상이 그 사이 다운로드되기 시작한 경우
+                if key in self._entries or (reason != "deleted" and key in self._leases):
+                    continue
+            path = self.path(key)
+            try:
+                if size is None:
+                    size = path.stat().st_size
+                # 이미 열려 있는 파일(다운로드 중)은 닫힐 때까지 읽을 수 있음
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed.append((key, size))
+            logger.debug(f"TTS 캐시 삭제 ({reason}): {key}")
+        if removed:
+            self._drop_joined([key for key, _ in removed])
+            with self._lock:
+                self.reclaimed[reason]["files"] += len(removed)
+                self.reclaimed[reason]["bytes"] += sum(size for _, size in removed)
+                if reason in ("ttl", "quota"):
+                    self.evictions += len(removed)
+        return removed
+
+    def _evict(self, keep: Optional[str] = None) -> List[Tuple[str, Optional[int]]]:
+        """LRU 순서로 상한 이하가 될 때까지 목록에서 제외 (잠금 보유 상태에서 호출). 보호 중인 파일은 건너뜀"""
+        victims = []
+        now = time.time()
+        for key, (_, last_used) in list(self._entries.items()):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if key == keep or self._protected(key, last_used, now):
+                continue
+            victims.append(self._detach(key))
+        return victims
+
+    def _drop_refs(self, keys: List[str]) -> None:
+        if not keys:
+            return
+        with self._db_lock:
+            self._db.executemany("DELETE FROM refs WHERE key = ?", [(key,) for key in keys])
+            self._db.commit()
+
+    def _drop_joined(self, keys: List[str]) -> None:
+        """삭제된 세그먼트를 포함하거나 삭제된 음성 자체인 이어 붙인 음성 기록을 지우고 메모리에서도 내림"""
+        with self._db_lock:
+            joined = set()
+            for key in keys:
+                joined.update(row[0] for row in self._db.execute(
+                    "SELECT DISTINCT key FROM joined WHERE part = ? OR key = ?", (key, key)))
+            if joined:
+                self._db.executemany("DELETE FROM joined WHERE key = ?", [(key,) for key in joined])
+                self._db.executemany("DELETE FROM refs WHERE key = ?", [(key,) for key in joined])
+                self._db.commit()
+        for key in joined:
+            get_hot_audio().discard(key)
+
+    def _reclaim_file(self, path: Path, older_than: float) -> None:
+        """캐시 밖의 파일(임시 파일, 요청별 사본)을 mtime 기준으로 삭제"""
+        try:
+            stat = path.stat()
+            if stat.st_mtime >= older_than:
+                return
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self.reclaimed["orphan"]["files"] += 1
+            self.reclaimed["orphan"]["bytes"] += stat.st_size
+
+    def sweep(self) -> dict:
+        """
+        주기적 정리. 디스크를 다시 읽어 사용량을 맞춘 뒤(같은 디렉토리를 쓰는 다른 워커의 파일 포함)
+        TTL이 지난 파일과 상한을 넘는 파일을 오래된 순서로 삭제하고, 남은 임시 파일과 요청별 사본도 정리합니다.
+
+        Returns:
+            dict: 이번 정리에서 삭제한 파일 수와 크기.
+        """
+        started = time.time()
+        files = self._scan()
+        before = {reason: dict(counts) for reason, counts in self.reclaimed.items()}
+
+        with self._lock:
+            # 디스크 기준으로 목록을 다시 만들고, 다른 워커가 갱신한 mtime도 반영
+            merged = {}
+            for key, size, mtime in files:
+                known = self._entries.get(key)
+                merged[key] = (size, max(mtime, known[1]) if known else mtime)
+            for key, entry in self._entries.items():
+                # 디스크를 읽는 동안 새로 저장된 파일
+                if key not in merged and entry[1] >= started:
+                    merged[key] = entry
+            self._entries = OrderedDict(sorted(merged.items(), key=lambda item: item[1][1]))
+            self._total_bytes = sum(size for size, _ in self._entries.values())
+
+            expired = []
+            if self.ttl:
+                expire_before = time.time() - self.ttl
+                for key, (_, last_used) in list(self._entries.items()):
+                    if last_used >= expire_before:
+                        break
+                    if key in self._leases:
+                        continue
+                    expired.append(self._detach(key))
+            over_quota = self._evict()
+            self.sweeps += 1
+            self.last_sweep = started
+
+        # 파일 삭제는 잠금 밖에서 (정리 중에도 조회와 다운로드가 기다리지 않도록)
+        removed = self._unlink(expired, "ttl") + self._unlink(over_quota, "quota")
+        self._drop_refs([key for key, _ in removed])
+
+        # 저장 도중 중단되어 남은 임시 파일
+        for tmp_path in self.directory.glob(".*.tmp"):
+            self._reclaim_file(tmp_path, started - max(self.grace, 60))
+        # TTS(output_path=...)로 만든 요청별 사본 (캐시 상한에 포함되지 않으므로 TTL로만 정리)
+        if self.ttl:
+            for copy_path in CONVERT_TTS_DIR.glob("*.mp3"):
+                self._reclaim_file(copy_path, started - self.ttl)
+
+        result = {
+            reason: {
+                "files": self.reclaimed[reason]["files"] - before[reason]["files"],
+                "bytes": self.reclaimed[reason]["bytes"] - before[reason]["bytes"],
+            }
+            for reason in RECLAIM_REASONS
+        }
+        files_removed = sum(counts["files"] for counts in result.values())
+        if files_removed:
+            logger.info(f"TTS 캐시 정리: {files_removed}개, "
+                        f"{sum(counts['bytes'] for counts in result.values())} bytes 삭제, "
+                        f"남은 파일 {len(self._entries)}개 ({self._total_bytes} bytes), "
+                        f"{time.time() - started:.2f}초", extra={"reclaimed": result})
+        return result
+
+    def delete_owner(self, video_id: str) -> Optional[dict]:
+        """
+        요청(video_id)이 받은 음성 파일을 삭제합니다.
+        다른 요청도 같은 파일(같은 답변)을 받았다면 참조만 지우고 파일은 남깁니다.
+
+        Returns:
+            Optional[dict]: {"deleted_files", "freed_bytes", "shared_files"}. 기록이 없으면 None.
+        """
+        with self._db_lock:
+            keys = [key for (key,) in self._db.execute("SELECT key FROM refs WHERE video_id = ?", (video_id,))]
+            if not keys:
+                return None
+            self._db.execute("DELETE FROM refs WHERE video_id = ?", (video_id,))
+            shared = {
+                key for key in keys
+                if self._db.execute("SELECT 1 FROM refs WHERE key = ? LIMIT 1", (key,)).fetchone()
+            }
+            self._db.commit()
+
+        with self._lock:
+            victims = [self._detach(key) for key in keys if key not in shared]
+        removed = self._unlink(victims, "deleted")
+        # 파일이 없는 음성(이어 붙인 음성)은 기록만 지움
+        self._drop_joined([key for key, size in victims if size is None])
+        return {"deleted_files": len(removed), "freed_bytes": sum(size for _, size in removed), "shared_files": len(shared)}
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "downloading": len(self._leases),
+            "sweeps": self.sweeps,
+            "last_sweep": self.last_sweep,
+            "reclaimed": {reason: dict(counts) for reason, counts in self.reclaimed.items()},
+        }
+
+
+_cache: Optional[TTSCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    """
+    공유 TTS 캐시. 처음 호출할 때 캐시 디렉토리 전체를 읽으므로 서비스 시작 시 run_blocking으로 미리 생성합니다.
+    (이후 호출은 이벤트 루프에서 바로 해도 됩니다.)
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTSCache()
+    return _cache
+
+
+async def run_tts_janitor(interval: float = TTS_JANITOR_INTERVAL) -> None:
+    """TTS 음성 파일을 주기적으로 정리하는 백그라운드 작업"""
+    while True:
+        try:
+            # 첫 정리에서 캐시가 생성될 수 있으므로(디렉토리 스캔) get_tts_cache()도 스레드에서 호출
+            await run_blocking(lambda: get_tts_cache().sweep())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"TTS 캐시 정리 중 오류 발생: {e}", extra={
+                "errorType": type(e).__name__,
+                "error_message": str(e)
+            })
+        await asyncio.sleep(interval)
+
+
+class TTSStaticFiles(StaticFiles):
+    """
+    /tts 정적 파일 제공.
+
+    캐시 음성(/tts/cache/{key}.mp3)은 메모리 저장소(hot_audio)에서 ETag/Range/Cache-Control과 함께 보내고,
+    메모리에 두지 않는 큰 파일만 디스크에서 보냅니다. 디스크에서 보내는 동안에는 정리 작업이 삭제하지 않도록 lease를 잡습니다.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await super().__call__(scope, receive, send)
+            return
+        path = Path(self.get_path(scope))
+        if path.parent.name != TTS_CACHE_DIR.name or path.suffix != ".mp3":
+            await super().__call__(scope, receive, send)
+            return
+
+        cache = get_tts_cache()
+        # 메모리 적중도 파일 존재 확인(디스크)을 거치므로 스레드에서 처리
+        entry = await run_blocking(cache.load_hot, path.stem, HOT_MAX_OBJECT_BYTES)
+        if entry is not None:
+            response = audio_response(entry, Headers(scope=scope), scope["method"])
+            await response(scope, receive, send)
+            return
+        with cache.lease(path.stem):
+            await super().__call__(scope, receive, send)
@@ -0,0 +1,130 @@
+# pronun_model/utils/upload.py
+
+"""
+업로드 음성 수신.
+
+UPLOAD_SPOOL_MB 이하의 업로드 파일은 디스크에 복사하지 않고 메모리로 읽어 (파일 이름, 데이터) 형태로 넘기고,
+그보다 커서 multipart 파싱 단계에서 이미 디스크로 넘어간 파일은 임시 파일 경로로 넘깁니다(메모리에 다시 올리지 않음).
+두 형태 모두 audio_preprocess.normalize_audio와 STT(OpenAI 파일 인자)가 그대로 받을 수 있습니다.
+업로드를 받는 라우터는 UploadRoute를 사용해야 multipart 파싱이 UPLOAD_SPOOL_MB까지 메모리를 사용합니다.
+"""
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.routing import APIRoute
+from python_multipart.multipart import parse_options_header
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartException, MultiPartParser
+from ..config import UPLOAD_MAX_MB, UPLOAD_SPOOL_MB
+from ..executor import run_blocking
+from ..metrics import observe_stage
+
+from contextlib import aclosing
+from pathlib import Path
+from typing import BinaryIO, Tuple, Union
+import os
+import tempfile
+
+UPLOAD_MAX_BYTES = UPLOAD_MAX_MB * 1024 * 1024
+UPLOAD_SPOOL_BYTES = UPLOAD_SPOOL_MB * 1024 * 1024
+READ_CHUNK_BYTES = 256 * 1024
+
+# 디스크 경로 또는 (파일 이름, 데이터)
+AudioSource = Union[str, Tuple[str, bytes]]
+
+
+class _SpoolingMultiPartParser(MultiPartParser):
+    # 업로드 파일을 이 크기까지는 메모리에 두고, 넘으면 임시 파일로 넘김 (Starlette 기본값 1MB)
+    spool_max_size = UPLOAD_SPOOL_BYTES
+
+
+class UploadRequest(Request):
+    """multipart 업로드를 _SpoolingMultiPartParser로 파싱하는 Request (프로세스 전역 MultiPartParser 설정은 그대로 둠)"""
+
+    async def _get_form(
+        self,
+        *,
+        max_files: Union[int, float] = 1000,
+        max_fields: Union[int, float] = 1000,
+        max_part_size: int = 1024 * 1024,
+    ) -> FormData:
+        content_type, _ = parse_options_header(self.headers.get("Content-Type"))
+        if self._form is not None or content_type != b"multipart/form-data":
+            return await super()._get_form(max_files=max_files, max_fields=max_fields, max_part_size=max_part_size)
+        try:
+            async with aclosing(self.stream()) as stream:
+                parser = _SpoolingMultiPartParser(
+                    self.headers,
+                    stream,
+                    max_files=max_files,
+                    max_fields=max_fields,
+                    max_part_size=max_part_size,
+                )
+                self._form = await parser.parse()
+        except MultiPartException as exc:
+            raise HTTPException(400, detail=exc.message)
+        return self._form
+
+
+class UploadRoute(APIRoute):
+    """업로드를 받는 라우터의 route_class. 핸들러에 UploadRequest를 넘깁니다."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def upload_handler(request: Request):
+            return await handler(UploadRequest(request.scope, request.receive))
+
+        return upload_handler
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(413, detail=f"음성 파일은 최대 {UPLOAD_MAX_MB}MB까지 업로드할 수 있습니다.")
+
+
+def _copy_to_disk(fileobj: BinaryIO, suffix: str) -> str:
+    """디스크로 넘어간 업로드 파일을 READ_CHUNK_BYTES씩 임시 파일로 복사 (메모리에 전체를 올리지 않음)"""
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        while chunk := fileobj.read(READ_CHUNK_BYTES):
+            tmp.write(chunk)
+        return tmp.name
+
+
+async def read_upload(upload: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> AudioSource:
+    """
+    업로드 파일을 넘겨받습니다.
+
+    UPLOAD_SPOOL_BYTES 이하면 READ_CHUNK_BYTES씩 비동기로 읽어 메모리에 담고, 그보다 커서 파싱 단계에서
+    디스크로 넘어간 파일은 메모리에 올리지 않고 임시 파일 경로로 넘깁니다(디스크에서 디코딩).
+    경로를 받은 쪽은 다 쓴 뒤 release()로 삭제합니다.
+
+    Args:
+        upload (UploadFile): 업로드된 음성 파일.
+        max_bytes (int): 최대 크기. 넘으면 읽기를 멈추고 413을 반환합니다.
+
+    Returns:
+        AudioSource: (파일 이름, 데이터) 또는 임시 파일 경로. 파일 이름의 확장자로 형식을 판단하므로 그대로 유지합니다.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large()
+
+    name = Path(upload.filename or "audio").name
+    if upload.size is not None and upload.size > UPLOAD_SPOOL_BYTES:
+        with observe_stage("upload_read"):
+            return await run_blocking(_copy_to_disk, upload.file, Path(name).suffix)
+
+    buffer = bytearray()
+    with observe_stage("upload_read"):
+        while chunk := await upload.read(READ_CHUNK_BYTES):
+            buffer += chunk
+            if len(buffer) > max_bytes:
+                raise _too_large()
+    if not buffer:
+        raise HTTPException(400, detail="빈 음성 파일입니다.")
+    return name, bytes(buffer)
+
+
+def release(source: AudioSource) -> None:
+    """디스크에 임시 저장한 음성이면 삭제 (메모리 음성은 그대로 둠)"""
+    if isinstance(source, str) and os.path.exists(source):
+        os.remove(source)
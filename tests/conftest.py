@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import os
+
+# pronun_model 설정은 import 시점에 읽으므로 테스트용 값을 먼저 지정
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017/?serverSelectionTimeoutMS=500")
@@ -0,0 +1,105 @@
+# tests/test_admission.py
+
+"""
+단계별 입장 제어(Limiter): 사용자 요청만 대기열 초과/대기 시간 초과로 거절하고,
+일괄 처리(BULK) 항목은 사용자 요청 뒤에서 거절 없이 기다리는지 확인합니다.
+"""
+
+from fastapi import HTTPException
+
+from pronun_model.admission import Limiter
+from pronun_model.rate_limit import Priority, request_priority
+from pronun_model import admission
+
+import asyncio
+
+import pytest
+
+
+def test_interactive_wait_is_shed_but_bulk_keeps_waiting():
+    async def scenario():
+        limiter = Limiter("테스트", limit=1, max_queue=4, max_wait=0.05)
+        held = await limiter.acquire()
+        bulk = asyncio.create_task(limiter.acquire(bulk=True))
+
+        with pytest.raises(HTTPException) as exc:
+            await limiter.acquire()
+        assert exc.value.status_code == 503
+
+        # 사용자 요청의 최대 대기 시간이 지나도 일괄 처리 항목은 계속 기다림
+        await asyncio.sleep(0.1)
+        assert not bulk.done()
+        held.release()
+        (await bulk).release()
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["timed_out"], stats["active"], stats["bulk_queued"]) == (1, 0, 0)
+
+
+def test_bulk_waiters_do_not_fill_the_interactive_queue():
+    async def scenario():
+        limiter = Limiter("테스트", limit=1, max_queue=1, max_wait=1)
+        held = await limiter.acquire()
+        bulk = [asyncio.create_task(limiter.acquire(bulk=True)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc:
+            await limiter.acquire()
+        assert exc.value.status_code == 429
+
+        held.release()
+        (await waiting).release()
+        for task in bulk:
+            (await task).release()
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["rejected"], stats["admitted"]) == (1, 5)
+
+
+def test_released_slot_goes_to_interactive_requests_first():
+    async def scenario():
+        limiter = Limiter("테스트", limit=1, max_queue=4, max_wait=1)
+        order = []
+
+        async def run(name: str, bulk: bool):
+            ticket = await limiter.acquire(bulk=bulk)
+            order.append(name)
+            ticket.release()
+
+        held = await limiter.acquire()
+        # 일괄 처리 항목이 먼저 기다리기 시작해도 사용자 요청이 먼저 자리를 받음
+        tasks = [asyncio.create_task(run("bulk", True))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(run("interactive", False)))
+        await asyncio.sleep(0)
+        held.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "bulk"]
+
+
+def test_stage_uses_the_bulk_queue_inside_batch_processing(monkeypatch):
+    limiter = Limiter("테스트", limit=1, max_queue=4, max_wait=0.05)
+    monkeypatch.setitem(admission._stages, "stt", limiter)
+
+    async def scenario():
+        held = await limiter.acquire()
+
+        async def batch_item():
+            async with admission.stage("stt"):
+                return "done"
+
+        with request_priority(Priority.BULK):
+            item = asyncio.create_task(batch_item())
+        await asyncio.sleep(0.1)
+        assert limiter.bulk_queued == 1
+        held.release()
+        return await item
+
+    assert asyncio.run(scenario()) == "done"
+    assert limiter.stats()["timed_out"] == 0
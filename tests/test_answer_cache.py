@@ -0,0 +1,56 @@
+# tests/test_answer_cache.py
+
+"""
+답변 캐시가 같은 질문에만 이전 답을 돌려주는지 확인합니다.
+(증상 사전 매칭 키는 질문까지 정확히 일치, 임베딩 키는 유사도 임계값 이상)
+"""
+
+from pronun_model.utils.answer_cache import AnswerCache, AnswerKey, normalize_question
+
+from datetime import datetime
+
+BUCKET = AnswerCache(slot_minutes=30).bucket(datetime(2026, 10, 19, 9, 15), "v1")
+HEADACHE = (("symptom-1",), ())
+
+
+def signature(question: str) -> tuple:
+    return HEADACHE + (normalize_question(question),)
+
+
+def test_normalize_question_ignores_spacing_punctuation_and_case():
+    assert normalize_question(" 두통이  뭐예요? ") == normalize_question("두통이 뭐예요")
+    assert normalize_question("ＡＢＣ 병원!") == normalize_question("abc병원")
+    assert normalize_question("두통이 뭐예요?") != normalize_question("두통에 좋은 병원 알려줘")
+
+
+def test_signature_hit_requires_the_same_question():
+    cache = AnswerCache(threshold=0.96)
+    result = {"answer": "두통은 ...", "hospitals": []}
+    cache.put(AnswerKey(BUCKET, signature=signature("두통이 뭐예요?")), result)
+
+    assert cache.get(AnswerKey(BUCKET, signature=signature("두통이 뭐 예요"))) == result
+    # 같은 증상으로 매칭되어도 묻는 내용이 다르면 이전 답을 쓰지 않음
+    assert cache.get(AnswerKey(BUCKET, signature=signature("두통에 좋은 병원 알려줘"))) is None
+    # 시간 슬롯이 다르면(영업 여부가 달라질 수 있음) 다른 항목
+    other_slot = cache.bucket(datetime(2026, 10, 19, 10, 15), "v1")
+    assert cache.get(AnswerKey(other_slot, signature=signature("두통이 뭐예요?"))) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_vector_hit_uses_the_similarity_threshold():
+    cache = AnswerCache(threshold=0.96)
+    result = {"answer": "답변", "hospitals": ["A 병원"]}
+    cache.put(AnswerKey(BUCKET, vector=[1.0, 0.0]), result)
+
+    assert cache.get(AnswerKey(BUCKET, vector=[0.99, 0.05])) == result
+    assert cache.get(AnswerKey(BUCKET, vector=[0.8, 0.6])) is None
+
+
+def test_cached_result_is_a_copy():
+    cache = AnswerCache()
+    key = AnswerKey(BUCKET, signature=signature("두통"))
+    cache.put(key, {"answer": "답변", "hospitals": ["A 병원"]})
+
+    cache.get(key)["hospitals"].append("B 병원")
+
+    assert cache.get(key)["hospitals"] == ["A 병원"]
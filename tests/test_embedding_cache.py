@@ -0,0 +1,55 @@
+# tests/test_embedding_cache.py
+
+"""
+임베딩 캐시(CachedEmbeddings): 캐시에 없는 텍스트만 요청하고, 여러 스레드에서 호출해도 적중/미스 수가 정확한지 확인합니다.
+"""
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from pronun_model.utils.embedding_cache import CachedEmbeddings
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """embed_documents로 요청된 텍스트 수를 기록하는 가짜 임베딩"""
+
+    requested: int = 0
+
+    def embed_documents(self, texts):
+        self.requested += len(texts)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    def make(**kwargs) -> CachedEmbeddings:
+        return CachedEmbeddings(CountingEmbeddings(size=4), "fake", path=tmp_path / "embeddings.sqlite3", **kwargs)
+
+    return make
+
+
+def test_only_missing_texts_are_requested(make_cache):
+    cache = make_cache(batch_size=2)
+
+    first = cache.embed_documents(["두통", "요통", "두통"])
+    second = cache.embed_documents(["두통", "복통", "치통"])
+
+    # 캐시는 float32로 저장
+    assert second[0] == pytest.approx(first[0], rel=1e-6)
+    assert cache.embeddings.requested == 4
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_counters_are_exact_under_concurrent_calls(make_cache):
+    cache = make_cache()
+    texts = [f"증상 {i % 10}" for i in range(400)]
+    cache.embed_documents(texts[:10])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(cache.embed_query, texts))
+
+    assert (cache.hits, cache.misses) == (400, 10)
+    assert cache.stats()["hit_rate"] == pytest.approx(400 / 410)
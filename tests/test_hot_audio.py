@@ -0,0 +1,77 @@
+# tests/test_hot_audio.py
+
+"""
+메모리 음성 저장소(hot_audio): Range 헤더 해석, 조건부/부분 응답, 용량 상한에 따른 제거를 확인합니다.
+"""
+
+from starlette.datastructures import Headers
+
+from pronun_model.utils.hot_audio import HotAudioStore, _parse_range, audio_response
+
+import pytest
+
+SIZE = 1000
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=900-", (900, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=500-5000", (500, 999)),
+    (" bytes=1-1 ", (1, 1)),
+])
+def test_parse_single_range(value, expected):
+    assert _parse_range(value, SIZE) == expected
+
+
+@pytest.mark.parametrize("value", ["bytes=-", "items=0-10", "bytes=0-1,5-9", "0-99"])
+def test_unsupported_range_sends_the_whole_file(value):
+    assert _parse_range(value, SIZE) is None
+
+
+@pytest.mark.parametrize("value", ["bytes=1000-", "bytes=-0", "bytes=50-10"])
+def test_unsatisfiable_range(value):
+    with pytest.raises(ValueError):
+        _parse_range(value, SIZE)
+
+
+@pytest.fixture
+def entry():
+    return HotAudioStore(max_bytes=10 * SIZE).put("key", bytes(range(250)) * 4)
+
+
+def test_range_request_gets_partial_content(entry):
+    response = audio_response(entry, Headers({"range": "bytes=10-19"}))
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 10-19/{SIZE}"
+    assert response.body == entry.data[10:20]
+
+
+def test_if_none_match_gets_not_modified(entry):
+    assert audio_response(entry, Headers({"if-none-match": f"W/{entry.etag}"})).status_code == 304
+
+
+def test_if_range_with_another_etag_gets_the_whole_file(entry):
+    response = audio_response(entry, Headers({"range": "bytes=0-9", "if-range": '"old"'}))
+
+    assert (response.status_code, len(response.body)) == (200, SIZE)
+
+
+def test_unsatisfiable_range_gets_416(entry):
+    response = audio_response(entry, Headers({"range": f"bytes={SIZE}-"}))
+
+    assert (response.status_code, response.headers["content-range"]) == (416, f"bytes */{SIZE}")
+
+
+def test_store_evicts_least_recently_used_over_the_limit():
+    store = HotAudioStore(max_bytes=25)
+    store.put("a", b"a" * 10)
+    store.put("b", b"b" * 10)
+    store.get("a")
+    store.put("c", b"c" * 10)
+
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.stats()["bytes"] == 20
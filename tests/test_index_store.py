@@ -0,0 +1,43 @@
+# tests/test_index_store.py
+
+"""
+스냅샷 인덱스 갱신(sync_store): 바뀐 문서만 다시 임베딩하고, 문서가 없는 컬렉션은 빈 인덱스로 시작하는지 확인합니다.
+"""
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from pronun_model.utils.index_store import content_hash, sync_store
+
+import pytest
+
+
+@pytest.fixture
+def embeddings():
+    return DeterministicFakeEmbedding(size=8)
+
+
+def record(doc_id: str, text: str):
+    return doc_id, text, {"증상": text}
+
+
+def test_empty_collection_starts_with_an_empty_index(embeddings):
+    store, hashes, added, removed = sync_store(None, {}, [], embeddings)
+
+    assert (hashes, added, removed) == ({}, 0, 0)
+    assert store.index.ntotal == 0
+    assert store.similarity_search("두통", k=3) == []
+
+    # 이후 문서가 생기면 같은 인덱스에 추가
+    store, hashes, added, removed = sync_store(store, hashes, [record("a", "두통")], embeddings)
+    assert (added, removed) == (1, 0)
+    assert [doc.id for doc in store.similarity_search("두통", k=3)] == ["a"]
+
+
+def test_only_changed_documents_are_embedded_again(embeddings):
+    store, hashes, _, _ = sync_store(None, {}, [record("a", "두통"), record("b", "요통")], embeddings)
+
+    store, hashes, added, removed = sync_store(store, hashes, [record("a", "두통"), record("c", "복통")], embeddings)
+
+    assert (added, removed) == (1, 1)
+    assert hashes == {"a": content_hash(*record("a", "두통")[1:]), "c": content_hash(*record("c", "복통")[1:])}
+    assert sorted(store.docstore._dict) == ["a", "c"]
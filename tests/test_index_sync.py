@@ -0,0 +1,197 @@
+# tests/test_index_sync.py
+
+"""
+index_sync가 MongoDB 변경(추가/수정/삭제)을 인덱스에 문서 단위로 반영하는지 확인합니다.
+
+실제 MongoDB가 필요하며, 연결할 수 없으면 건너뜁니다. change stream 테스트는 레플리카 셋이 필요합니다.
+    mongod --replSet rs0 --dbpath /tmp/rs0 && mongosh --eval "rs.initiate()"
+    TEST_MONGODB_URI="mongodb://localhost:27017/?replicaSet=rs0" pytest tests/test_index_sync.py
+
+인덱스(FAISS, 임베딩)는 가짜 리트리버로 바꿔 OpenAI 호출 없이 반영된 문서만 기록합니다.
+"""
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure, PyMongoError
+
+from pronun_model.utils import index_sync
+
+from datetime import datetime, timedelta, timezone
+import asyncio
+import os
+import uuid
+
+import pytest
+
+TEST_MONGODB_URI = os.getenv("TEST_MONGODB_URI", "mongodb://localhost:27017/?replicaSet=rs0")
+WAIT_SECONDS = 10
+
+
+class FakeRetriever:
+    """upsert_records/delete_records 호출을 기록하는 가짜 리트리버 (hashes는 실제와 같은 구조)"""
+
+    def __init__(self):
+        self.hashes = {name: {} for name in index_sync.COLLECTIONS}
+        self.upserted = []
+        self.deleted = []
+
+    def upsert_records(self, name, records):
+        applied = 0
+        for doc_id, text, _ in records:
+            if self.hashes[name].get(doc_id) != text:
+                self.hashes[name][doc_id] = text
+                self.upserted.append((name, doc_id, text))
+                applied += 1
+        return applied
+
+    def delete_records(self, name, doc_ids):
+        deleted = [doc_id for doc_id in doc_ids if self.hashes[name].pop(doc_id, None) is not None]
+        self.deleted.extend((name, doc_id) for doc_id in deleted)
+        return len(deleted)
+
+
+async def wait_for(condition, task: asyncio.Task, timeout: float = WAIT_SECONDS) -> None:
+    """condition()이 참이 될 때까지 대기. 동기화 작업이 먼저 끝나면(오류 등) 그 예외를 올림"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if task.done():
+            task.result()
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("변경 사항이 인덱스에 반영되지 않았습니다.")
+        await asyncio.sleep(0.05)
+
+
+async def stop(task: asyncio.Task) -> None:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.fixture
+def run_sync(monkeypatch):
+    """
+    테스트 전용 데이터베이스와 가짜 리트리버로 시나리오를 실행하는 함수.
+    (motor 클라이언트는 이벤트 루프에 묶이므로 연결부터 정리까지 한 루프에서 실행)
+    MongoDB에 연결할 수 없으면 건너뜁니다.
+    """
+    retriever = FakeRetriever()
+    monkeypatch.setattr(index_sync, "get_retriever", lambda: retriever)
+    monkeypatch.setattr(index_sync, "INDEX_SYNC_POLL_INTERVAL", 0.1)
+
+    async def main(scenario):
+        client = AsyncIOMotorClient(TEST_MONGODB_URI, serverSelectionTimeoutMS=1000)
+        db_name = f"pronun_test_{uuid.uuid4().hex[:8]}"
+        try:
+            try:
+                await client.admin.command("ping")
+            except PyMongoError as e:
+                pytest.skip(f"MongoDB에 연결할 수 없습니다 ({TEST_MONGODB_URI}): {e}")
+            # index_sync는 get_client()["medical_rag"]를 사용하므로 테스트 데이터베이스로 연결
+            monkeypatch.setattr(index_sync, "get_client", lambda: {"medical_rag": client[db_name]})
+            try:
+                return await scenario(client[db_name]["symptoms_rag"], retriever)
+            finally:
+                await client.drop_database(db_name)
+        finally:
+            client.close()
+
+    return lambda scenario: asyncio.run(main(scenario))
+
+
+def symptom(name: str, **fields) -> dict:
+    return {"증상": name, "추가 증상": "", "추천 진료과": "신경과", **fields}
+
+
+def test_change_stream_applies_document_changes(run_sync):
+    async def scenario(collection, retriever):
+        existing = str((await collection.insert_one(symptom("두통"))).inserted_id)
+        task = asyncio.create_task(index_sync._watch("symptoms", collection))
+        try:
+            # 구독 시작 전의 문서는 catch-up으로 반영
+            await wait_for(lambda: existing in retriever.hashes["symptoms"], task)
+            await asyncio.sleep(0.5)  # change stream 구독 시작 대기
+
+            inserted = (await collection.insert_one(symptom("요통"))).inserted_id
+            await wait_for(lambda: str(inserted) in retriever.hashes["symptoms"], task)
+
+            await collection.update_one({"_id": inserted}, {"$set": {"추천 진료과": "정형외과"}})
+            await wait_for(lambda: "정형외과" in retriever.hashes["symptoms"][str(inserted)], task)
+
+            await collection.delete_one({"_id": ObjectId(existing)})
+            await wait_for(lambda: ("symptoms", existing) in retriever.deleted, task)
+        finally:
+            await stop(task)
+        return existing, retriever
+
+    try:
+        existing, retriever = run_sync(scenario)
+    except OperationFailure as e:
+        if e.code == index_sync.CHANGE_STREAM_NOT_SUPPORTED:
+            pytest.skip("change stream은 레플리카 셋에서만 사용할 수 있습니다.")
+        raise
+
+    # 다른 문서가 바뀌어도 기존 문서는 다시 반영(임베딩)하지 않음
+    assert [doc_id for _, doc_id, _ in retriever.upserted].count(existing) == 1
+
+
+def test_polling_applies_changes_after_watermark(run_sync):
+    now = datetime.now(timezone.utc)
+
+    async def scenario(collection, retriever):
+        first = (await collection.insert_one(symptom("두통", updated_at=now))).inserted_id
+        task = asyncio.create_task(index_sync._poll("symptoms", collection))
+        try:
+            await wait_for(lambda: str(first) in retriever.hashes["symptoms"], task)
+            upserts_after_catch_up = len(retriever.upserted)
+
+            second = (await collection.insert_one(symptom("요통", updated_at=now + timedelta(seconds=1)))).inserted_id
+            await wait_for(lambda: str(second) in retriever.hashes["symptoms"], task)
+
+            await collection.delete_one({"_id": first})
+            await wait_for(lambda: ("symptoms", str(first)) in retriever.deleted, task)
+        finally:
+            await stop(task)
+        return upserts_after_catch_up, retriever
+
+    upserts_after_catch_up, retriever = run_sync(scenario)
+
+    # 워터마크 이후의 문서만 새로 반영 (이미 반영한 문서는 다시 임베딩하지 않음)
+    assert len(retriever.upserted) == upserts_after_catch_up + 1
+
+
+class FakeCollection:
+    """collection.find({})만 지원하는 가짜 컬렉션 (MongoDB 없이 catch-up 확인용)"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query):
+        async def cursor():
+            for doc in list(self.docs):
+                yield doc
+        return cursor()
+
+
+def test_rebuild_catches_up_every_collection_after_the_swap(monkeypatch):
+    old, new = FakeRetriever(), FakeRetriever()
+    current = {"retriever": old}
+    symptoms = FakeCollection([symptom("두통", _id=ObjectId())])
+    hospitals = FakeCollection([])
+    added = {"_id": ObjectId(), "병원이름": "다보스병원", "영업시간": "월요일: 0900~1800"}
+
+    def refresh_retriever():
+        # 재생성이 MongoDB를 읽은 뒤 추가된 병원은 다른 컬렉션의 동기화 작업이 이전 인덱스에만 반영함
+        hospitals.docs.append(added)
+        old.upsert_records("hospitals", [index_sync.hospital_record(added)])
+        current["retriever"] = new
+        return new
+
+    monkeypatch.setattr(index_sync, "get_retriever", lambda: current["retriever"])
+    monkeypatch.setattr(index_sync, "refresh_retriever", refresh_retriever)
+    monkeypatch.setattr(index_sync, "get_client", lambda: {
+        "medical_rag": {"symptoms_rag": symptoms, "hospitals_rag": hospitals},
+    })
+
+    asyncio.run(index_sync._rebuild())
+
+    assert list(new.hashes["hospitals"]) == [str(added["_id"])]
+    assert list(new.hashes["symptoms"]) == [str(symptoms.docs[0]["_id"])]
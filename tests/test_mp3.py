@@ -0,0 +1,62 @@
+# tests/test_mp3.py
+
+"""
+MP3 프레임 단위 결합(concat_mp3): 태그와 Xing/Info 프레임을 빼고 오디오 프레임만 이어 붙이는지 확인합니다.
+"""
+
+from pronun_model.utils.mp3 import concat_mp3, iter_frames
+
+# MPEG-1 Layer III, 128kbps, 44.1kHz, joint stereo, 패딩 없음 → 프레임 길이 417바이트
+HEADER = b"\xff\xfb\x90\x64"
+FRAME_BYTES = 417
+
+
+def frame(fill: int) -> bytes:
+    return HEADER + bytes([fill]) * (FRAME_BYTES - 4)
+
+
+def info_frame() -> bytes:
+    """첫 프레임의 Info 헤더 (side info 32바이트 뒤)"""
+    data = bytearray(frame(0))
+    data[36:40] = b"Info"
+    return bytes(data)
+
+
+def id3v2(size: int) -> bytes:
+    syncsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b"ID3\x04\x00\x00" + syncsafe + b"\0" * size
+
+
+def id3v1() -> bytes:
+    return b"TAG" + b"\0" * 125
+
+
+def mp3(*fills: int) -> bytes:
+    """인코더가 만드는 것처럼 ID3v2 태그 + Info 프레임 + 오디오 프레임 + ID3v1 태그"""
+    return id3v2(20) + info_frame() + b"".join(frame(fill) for fill in fills) + id3v1()
+
+
+def test_frames_skip_tags_and_the_info_frame():
+    assert list(iter_frames(mp3(1, 2))) == [frame(1), frame(2)]
+
+
+def test_concat_keeps_only_audio_frames_in_order():
+    joined = concat_mp3([mp3(1, 2), mp3(3)])
+
+    assert joined == frame(1) + frame(2) + frame(3)
+
+
+def test_single_segment_is_returned_as_is():
+    segment = mp3(1)
+
+    assert concat_mp3([segment]) is segment
+
+
+def test_garbage_between_frames_is_skipped():
+    data = frame(1) + b"\x00\x01garbage\xff\x00" + frame(2)
+
+    assert list(iter_frames(data)) == [frame(1), frame(2)]
+
+
+def test_truncated_last_frame_is_dropped():
+    assert concat_mp3([frame(1) + frame(2)[:100], mp3(3)]) == frame(1) + frame(3)
@@ -0,0 +1,82 @@
+# tests/test_open_hours.py
+
+"""
+영업시간 문자열 → 주간 비트마스크 변환(open_hours)과 병원 이름 추출 순서를 확인합니다.
+"""
+
+from datetime import datetime
+
+from langchain_core.documents import Document
+
+from pronun_model.utils import open_hours
+from pronun_model.utils.open_hours import describe, is_open, next_open, parse_open_hours, slot_of
+from pronun_model.utils.qa import extract_hospitals
+
+# 2024-01-01은 월요일
+MONDAY = datetime(2024, 1, 1)
+
+
+def at(day: int, hour: int, minute: int = 0) -> int:
+    return slot_of(MONDAY.replace(day=1 + day, hour=hour, minute=minute))
+
+
+def test_weekday_range_is_open_only_inside_the_hours():
+    mask = parse_open_hours("월요일: 0830~1730, 화요일: 0830~1730")
+
+    assert is_open(mask, at(0, 8, 30))
+    assert is_open(mask, at(1, 17, 25))
+    assert not is_open(mask, at(0, 8, 25))
+    assert not is_open(mask, at(0, 17, 30))
+    assert not is_open(mask, at(2, 12))
+
+
+def test_ranges_without_a_day_belong_to_the_previous_day():
+    mask = parse_open_hours("월요일: 0900~1200, 1400~1800")
+
+    assert is_open(mask, at(0, 10))
+    assert not is_open(mask, at(0, 13))
+    assert is_open(mask, at(0, 15))
+
+
+def test_overnight_range_continues_into_the_next_day():
+    mask = parse_open_hours("일: 18:00-02:00")
+
+    assert is_open(mask, at(6, 23))
+    # 일요일 밤 → 월요일 새벽 (주 경계)
+    assert is_open(mask, at(0, 1, 55))
+    assert not is_open(mask, at(0, 2))
+
+
+def test_hours_of_non_day_items_are_ignored():
+    mask = parse_open_hours("토요일: 0900~1300, 공휴일: 0900~1300")
+
+    assert mask == parse_open_hours("토요일: 0900~1300")
+
+
+def test_empty_or_unparsable_text_has_no_hours():
+    assert parse_open_hours("") == 0
+    assert parse_open_hours("휴진") == 0
+    assert next_open(0, at(0, 9)) is None
+    assert describe(0, at(0, 9)) == "영업시간 정보 없음"
+
+
+def test_describe_open_and_closed():
+    mask = parse_open_hours("월요일: 0830~1730, 화요일: 0830~1730")
+
+    assert describe(mask, at(0, 9)) == "현재 영업 중 (17:30까지)"
+    assert describe(mask, at(0, 18)) == "현재 영업 종료 (다음 영업: 화요일 08:30)"
+    # 수요일 이후에는 다음 주 월요일로 넘어감
+    assert describe(mask, at(3, 9)) == "현재 영업 종료 (다음 영업: 월요일 08:30)"
+
+
+def test_always_open_has_no_closing_time():
+    mask = open_hours._FULL
+
+    assert describe(mask, at(4, 3)) == "현재 영업 중 (24시간)"
+
+
+def test_extract_hospitals_keeps_the_ranked_order():
+    names = ["다나병원", "가나의원", "다나병원", "마바의원", "사아병원"]
+    docs = [Document(page_content=f"병원이름: {name}\n영업상태: 현재 영업 중") for name in names]
+
+    assert extract_hospitals(docs) == ["다나병원", "가나의원", "마바의원"]
@@ -0,0 +1,236 @@
+# tests/test_openai_call.py
+
+"""
+call_openai()의 재시도, 회로 차단, 헤징, 제한 시간을 httpx.MockTransport로 만든 가짜 OpenAI 서버에 대해 확인합니다.
+"""
+
+from fastapi import HTTPException
+from openai import APITimeoutError, AsyncOpenAI, RateLimitError
+
+from pronun_model import openai_call
+from pronun_model.openai_call import _Stage, _retry_delay, call_openai
+from pronun_model.utils import qa
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+
+class FakeOpenAI:
+    """
+    응답 순서를 정해 둘 수 있는 가짜 OpenAI 서버.
+
+    responses의 각 항목은 (상태 코드, 지연 초)이며, 다 쓰면 마지막 항목을 반복합니다.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses) or [(200, 0.0)]
+        self.requests = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        status_code, delay = self.responses[min(self.requests, len(self.responses) - 1)]
+        self.requests += 1
+        if delay:
+            await asyncio.sleep(delay)
+        if status_code == 200:
+            return httpx.Response(200, json={"text": f"응답 {self.requests}"})
+        headers = {"retry-after": "0"} if status_code == 429 else {}
+        return httpx.Response(status_code, json={"error": {"message": "fake error"}}, headers=headers)
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """call_openai가 가짜 서버를 쓰도록 공용 클라이언트를 바꾸고, 단계 상태와 재시도 대기 시간을 초기화"""
+    servers = []
+
+    def install(*responses) -> FakeOpenAI:
+        server = FakeOpenAI(*responses)
+        client = AsyncOpenAI(
+            api_key="sk-test",
+            base_url="http://fake-openai/v1",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(server)),
+            max_retries=0,
+        )
+        monkeypatch.setattr(openai_call, "get_openai_client", lambda: client)
+        servers.append(server)
+        return server
+
+    monkeypatch.setitem(openai_call._stages, "stt", _Stage("STT 변환", timeout=5.0))
+    monkeypatch.setattr(openai_call, "OPENAI_MAX_RETRIES", 2)
+    monkeypatch.setattr(openai_call, "OPENAI_RETRY_BASE", 0.001)
+    monkeypatch.setattr(openai_call, "OPENAI_RETRY_MAX", 0.01)
+    monkeypatch.setattr(openai_call, "OPENAI_BREAKER_FAILURES", 3)
+    monkeypatch.setattr(openai_call, "OPENAI_BREAKER_RESET", 30.0)
+    monkeypatch.setattr(openai_call, "OPENAI_HEDGE_ENABLED", False)
+    return install
+
+
+def transcribe(client: AsyncOpenAI):
+    return client.audio.transcriptions.create(model="whisper-1", file=("a.mp3", b"audio"))
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_success_without_retry(fake_openai):
+    server = fake_openai((200, 0.0))
+
+    result = run(call_openai("stt", transcribe))
+
+    assert result.text == "응답 1"
+    assert server.requests == 1
+    stage = openai_call._stages["stt"]
+    assert (stage.calls, stage.retries, stage.errors) == (1, 0, 0)
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 503])
+def test_retries_transient_errors(fake_openai, status_code):
+    server = fake_openai((status_code, 0.0), (status_code, 0.0), (200, 0.0))
+
+    result = run(call_openai("stt", transcribe))
+
+    assert result.text == "응답 3"
+    assert server.requests == 3
+    assert openai_call._stages["stt"].retries == 2
+
+
+def test_gives_up_after_max_retries(fake_openai):
+    server = fake_openai((500, 0.0))
+
+    with pytest.raises(HTTPException) as exc_info:
+        run(call_openai("stt", transcribe))
+
+    assert exc_info.value.status_code == 502
+    assert server.requests == 1 + openai_call.OPENAI_MAX_RETRIES
+    assert openai_call._stages["stt"].errors == 1
+
+
+def test_client_errors_are_not_retried(fake_openai):
+    server = fake_openai((400, 0.0))
+
+    with pytest.raises(HTTPException) as exc_info:
+        run(call_openai("stt", transcribe))
+
+    assert exc_info.value.status_code == 400
+    assert server.requests == 1
+    assert openai_call._stages["stt"].consecutive_failures == 0
+
+
+def test_timeout_is_retried_then_reported(fake_openai, monkeypatch):
+    server = fake_openai((200, 1.0))
+    monkeypatch.setitem(openai_call._stages, "stt", _Stage("STT 변환", timeout=0.05))
+
+    with pytest.raises(HTTPException) as exc_info:
+        run(call_openai("stt", transcribe))
+
+    assert exc_info.value.status_code == 504
+    assert server.requests == 1 + openai_call.OPENAI_MAX_RETRIES
+
+
+def test_retry_after_is_minimum_delay(monkeypatch):
+    monkeypatch.setattr(openai_call, "OPENAI_RETRY_MAX", 8.0)
+    response = httpx.Response(429, headers={"retry-after": "3"}, request=httpx.Request("POST", "http://fake-openai/v1"))
+    error = RateLimitError("rate limited", response=response, body=None)
+
+    assert 3.0 <= _retry_delay(0, error) <= 8.0
+
+
+def test_breaker_opens_rejects_and_recovers(fake_openai, monkeypatch):
+    monkeypatch.setattr(openai_call, "OPENAI_MAX_RETRIES", 0)
+    server = fake_openai((500, 0.0), (500, 0.0), (500, 0.0), (200, 0.0))
+    stage = openai_call._stages["stt"]
+
+    for _ in range(openai_call.OPENAI_BREAKER_FAILURES):
+        with pytest.raises(HTTPException):
+            run(call_openai("stt", transcribe))
+    assert stage.opened_at is not None
+
+    # 회로가 열린 동안에는 서버에 요청하지 않고 바로 503
+    with pytest.raises(HTTPException) as exc_info:
+        run(call_openai("stt", transcribe))
+    assert exc_info.value.status_code == 503
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+    assert server.requests == 3
+    assert stage.rejected == 1
+
+    # 대기 시간이 지나면 한 번 시도해 성공하면 복구
+    monkeypatch.setattr(openai_call, "OPENAI_BREAKER_RESET", 0.0)
+    result = run(call_openai("stt", transcribe))
+    assert result.text == "응답 4"
+    assert stage.opened_at is None
+    assert openai_call.openai_stats()["stt"]["circuit"] == "closed"
+
+
+def test_failed_probe_reopens_breaker(fake_openai, monkeypatch):
+    monkeypatch.setattr(openai_call, "OPENAI_MAX_RETRIES", 0)
+    fake_openai((500, 0.0))
+    stage = openai_call._stages["stt"]
+    for _ in range(openai_call.OPENAI_BREAKER_FAILURES):
+        with pytest.raises(HTTPException):
+            run(call_openai("stt", transcribe))
+    opened_at = stage.opened_at
+
+    monkeypatch.setattr(openai_call, "OPENAI_BREAKER_RESET", 0.0)
+    with pytest.raises(HTTPException) as exc_info:
+        run(call_openai("stt", transcribe))
+
+    assert exc_info.value.status_code == 502
+    assert stage.opened_at > opened_at
+    assert not stage.probing
+
+
+def test_hedges_slow_request(fake_openai, monkeypatch):
+    # 첫 요청은 느리고, p95(10ms)를 넘으면 보내는 헤징 요청은 바로 응답
+    server = fake_openai((200, 1.0), (200, 0.0))
+    monkeypatch.setattr(openai_call, "OPENAI_HEDGE_ENABLED", True)
+    stage = openai_call._stages["stt"]
+    stage.latencies.extend([0.01] * openai_call.OPENAI_HEDGE_MIN_SAMPLES)
+
+    started = time.monotonic()
+    result = run(call_openai("stt", transcribe))
+
+    assert result.text == "응답 2"
+    assert time.monotonic() - started < 1.0
+    assert server.requests == 2
+    assert stage.hedges == 1
+
+
+def test_no_hedge_without_enough_samples(fake_openai, monkeypatch):
+    server = fake_openai((200, 0.05))
+    monkeypatch.setattr(openai_call, "OPENAI_HEDGE_ENABLED", True)
+
+    run(call_openai("stt", transcribe))
+
+    assert server.requests == 1
+    assert openai_call._stages["stt"].hedges == 0
+
+
+class FakeChatModel:
+    """astream()이 처음 failures번은 첫 조각 전에 타임아웃으로 실패하는 가짜 LLM"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.streams = 0
+
+    async def astream(self, messages):
+        self.streams += 1
+        if self.streams <= self.failures:
+            raise APITimeoutError(request=httpx.Request("POST", "http://fake-openai/v1/chat/completions"))
+        for text in ("두통", "이 있으시군요."):
+            yield text
+
+
+def test_llm_stream_is_retried_only_before_the_first_chunk(fake_openai, monkeypatch):
+    llm = FakeChatModel(failures=1)
+    monkeypatch.setattr(qa, "get_llm", lambda: llm)
+    monkeypatch.setitem(openai_call._stages, "llm", _Stage("답변 생성", timeout=5.0))
+
+    async def collect():
+        return [chunk async for chunk in qa._astream_llm([])]
+
+    assert run(collect()) == ["두통", "이 있으시군요."]
+    assert llm.streams == 2
+    assert openai_call._stages["llm"].retries == 1
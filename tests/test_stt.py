@@ -0,0 +1,71 @@
+# tests/test_stt.py
+
+"""
+긴 음성 분할(split_at_silence)과 조각별 변환 결과 이어 붙이기(stitch_transcripts)를 확인합니다.
+"""
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from pronun_model.utils.audio_preprocess import CHUNK_OVERLAP_MS, split_at_silence
+from pronun_model.utils.stt import MAX_OVERLAP_WORDS, stitch_transcripts
+
+
+def tone(ms: int) -> AudioSegment:
+    return Sine(440).to_audio_segment(duration=ms, volume=-10)
+
+
+def test_overlapped_seam_keeps_the_repeated_words_once():
+    text = stitch_transcripts(["머리가 너무 아파요", "아파요. 어제부터 계속"], [True])
+
+    assert text == "머리가 너무 아파요 어제부터 계속"
+
+
+def test_silence_seam_keeps_words_repeated_at_the_boundary():
+    text = stitch_transcripts(["머리가 아파요", "아파요 정말로"], [False])
+
+    assert text == "머리가 아파요 아파요 정말로"
+
+
+def test_only_overlapped_seams_are_deduplicated():
+    text = stitch_transcripts(["하나 둘", "둘 셋", "셋 넷"], [False, True])
+
+    assert text == "하나 둘 둘 셋 넷"
+
+
+def test_overlap_longer_than_the_limit_is_not_removed():
+    repeated = " ".join(["네"] * (MAX_OVERLAP_WORDS + 5))
+    text = stitch_transcripts([repeated, repeated], [True])
+
+    assert len(text.split()) == 2 * (MAX_OVERLAP_WORDS + 5) - MAX_OVERLAP_WORDS
+
+
+def test_empty_transcripts_are_skipped():
+    assert stitch_transcripts(["", "안녕하세요", ""], [True, True]) == "안녕하세요"
+
+
+def test_split_cuts_inside_silence_without_overlap():
+    audio = tone(3000) + AudioSegment.silent(duration=600) + tone(3000)
+
+    chunks, overlapped = split_at_silence(audio, chunk_ms=3000)
+
+    assert overlapped == [False]
+    assert len(chunks) == 2
+    assert sum(len(chunk) for chunk in chunks) == len(audio)
+    # 무음의 가운데에서 자름
+    assert 3000 < len(chunks[0]) < 3600
+
+
+def test_split_without_silence_overlaps_the_next_chunk():
+    audio = tone(8000)
+
+    chunks, overlapped = split_at_silence(audio, chunk_ms=3000)
+
+    assert overlapped == [True, True]
+    assert [len(chunk) for chunk in chunks] == [3000 + CHUNK_OVERLAP_MS, 3000 + CHUNK_OVERLAP_MS, 2000]
+
+
+def test_short_audio_is_not_split():
+    chunks, overlapped = split_at_silence(tone(3500), chunk_ms=3000)
+
+    assert (len(chunks), overlapped) == (1, [])
@@ -0,0 +1,56 @@
+# tests/test_symptom_matcher.py
+
+"""
+규칙 기반 증상 매칭(SymptomMatcher): 표기 차이를 정규화해 찾고, 긴 용어를 우선하며, 모호하면 벡터 검색으로 넘기는지 확인합니다.
+"""
+
+from pronun_model.utils.symptom_matcher import AhoCorasick, SymptomMatcher, split_terms
+
+import pytest
+
+
+@pytest.fixture
+def matcher():
+    matcher = SymptomMatcher()
+    matcher.upsert("headache", {"증상": "두통, 머리 아픔", "추가 증상": "어지러움이", "추천 진료과": "신경과"})
+    matcher.upsert("migraine", {"증상": "편두통", "추가 증상": "", "추천 진료과": "신경과/내과"})
+    matcher.upsert("back", {"증상": "허리 통증, 요통", "추가 증상": "", "추천 진료과": "정형외과/신경외과"})
+    return matcher
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    automaton = AhoCorasick(["두통", "편두통", "통증"])
+
+    assert sorted(automaton.find("편두통증")) == [(0, 3, "편두통"), (1, 3, "두통"), (2, 4, "통증")]
+
+
+def test_terms_are_normalized_and_trailing_particles_removed():
+    assert split_terms("머리 아픔, 어지러움이 / 열") == {"머리아픔", "어지러움"}
+
+
+def test_question_spacing_and_particles_do_not_matter(matcher):
+    assert matcher.match("두 통이 너무 심해요") == ["headache"]
+    assert matcher.match("머리가 아파서 왔어요. 어지러움도 있어요") == ["headache"]
+
+
+def test_longer_term_wins_over_the_term_inside_it(matcher):
+    # "편두통" 안의 "두통"은 버림
+    assert matcher.match("편두통이 있어요") == ["migraine"]
+
+
+def test_documents_are_ranked_by_matched_length(matcher):
+    assert matcher.match("허리 통증이랑 두통이 있어요") == ["back", "headache"]
+
+
+def test_term_shared_by_different_departments_is_ambiguous(matcher):
+    matcher.upsert("stomach", {"증상": "요통", "추천 진료과": "내과"})
+
+    assert matcher.match("요통이 있어요") is None
+
+
+def test_no_match_and_removed_documents(matcher):
+    assert matcher.match("기침이 나요") is None
+
+    matcher.remove("back")
+    assert matcher.match("요통이 있어요") is None
+    assert len(matcher) == 2
@@ -0,0 +1,176 @@
+# tests/test_tts_cache.py
+
+"""
+TTS 캐시의 요청별 참조(refs), 요청 단위 삭제, 주기적 정리(TTL/상한)를 임시 디렉토리에서 확인합니다.
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pronun_model.routers import delete_files
+from pronun_model.utils.hot_audio import get_hot_audio
+from pronun_model.utils.tts_cache import TTSCache
+
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs) -> TTSCache:
+        options = {"max_bytes": 1024 * 1024, "ttl": 3600, "grace": 0}
+        options.update(kwargs)
+        cache = TTSCache(directory=tmp_path / "cache", refs_path=tmp_path / "refs.sqlite3", **options)
+        caches.append(cache)
+        return cache
+
+    return make
+
+
+def mp3(fill: int) -> bytes:
+    """MPEG-1 Layer III 128kbps 44.1kHz 프레임 하나로 된 MP3 데이터"""
+    return b"\xff\xfb\x90\x64" + bytes([fill]) * 413
+
+
+def write_old(cache: TTSCache, key: str, size: int, age: float) -> None:
+    """age초 전에 마지막으로 사용된 캐시 파일을 디스크에 직접 만듦"""
+    cache.directory.mkdir(parents=True, exist_ok=True)
+    path = cache.path(key)
+    path.write_bytes(b"\0" * size)
+    used = time.time() - age
+    os.utime(path, (used, used))
+
+
+def test_delete_tts_keeps_audio_of_ids_sharing_a_prefix(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.put("k-abc", b"a" * 10, owner="abc")
+    cache.put("k-abc1", b"b" * 20, owner="abc1")
+    cache.put("k-abcdef", b"c" * 30, owner="abcdef")
+    monkeypatch.setattr(delete_files, "get_tts_cache", lambda: cache)
+    app = FastAPI()
+    app.include_router(delete_files.router)
+
+    with TestClient(app) as client:
+        response = client.delete("/delete-tts/abc")
+        assert response.status_code == 200
+        assert response.json()["deleted_files"] == 1
+        assert response.json()["freed_bytes"] == 10
+
+        # 같은 요청을 다시 지우면 남은 기록이 없음
+        assert client.delete("/delete-tts/abc").status_code == 404
+
+    assert not cache.path("k-abc").exists()
+    assert cache.path("k-abc1").exists()
+    assert cache.path("k-abcdef").exists()
+
+
+def test_delete_owner_keeps_files_shared_with_other_requests(make_cache):
+    cache = make_cache()
+    cache.put("shared", b"s" * 10, owner="first")
+    assert cache.lookup("shared", owner="second") == cache.path("shared")
+
+    assert cache.delete_owner("first") == {"deleted_files": 0, "freed_bytes": 0, "shared_files": 1}
+    assert cache.path("shared").exists()
+
+    assert cache.delete_owner("second") == {"deleted_files": 1, "freed_bytes": 10, "shared_files": 0}
+    assert not cache.path("shared").exists()
+    assert cache.delete_owner("second") is None
+
+
+def test_sweep_removes_expired_files_and_their_refs(make_cache):
+    probe = make_cache()
+    write_old(probe, "expired", 10, age=7200)
+    write_old(probe, "fresh", 10, age=60)
+    cache = make_cache()
+    cache._add_ref("expired", "owner")
+
+    result = cache.sweep()
+
+    assert result["ttl"] == {"files": 1, "bytes": 10}
+    assert not cache.path("expired").exists()
+    assert cache.path("fresh").exists()
+    # 삭제된 파일의 참조도 정리되어 요청 단위 삭제에서 찾지 않음
+    assert cache.delete_owner("owner") is None
+
+
+def test_sweep_evicts_least_recently_used_over_quota_but_not_leased(make_cache):
+    probe = make_cache()
+    for age, key in ((300, "oldest"), (200, "older"), (100, "newer"), (50, "newest")):
+        write_old(probe, key, 10, age=age)
+    cache = make_cache(max_bytes=20)
+
+    with cache.lease("oldest"):
+        result = cache.sweep()
+
+    # 다운로드 중인 파일은 남기고 그다음으로 오래된 파일부터 삭제
+    assert result["quota"] == {"files": 2, "bytes": 20}
+    assert cache.path("oldest").exists()
+    assert not cache.path("older").exists()
+    assert not cache.path("newer").exists()
+    assert cache.path("newest").exists()
+    assert cache.stats()["evictions"] == 2
+
+
+def test_joined_audio_is_built_from_the_segments_without_a_second_file(make_cache):
+    cache = make_cache()
+    cache.put("j1-part1", mp3(1))
+    cache.put("j1-part2", mp3(2))
+
+    path = cache.put_joined("j1-whole", ["j1-part1", "j1-part2"], owner="req")
+
+    # 답변 전체는 디스크에 다시 저장하지 않음
+    assert path == cache.path("j1-whole")
+    assert not path.exists()
+    assert cache.stats()["entries"] == 2
+    # 메모리에 없어도 세그먼트를 이어 붙여 제공 (디스크에서 보낼 파일이 없으므로 max_bytes와 상관없음)
+    get_hot_audio().discard("j1-whole")
+    entry = cache.load_hot("j1-whole", max_bytes=1)
+    assert entry.data == mp3(1) + mp3(2)
+    assert cache.hot("j1-whole") is entry
+
+
+def test_delete_owner_removes_the_segments_of_joined_audio(make_cache):
+    cache = make_cache()
+    cache.put("j2-part1", mp3(1))
+    cache.put("j2-closing", mp3(9))
+    cache.put("j3-part1", mp3(3))
+    cache.put_joined("j2-whole", ["j2-part1", "j2-closing"], owner="first")
+    cache.put_joined("j3-whole", ["j3-part1", "j2-closing"], owner="second")
+    assert cache.load_hot("j2-whole") is not None
+
+    result = cache.delete_owner("first")
+
+    # 다른 답변도 사용하는 맺음말은 남김
+    assert result == {"deleted_files": 1, "freed_bytes": len(mp3(1)), "shared_files": 1}
+    assert not cache.path("j2-part1").exists()
+    assert cache.path("j2-closing").exists()
+    assert cache.load_hot("j2-whole") is None
+    assert cache.load_hot("j3-whole").data == mp3(3) + mp3(9)
+
+
+def test_expired_segment_drops_the_joined_audio(make_cache):
+    probe = make_cache()
+    write_old(probe, "j4-part1", 10, age=7200)
+    cache = make_cache()
+    cache.put("j4-part2", mp3(2))
+    cache.put_joined("j4-whole", ["j4-part1", "j4-part2"], owner="req")
+    get_hot_audio().put("j4-whole", b"joined")
+
+    cache.sweep()
+
+    assert cache.load_hot("j4-whole") is None
+    assert get_hot_audio().get("j4-whole") is None
+
+
+def test_single_segment_answer_uses_the_segment_file(make_cache):
+    cache = make_cache()
+    cache.put("j5-only", mp3(5))
+
+    cache.put_joined("j5-only", ["j5-only"], owner="req")
+
+    assert cache.load_hot("j5-only").data == mp3(5)
+    assert cache.delete_owner("req")["deleted_files"] == 1
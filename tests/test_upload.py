@@ -0,0 +1,81 @@
+# tests/test_upload.py
+
+"""
+업로드 음성 수신: UPLOAD_SPOOL_BYTES 이하는 메모리로, 그보다 큰 파일은 임시 파일 경로로 넘기는지 확인합니다.
+"""
+
+from fastapi import APIRouter, FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from starlette.formparsers import MultiPartParser
+
+from pronun_model.utils import upload
+from pronun_model.utils.upload import UploadRoute, read_upload, release
+
+import os
+
+import pytest
+
+SPOOL_BYTES = 64 * 1024
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(upload, "UPLOAD_SPOOL_BYTES", SPOOL_BYTES)
+    monkeypatch.setattr(upload._SpoolingMultiPartParser, "spool_max_size", SPOOL_BYTES)
+    router = APIRouter(route_class=UploadRoute)
+
+    @router.post("/upload")
+    async def receive(file: UploadFile = File(...)):
+        source = await read_upload(file, max_bytes=4 * SPOOL_BYTES)
+        try:
+            if isinstance(source, str):
+                with open(source, "rb") as f:
+                    return {"kind": "path", "suffix": os.path.splitext(source)[1], "size": len(f.read()),
+                            "rolled": file.file._rolled}
+            name, data = source
+            return {"kind": "memory", "name": name, "size": len(data), "rolled": file.file._rolled}
+        finally:
+            release(source)
+            if isinstance(source, str):
+                assert not os.path.exists(source)
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def post(client: TestClient, size: int, name: str = "question.m4a"):
+    return client.post("/upload", files={"file": (name, b"\1" * size, "audio/mp4")})
+
+
+def test_small_upload_is_read_into_memory(client):
+    response = post(client, 2 * 1024)
+
+    assert response.json() == {"kind": "memory", "name": "question.m4a", "size": 2 * 1024, "rolled": False}
+
+
+def test_upload_up_to_the_spool_size_stays_in_memory_while_parsing(client):
+    response = post(client, SPOOL_BYTES)
+
+    assert response.json()["rolled"] is False
+
+
+def test_large_upload_is_passed_as_a_file_on_disk(client):
+    response = post(client, 2 * SPOOL_BYTES, name="../question.m4a")
+
+    # Starlette 기본값(1MB)보다 작아도 UPLOAD_SPOOL_BYTES를 넘으면 파싱 단계에서 디스크로 넘어감
+    assert response.json() == {"kind": "path", "suffix": ".m4a", "size": 2 * SPOOL_BYTES, "rolled": True}
+
+
+def test_upload_over_the_limit_is_rejected(client):
+    assert post(client, 5 * SPOOL_BYTES).status_code == 413
+
+
+def test_empty_upload_is_rejected(client):
+    assert post(client, 0).status_code == 400
+
+
+def test_spool_size_is_not_changed_globally():
+    assert MultiPartParser.spool_max_size == 1024 * 1024
+    assert upload._SpoolingMultiPartParser.spool_max_size == upload.UPLOAD_SPOOL_BYTES